@@ -1,20 +1,38 @@
 from __future__ import annotations
 
 import argparse
-import hashlib
-import itertools
+import contextlib
 import json
 import sys
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, Iterable, cast
+
+import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
 
-from data import DataDownloader
-from engine import Backtester
-from metrics import cagr, max_drawdown
+from costs import CostModel
+from data import DAILY, INTERVALS, DataDownloader, DownloadError
+from metrics import TEAR_SHEET_METRICS, cagr, max_drawdown, periods_per_year
+from profiling import BacktestProfiler
+from result_cache import DEFAULT_CACHE_DIR, ResultCache
+from search import SAMPLERS, SearchSpace, run_search
 import strategies
 from strategies.base import Strategy
+from strategies.indicator_cache import DEFAULT_INDICATOR_BYTES, INDICATORS
+from sweep import (
+    DEFAULT_CHUNK_SIZE,
+    Constraint,
+    SweepTask,
+    generate_param_grid,
+    iter_param_grid,
+    run_strategies,
+    run_universe,
+    run_sweep,
+    strategy_constraints,
+    stream_sweep,
+)
+from walkforward import walk_forward
 
 STRATEGIES = {
     name.removesuffix("Strategy").lower(): getattr(strategies, name)
@@ -23,25 +41,6 @@ STRATEGIES = {
 }
 
 
-def generate_param_grid(params: dict[str, Any]) -> list[dict[str, Any]]:
-    """Return cartesian product of parameter values.
-
-    Any value that is a list will be expanded. Single values are kept as-is.
-    """
-    keys = list(params.keys())
-    values: list[list[Any]] = []
-    for v in params.values():
-        if isinstance(v, list):
-            values.append(v)
-        else:
-            values.append([v])
-
-    grid = []
-    for combo in itertools.product(*values):
-        grid.append(dict(zip(keys, combo)))
-    return grid
-
-
 def load_strategy(name: str, params: dict[str, float]) -> Strategy:
     cls = STRATEGIES.get(name)
     if cls is None:
@@ -49,20 +48,307 @@ def load_strategy(name: str, params: dict[str, float]) -> Strategy:
     return cast(type[Strategy], cls)(**params)
 
 
+def read_universe(path: str | Path) -> list[str]:
+    """Return the tickers listed in *path*.
+
+    Tickers are separated by newlines or commas; blank lines and text after
+    ``#`` are ignored and duplicates are dropped.
+    """
+    tickers: list[str] = []
+    for line in Path(path).read_text().splitlines():
+        line = line.split("#", 1)[0]
+        tickers.extend(t.strip() for t in line.split(",") if t.strip())
+    return list(dict.fromkeys(tickers))
+
+
+def parse_borrow(text: str) -> float | dict[str, float]:
+    """Parse ``--borrow-bps``: one rate or ``COLUMN=bps`` pairs.
+
+    ``"50"`` charges every column 50 bps a year, ``"3USL=95,3TYL=95"`` only
+    the named price columns.
+    """
+    if "=" not in text:
+        return float(text)
+    rates: dict[str, float] = {}
+    for item in text.split(","):
+        column, sep, bps = item.partition("=")
+        if not sep or not column.strip():
+            raise ValueError(f"invalid borrow rate {item!r}, expected COLUMN=bps")
+        rates[column.strip()] = float(bps)
+    return rates
+
+
+def _walk_forward(
+    args: argparse.Namespace,
+    strat_name: str,
+    grid: list[dict[str, Any]],
+    ticker: str,
+    data: pd.DataFrame,
+    cache: ResultCache | None,
+    costs: CostModel | None,
+) -> None:
+    """Run and report one walk-forward study, writing its files to results/."""
+    result = walk_forward(
+        strat_name,
+        grid,
+        data,
+        args.train_bars,
+        args.test_bars,
+        metric=args.metric,
+        anchored=args.anchored,
+        jobs=args.jobs,
+        cache=cache,
+        costs=costs,
+    )
+    stem = Path("results") / f"walkforward_{strat_name}_{ticker}"
+    result.windows.to_csv(stem.with_name(stem.name + ".csv"), index=False)
+    oos = result.equity.to_frame().join(result.position)
+    oos.to_csv(stem.with_name(stem.name + "_equity.csv"))
+
+    print(f"{strat_name} {ticker}: {len(result.windows)} windows by {args.metric}")
+    for row in result.windows.itertuples(index=False):
+        print(
+            f"  {row.test_start:%Y-%m-%d} {row.test_end:%Y-%m-%d} {row.paramhash} "
+            f"train {row.train_score:>8.3f} test {row.test_score:>8.3f} "
+            f"return {row.test_return:>7.2%}"
+        )
+    equity = result.equity
+    drawdown = equity / equity.cummax().clip(lower=1.0) - 1
+    print(
+        f"  out of sample CAGR {cagr(equity, equity.index[0], equity.index[-1]):.2%} "
+        f"MaxDD {max_drawdown(drawdown):.2%}"
+    )
+
+
+def _search(
+    args: argparse.Namespace,
+    strat_name: str,
+    space: dict[str, Any],
+    data: dict[str, pd.DataFrame],
+    cache: ResultCache | None,
+    costs: CostModel | None,
+) -> pd.DataFrame:
+    """Run a sampled sweep of one strategy and return its summary rows."""
+    state = None
+    if args.search_state is not None:
+        state_dir = Path(args.search_state)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        state = state_dir / f"{strat_name}.json"
+    result = run_search(
+        strat_name,
+        SearchSpace(space),
+        data,
+        args.start,
+        args.end,
+        sampler=args.sampler,
+        budget=100 if args.budget is None else args.budget,
+        metric=args.metric,
+        patience=args.patience,
+        seed=args.seed,
+        state_path=state,
+        jobs=args.jobs,
+        cache=cache,
+        costs=costs,
+    )
+    result.trials.to_csv(Path("results") / f"search_{strat_name}.csv", index=False)
+    print(
+        f"{strat_name}: {len(result.trials)} trials with {args.sampler}, "
+        f"best by {args.metric}: {json.dumps(result.best, sort_keys=True)}"
+    )
+    return result.summary
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run a strategy back-test")
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument("--strategy", help="Strategy module name")
     group.add_argument("--all", action="store_true", help="Run all strategies")
-    parser.add_argument("--ticker", required=True, help="Ticker symbol")
+    universe = parser.add_mutually_exclusive_group(required=True)
+    universe.add_argument("--ticker", help="Ticker symbol")
+    universe.add_argument("--tickers", help="Comma separated ticker symbols")
+    universe.add_argument(
+        "--universe-file", help="File with one ticker per line (or comma separated)"
+    )
     parser.add_argument("--start", required=True, help="Start date YYYY-MM-DD")
     parser.add_argument("--end", required=True, help="End date YYYY-MM-DD")
+    parser.add_argument(
+        "--interval", default=DAILY, choices=INTERVALS, help="Bar interval"
+    )
+    parser.add_argument(
+        "--resample",
+        metavar="RULE",
+        help="Aggregate the bars into periods such as 1D or W-FRI while streaming",
+    )
     parser.add_argument("--params", default="{}", help="JSON encoded parameters")
     parser.add_argument("--sweep", action="store_true", help="Run parameter sweep")
+    parser.add_argument(
+        "--constraint",
+        action="append",
+        default=[],
+        metavar="EXPR",
+        help='Skip grid parameter sets breaking EXPR, e.g. "fast < slow" (repeatable)',
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Generate the sweep grid lazily and append rows to disk per chunk",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Back-tests per streamed sweep chunk",
+    )
+    parser.add_argument(
+        "--walk-forward",
+        action="store_true",
+        help="Choose grid parameters per rolling window and test them out of sample",
+    )
+    parser.add_argument(
+        "--train-bars", type=int, default=504, help="Walk-forward training bars"
+    )
+    parser.add_argument(
+        "--test-bars", type=int, default=126, help="Walk-forward test bars"
+    )
+    parser.add_argument(
+        "--metric",
+        default="sharpe",
+        choices=TEAR_SHEET_METRICS,
+        help="Metric that selects walk-forward and sampled sweep parameters",
+    )
+    parser.add_argument(
+        "--sampler",
+        default="grid",
+        choices=sorted(SAMPLERS),
+        help="How --sweep explores the parameters (default: the full grid)",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        help="Sampled sweep budget in full-history back-tests (default 100)",
+    )
+    parser.add_argument(
+        "--patience",
+        type=int,
+        help="Stop a sampled sweep after N full back-tests without improvement",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Sampler random seed")
+    parser.add_argument(
+        "--search-state",
+        metavar="DIR",
+        help="Save sampled sweeps to DIR/<strategy>.json and resume from there",
+    )
+    parser.add_argument(
+        "--anchored",
+        action="store_true",
+        help="Grow the walk-forward training window from the first bar",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for the back-tests (0 uses every core)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print engine phase timings and strategy call histograms",
+    )
+    parser.add_argument(
+        "--profile-output",
+        metavar="FILE",
+        help="Also write cProfile statistics to FILE (implies --profile)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=str(DEFAULT_CACHE_DIR),
+        help="Directory of the back-test result cache",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always recompute instead of reusing cached results",
+    )
+    parser.add_argument(
+        "--indicator-cache-mb",
+        type=float,
+        default=DEFAULT_INDICATOR_BYTES / 2**20,
+        help="Memory for indicators shared between back-tests (0 disables)",
+    )
+    parser.add_argument(
+        "--cost-bps",
+        type=float,
+        default=0.0,
+        help="Trading cost per unit of traded notional, in basis points",
+    )
+    parser.add_argument(
+        "--commission",
+        type=float,
+        default=0.0,
+        help="Commission per share traded, in price units",
+    )
+    parser.add_argument(
+        "--spread-bps",
+        type=float,
+        default=0.0,
+        help="Bid/ask spread in basis points; every trade crosses half of it",
+    )
+    parser.add_argument(
+        "--borrow-bps",
+        default="0",
+        help="Annual holding cost in bps, one rate or COLUMN=bps,... pairs",
+    )
+    parser.add_argument(
+        "--cash-bps",
+        type=float,
+        default=0.0,
+        help="Annual yield of uninvested equity in basis points",
+    )
     args = parser.parse_args()
+    profile = args.profile or args.profile_output is not None
+    if profile and args.jobs != 1:
+        parser.error("--profile requires --jobs 1")
+    search = args.sweep and (
+        args.sampler != "grid"
+        or args.budget is not None
+        or args.patience is not None
+        or args.search_state is not None
+    )
+    if profile and (args.walk_forward or search):
+        parser.error("--profile cannot be combined with --walk-forward or a sampler")
+    if args.stream and (not args.sweep or search or args.walk_forward or profile):
+        parser.error("--stream needs a grid --sweep without a sampler or --profile")
+    try:
+        constraints = [Constraint(expr) for expr in args.constraint]
+    except ValueError as exc:
+        parser.error(str(exc))
+    try:
+        borrow = parse_borrow(args.borrow_bps)
+    except ValueError as exc:
+        parser.error(str(exc))
+    costs: CostModel | None = CostModel(
+        bps=args.cost_bps,
+        commission_per_share=args.commission,
+        spread_bps=args.spread_bps,
+        borrow_bps=borrow,
+        cash_bps=args.cash_bps,
+    )
+    if costs == CostModel():
+        costs = None
 
+    INDICATORS.resize(int(args.indicator_cache_mb * 2**20))
     base_params: dict[str, Any] = json.loads(args.params)
 
+    if args.ticker:
+        tickers = [args.ticker]
+    elif args.tickers:
+        tickers = list(dict.fromkeys(t.strip() for t in args.tickers.split(",")))
+        tickers = [t for t in tickers if t]
+    else:
+        tickers = read_universe(args.universe_file)
+    if not tickers:
+        parser.error("no tickers given")
+
     default_grids: dict[str, dict[str, list[float]]] = {
         "leveragedtrend": {"sma_len": [150, 200, 250]},
         "hfea55": {"rebalance_days": [20, 21, 22]},
@@ -75,40 +361,160 @@ def main() -> None:
         strategies = list(STRATEGIES.keys())
     else:
         strategies = [args.strategy]
+    for strat_name in strategies:
+        if strat_name not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strat_name}")
+
+    expand = args.sweep or args.walk_forward
+    spaces: dict[str, dict[str, Any]] = {}
+    checks: dict[str, list[Constraint]] = {}
+    for strat_name in strategies:
+        params_for_strat = base_params or (
+            default_grids.get(strat_name, {}) if expand else {}
+        )
+        spaces[strat_name] = params_for_strat
+        # With --all a constraint only applies to the strategies it names.
+        given = [c for c in constraints if c.names <= params_for_strat.keys()]
+        if not args.all and len(given) < len(constraints):
+            missing = next(c for c in constraints if c not in given)
+            parser.error(f"constraint {missing.expr!r} names unknown parameters")
+        checks[strat_name] = given + strategy_constraints(strat_name, params_for_strat)
+
+    def param_sets(strat_name: str) -> Iterable[dict[str, Any]]:
+        if not expand:
+            return [spaces[strat_name]]
+        return iter_param_grid(spaces[strat_name], checks[strat_name])
 
-    summary: list[tuple[str, str, float, float]] = []
     results_dir = Path("results")
     results_dir.mkdir(exist_ok=True)
 
-    for strat_name in strategies:
-        params_for_strat = base_params or (
-            default_grids.get(strat_name, {}) if args.sweep else {}
+    downloader = DataDownloader(interval=args.interval)
+    try:
+        if args.resample:
+            data = downloader.get_resampled(
+                tickers, args.start, args.end, args.resample
+            )
+        else:
+            data = downloader.get_histories(tickers, args.start, args.end)
+    except DownloadError as exc:
+        if not exc.results:
+            raise
+        for ticker, error in exc.errors.items():
+            print(f"Skipping {ticker}: {error}", file=sys.stderr)
+        data = exc.results
+    if costs is not None and data:
+        # annual borrow and cash rates accrue per bar of the loaded interval
+        bars = periods_per_year(next(iter(data.values())).index)
+        costs = costs._replace(periods_per_year=bars)
+    tasks = (
+        SweepTask(strat_name, params, ticker)
+        for strat_name in ([] if search else strategies)
+        for params in param_sets(strat_name)
+        for ticker in tickers
+        if ticker in data
+    )
+    # Cached back-tests never reach the engine, so profiling recomputes all.
+    cache = None if args.no_cache or profile else ResultCache(args.cache_dir)
+    if args.walk_forward:
+        for strat_name in strategies:
+            for name, frame in data.items():
+                grid = generate_param_grid(spaces[strat_name], checks[strat_name])
+                _walk_forward(args, strat_name, grid, name, frame, cache, costs)
+        return
+
+    profiler = (
+        BacktestProfiler(allocations=True, cprofile=args.profile_output is not None)
+        if profile
+        else None
+    )
+    if args.stream:
+        written = stream_sweep(
+            tasks,
+            data,
+            args.start,
+            args.end,
+            results_dir,
+            jobs=args.jobs,
+            chunk_size=args.chunk_size,
+            cache=cache,
+            costs=costs,
+        )
+        print(f"Wrote {written} sweep rows to {results_dir}/sweep_<ticker>.csv")
+        return
+    if search:
+        summary = pd.concat(
+            [
+                _search(args, strat_name, spaces[strat_name], data, cache, costs)
+                for strat_name in strategies
+            ],
+            ignore_index=True,
         )
-        param_sets = (
-            generate_param_grid(params_for_strat)
-            if args.sweep
-            else [params_for_strat]
+    elif args.all and not args.sweep and args.jobs == 1:
+        # One pass over each ticker's bars drives every strategy.
+        with profiler or contextlib.nullcontext():
+            summary = run_strategies(
+                tasks,
+                data,
+                args.start,
+                args.end,
+                results_dir=results_dir,
+                profiler=profiler,
+                cache=cache,
+                costs=costs,
+            )
+    elif len(data) > 1 and args.jobs == 1:
+        # The tickers of every parameter set share one engine batch.
+        with profiler or contextlib.nullcontext():
+            summary = run_universe(
+                tasks,
+                data,
+                args.start,
+                args.end,
+                results_dir=None if args.sweep else results_dir,
+                profiler=profiler,
+                cache=cache,
+                costs=costs,
+            )
+    else:
+        with profiler or contextlib.nullcontext():
+            summary = run_sweep(
+                tasks,
+                data,
+                args.start,
+                args.end,
+                jobs=args.jobs,
+                results_dir=None if args.sweep else results_dir,
+                profiler=profiler,
+                cache=cache,
+                costs=costs,
+            )
+    if args.sweep:
+        for symbol, rows in summary.groupby("ticker", sort=False):
+            rows.to_csv(results_dir / f"sweep_{symbol}.csv", index=False)
+    batch = len(tickers) > 1
+    if batch:
+        summary.to_csv(results_dir / "batch_summary.csv", index=False)
+
+    print("strategy  " + ("ticker    " if batch else "") + "params    CAGR     MaxDD")
+    for row in summary.itertuples(index=False):
+        label = f"{row.ticker:<9} " if batch else ""
+        print(
+            f"{row.strategy:<8} {label}{row.paramhash:<8} "
+            f"{row.cagr:>7.2%} {row.max_drawdown:>9.2%}"
+        )
+
+    if profiler is not None:
+        print()
+        print(profiler.report())
+        stats = INDICATORS.stats()
+        print(
+            f"Indicator cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['evictions']} evictions, {stats['entries']} entries "
+            f"({stats['bytes'] / 2**20:.1f} MiB)"
         )
-        for params in param_sets:
-            strategy = load_strategy(strat_name, params)
-            downloader = DataDownloader()
-            data = downloader.get_history(args.ticker, args.start, args.end)
-            backtester = Backtester(strategy, data)
-            results = backtester.run()
-
-            cagr_value = cagr(results["equity"], args.start, args.end)
-            max_dd = max_drawdown(results["drawdown"])
-
-            paramhash = hashlib.md5(
-                json.dumps(params, sort_keys=True).encode()
-            ).hexdigest()[:8]
-            out_file = results_dir / f"{strat_name}_{paramhash}_{args.ticker}.csv"
-            results.to_csv(out_file)
-            summary.append((strat_name, paramhash, cagr_value, max_dd))
-
-    print("strategy  params    CAGR     MaxDD")
-    for strat, phash, cg, dd in summary:
-        print(f"{strat:<8} {phash:<8} {cg:>7.2%} {dd:>9.2%}")
+        if args.profile_output is not None:
+            profiler.dump_stats(args.profile_output)
+            print(f"Wrote cProfile statistics to {args.profile_output}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from benchmarks import (  # noqa: E402
+    BAR_COUNTS,
+    KINDS,
+    TICKER_COUNTS,
+    Regression,
+    build_cases,
+    compare,
+    run_benchmarks,
+)
+
+
+def _print_result(name: str, result: dict[str, float]) -> None:
+    memory = f"{result['peak_mib']:>9.1f} MiB" if "peak_mib" in result else ""
+    if "result_mib" in result:
+        memory += f" {result['result_mib']:>9.1f} MiB results"
+    print(f"{name:<45} {result['bars_per_sec']:>14,.0f} bars/s {memory}")
+
+
+def _report(regressions: list[Regression], threshold: float) -> int:
+    if not regressions:
+        print(f"No regressions beyond {threshold:.0%}")
+        return 0
+    print(f"{len(regressions)} regression(s) beyond {threshold:.0%}:")
+    for reg in regressions:
+        print(
+            f"  {reg.case:<45} {reg.metric:<12} "
+            f"{reg.baseline:>14,.1f} -> {reg.current:>14,.1f} ({reg.change:+.1%})"
+        )
+    return 1
+
+
+def _load(path: str) -> dict[str, Any]:
+    with open(path) as fh:
+        data: dict[str, Any] = json.load(fh)
+    return data
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the back-test engine")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run benchmarks and write a JSON baseline")
+    run.add_argument("--bars", type=int, nargs="+", default=list(BAR_COUNTS))
+    run.add_argument("--tickers", type=int, nargs="+", default=list(TICKER_COUNTS))
+    run.add_argument("--strategies", nargs="+", help="Strategies to benchmark")
+    run.add_argument("--kinds", nargs="+", default=list(KINDS), choices=KINDS)
+    run.add_argument(
+        "--repeat", type=int, default=1, help="Keep the best of N timings"
+    )
+    run.add_argument(
+        "--no-memory", action="store_true", help="Skip peak memory tracing"
+    )
+    run.add_argument("--output", default="benchmarks.json", help="Result file")
+    run.add_argument("--compare", help="Baseline to compare the results with")
+    run.add_argument("--threshold", type=float, default=0.1)
+
+    cmp = sub.add_parser("compare", help="Compare results with a baseline")
+    cmp.add_argument("baseline", help="Baseline JSON file")
+    cmp.add_argument("current", help="Current JSON file")
+    cmp.add_argument("--threshold", type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        regressions = compare(_load(args.baseline), _load(args.current), args.threshold)
+        return _report(regressions, args.threshold)
+
+    cases = build_cases(args.bars, args.tickers, args.strategies, args.kinds)
+    results = run_benchmarks(
+        cases,
+        memory=not args.no_memory,
+        repeat=args.repeat,
+        progress=_print_result,
+    )
+    Path(args.output).write_text(json.dumps(results, indent=2, sort_keys=True))
+    print(f"Wrote {args.output}")
+    if args.compare:
+        regressions = compare(_load(args.compare), results, args.threshold)
+        return _report(regressions, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import cast
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from result_cache import DEFAULT_CACHE_DIR, ResultCache  # noqa: E402
+from strategies import STRATEGIES  # noqa: E402
+from strategies.base import Strategy  # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the back-test result cache")
+    parser.add_argument(
+        "--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Cache directory"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("info", help="Show the entries and size per strategy")
+    clear = sub.add_parser("clear", help="Invalidate cached results")
+    clear.add_argument(
+        "--strategy",
+        choices=sorted(STRATEGIES),
+        help="Only drop the results of this strategy",
+    )
+    prune = sub.add_parser("prune", help="Evict least recently used results")
+    prune.add_argument(
+        "--max-mb", type=float, required=True, help="Size to shrink the cache to"
+    )
+
+    args = parser.parse_args(argv)
+    cache = ResultCache(args.cache_dir)
+
+    if args.command == "clear":
+        target = None if args.strategy is None else STRATEGIES[args.strategy]
+        removed = cache.invalidate(cast("type[Strategy] | None", target))
+        print(f"Removed {removed} cached result(s)")
+    elif args.command == "prune":
+        removed = cache.prune(int(args.max_mb * 2**20))
+        print(f"Evicted {removed} cached result(s)")
+    else:
+        counts: Counter[str] = Counter()
+        sizes: Counter[str] = Counter()
+        for entry in cache.entries():
+            counts[entry.strategy] += 1
+            sizes[entry.strategy] += entry.size
+        for name in sorted(counts):
+            print(f"{name:<30} {counts[name]:>6} {sizes[name] / 2**20:>9.1f} MiB")
+        total = sum(sizes.values()) / 2**20
+        print(f"{'total':<30} {sum(counts.values()):>6} {total:>9.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -29,23 +29,25 @@ def fetch(
         tickers: A ticker symbol or list of symbols.
         start: ISO formatted start date.
         end: ISO formatted end date. Defaults to today when ``None``.
-        interval: Bar interval (unused, kept for API compatibility).
+        interval: Bar interval, one of :data:`data.INTERVALS`. Intraday bars
+            are cached separately from daily ones.
         ucits_map: Map symbols to their UCITS equivalent when ``True``.
 
     Returns:
         Mapping of canonical ticker to :class:`pandas.DataFrame` with OHLCV data.
+
+    Raises:
+        DownloadError: If any ticker fails to download. Tickers are fetched
+            concurrently and every failure is reported together.
     """
     symbols = [tickers] if isinstance(tickers, str) else list(tickers)
     if end is None:
         end = datetime.utcnow().date().isoformat()
 
-    downloader = DataDownloader()
-    result: dict[str, pd.DataFrame] = {}
-    for sym in symbols:
-        remote = _UCITS.get(sym, sym) if ucits_map else sym
-        df = downloader.get_history(remote, start, end)
-        result[sym] = df
-    return result
+    remotes = {sym: _UCITS.get(sym, sym) if ucits_map else sym for sym in symbols}
+    downloader = DataDownloader(interval=interval)
+    frames = downloader.get_histories(remotes.values(), start, end)
+    return {sym: frames[remote] for sym, remote in remotes.items()}
 
 
 def _main() -> None:
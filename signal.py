@@ -10,10 +10,20 @@ sys.modules["signal"] = _signal
 sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
 
 from data import DataDownloader  # noqa: E402
+from live import (  # noqa: E402
+    BarSource,
+    DropDirectorySource,
+    SignalChange,
+    SignalDaemon,
+    WarehouseSource,
+)
 import strategies  # noqa: E402
 from strategies.base import Strategy  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
 from typing import cast  # noqa: E402
 
+import pandas as pd  # noqa: E402
+
 _all_strategies: list[str] = cast(list[str], getattr(strategies, "__all__", []))
 
 STRATEGIES = {
@@ -30,6 +40,12 @@ def load_strategy(name: str) -> Strategy:
     return cast(type[Strategy], cls)()
 
 
+def _print_change(change: SignalChange) -> None:
+    signal = change.signal if isinstance(change.signal, str) else "N/A"
+    stamp = f"{change.timestamp:%Y-%m-%d %H:%M:%S}"
+    print(f"{stamp} {change.strategy}: {signal}", flush=True)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Show latest trading signal")
     group = parser.add_mutually_exclusive_group(required=True)
@@ -42,14 +58,31 @@ def main() -> None:
         default=365,
         help="Lookback period in days",
     )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep running and print signal changes as new bars arrive",
+    )
+    feed = parser.add_mutually_exclusive_group()
+    feed.add_argument("--drop-dir", help="Directory polled for new bar files")
+    feed.add_argument("--warehouse", help="Warehouse directory polled for new bars")
+    parser.add_argument(
+        "--poll-seconds", type=float, default=60.0, help="Seconds between polls"
+    )
+    parser.add_argument(
+        "--max-polls", type=int, help="Stop following after this many polls"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        help="Strategy state file to resume from and keep up to date",
+    )
     args = parser.parse_args()
+    if args.follow and not (args.drop_dir or args.warehouse):
+        parser.error("--follow requires --drop-dir or --warehouse")
 
     end = datetime.utcnow().date()
     start = end - timedelta(days=args.lookback)
 
-    downloader = DataDownloader()
-    data = downloader.get_history(args.ticker, str(start), str(end))
-
     strat_names: list[str]
     if args.all:
         strat_names = list(STRATEGIES.keys())
@@ -57,17 +90,53 @@ def main() -> None:
         assert args.strategy is not None
         strat_names = [args.strategy]
 
+    live: dict[str, Strategy] = {}
     for name in strat_names:
         try:
-            strategy = load_strategy(name)
+            live[name] = load_strategy(name)
         except TypeError:
             print(f"{name}: N/A")
-            continue
-        signal_value: str | dict[str, float] = "HOLD"
-        for _, bar in data.iterrows():
-            signal_value = strategy.next_bar(bar)
-        out = signal_value if isinstance(signal_value, str) else "N/A"
-        print(f"{name}: {out}")
+
+    store = Warehouse(args.warehouse) if args.warehouse else None
+    source: BarSource | None = None
+    if store is not None:
+        source = WarehouseSource(store, args.ticker)
+    elif args.drop_dir:
+        source = DropDirectorySource(args.drop_dir)
+    daemon = SignalDaemon(live, source, on_change=_print_change)
+    if args.checkpoint and daemon.load_checkpoint(args.checkpoint):
+        assert daemon.last_timestamp is not None
+        start = daemon.last_timestamp.date()
+
+    if store is not None and store.manifest(args.ticker) is not None:
+        data = store.read(args.ticker, start=str(start))
+    elif start <= end:
+        downloader = DataDownloader()
+        data = downloader.get_history(args.ticker, str(start), str(end))
+    else:
+        data = pd.DataFrame()
+
+    if not (args.follow or args.checkpoint):
+        for name, strategy in live.items():
+            signals = strategy.generate_signals(data)
+            signal_value = signals.iloc[-1] if len(signals) else "HOLD"
+            out = signal_value if isinstance(signal_value, str) else "N/A"
+            print(f"{name}: {out}")
+        return
+
+    daemon.warmup(data)
+    if args.checkpoint:
+        daemon.save_checkpoint(args.checkpoint)
+    for name, signal in daemon.signals.items():
+        signal = "HOLD" if signal is None else signal
+        out = signal if isinstance(signal, str) else "N/A"
+        print(f"{name}: {out}", flush=True)
+    if args.follow:
+        daemon.checkpoint = args.checkpoint
+        try:
+            daemon.run(args.poll_seconds, max_polls=args.max_polls)
+        except KeyboardInterrupt:
+            pass
 
 
 if __name__ == "__main__":
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import platform
+import time
+import tracemalloc
+from typing import Any, Callable, Iterable, Iterator, Mapping, NamedTuple, cast
+
+import numpy as np
+import pandas as pd
+
+from data import DataDownloader
+from engine import Backtester
+from strategies import STRATEGIES
+from strategies.base import Strategy
+from sweep import SweepTask, generate_param_grid, run_sweep
+
+BAR_COUNTS = (1_000, 10_000, 100_000)
+TICKER_COUNTS = (1, 10, 100)
+KINDS = ("run", "vectorized", "next_bar", "normalize", "sweep")
+BASELINE_VERSION = 2
+
+# Grids swept by the ``sweep`` benchmark; strategies without one are skipped.
+SWEEP_GRIDS: dict[str, dict[str, Any]] = {
+    "rsi": {"rsi_buy": [20, 30, 40], "rsi_sell": [60, 70, 80]},
+    "bollinger": {"length": [10, 20, 30], "dev": [1.5, 2.0]},
+    "leveragedtrend": {"sma_len": [150, 200, 250]},
+}
+
+HFEA_ASSETS = ("3USL", "3TYL")
+
+
+def synthetic_ohlcv(
+    bars: int, seed: int = 0, start: str = "1850-01-01"
+) -> pd.DataFrame:
+    """Return *bars* business days of deterministic random-walk OHLCV data.
+
+    The columns match :meth:`DataDownloader.get_history` for one ticker. The
+    index starts in 1850 so that 100k business days stay inside the
+    ``datetime64[ns]`` range.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0.0002, 0.01, bars)))
+    open_ = close * np.exp(rng.normal(0.0, 0.003, bars))
+    spread = np.abs(rng.normal(0.0, 0.005, bars))
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.integers(1_000_000, 5_000_000, bars).astype(float)
+    # ``bdate_range`` overflows a Timedelta beyond ~100k business days
+    days = np.busday_offset(np.datetime64(start, "D"), np.arange(bars), "forward")
+    index = pd.DatetimeIndex(days.astype("M8[ns]"), name="date")
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "adj_close": close,
+            "volume": volume,
+        },
+        index=index,
+    )
+
+
+def synthetic_intraday(
+    days: int, bars_per_day: int = 390, seed: int = 0, start: str = "2024-01-02"
+) -> pd.DataFrame:
+    """Return *days* business days of one-minute bars from 09:30 onwards.
+
+    The bars are :func:`synthetic_ohlcv` bars re-stamped onto the minutes of
+    a regular session of *bars_per_day* bars.
+    """
+    frame = synthetic_ohlcv(days * bars_per_day, seed)
+    days_ = np.busday_offset(np.datetime64(start, "D"), np.arange(days), "forward")
+    opens = days_.astype("M8[m]") + np.timedelta64(9 * 60 + 30, "m")
+    minutes = opens[:, None] + np.arange(bars_per_day).astype("m8[m]")
+    frame.index = pd.DatetimeIndex(minutes.ravel().astype("M8[ns]"), name="date")
+    return frame
+
+
+def _universe(bars: int, tickers: Iterable[str], seed: int) -> pd.DataFrame:
+    closes = {
+        t: synthetic_ohlcv(bars, seed + i)["close"] for i, t in enumerate(tickers)
+    }
+    return pd.DataFrame(closes)
+
+
+class BenchmarkCase(NamedTuple):
+    """One benchmark: ``run`` is timed once for every item of ``items()``.
+
+    ``bars`` is the number of bars processed over all items and is used to
+    compute the throughput.
+    """
+
+    name: str
+    bars: int
+    items: Callable[[], Iterator[Any]]
+    run: Callable[[Any], object]
+
+
+def _strategy_cases(
+    name: str, cls: Callable[..., Strategy], bars: int, tickers: int
+) -> Iterator[BenchmarkCase]:
+    """Yield the ``run``, ``vectorized`` and ``next_bar`` cases of a strategy.
+
+    Single-asset strategies are run once per ticker. ``dualmomentum`` ranks
+    one universe of *tickers* assets and ``hfea55`` rebalances its two assets
+    once per ticker.
+    """
+    label = f"{name}/{bars}x{tickers}"
+    if name == "dualmomentum":
+        symbols = [f"T{i:03d}" for i in range(tickers)]
+
+        def make() -> Strategy:
+            return cls(symbols)
+
+        def frames() -> Iterator[tuple[Callable[[], Strategy], pd.DataFrame]]:
+            yield make, _universe(bars, symbols, 0)
+
+    else:
+
+        def frames() -> Iterator[tuple[Callable[[], Strategy], pd.DataFrame]]:
+            for i in range(tickers):
+                if name == "hfea55":
+                    yield cls, _universe(bars, HFEA_ASSETS, 2 * i)
+                else:
+                    yield cls, synthetic_ohlcv(bars, i)
+
+    def bar_rows() -> Iterator[tuple[Callable[[], Strategy], list[pd.Series[Any]]]]:
+        for factory, frame in frames():
+            yield factory, [bar for _, bar in frame.iterrows()]
+
+    def replay(item: tuple[Callable[[], Strategy], list[pd.Series[Any]]]) -> None:
+        factory, rows = item
+        strategy = factory()
+        for bar in rows:
+            strategy.next_bar(bar)
+
+    total = bars * (1 if name == "dualmomentum" else tickers)
+    yield BenchmarkCase(
+        f"run/{label}", total, frames, lambda item: Backtester(item[0](), item[1]).run()
+    )
+    yield BenchmarkCase(
+        f"vectorized/{label}",
+        total,
+        frames,
+        lambda item: Backtester(item[0](), item[1]).run_vectorized(),
+    )
+    yield BenchmarkCase(f"next_bar/{label}", total, bar_rows, replay)
+
+
+def _normalize_case(bars: int, tickers: int) -> BenchmarkCase:
+    def raw_frames() -> Iterator[pd.DataFrame]:
+        for i in range(tickers):
+            frame = synthetic_ohlcv(bars, i)
+            frame.columns = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+            yield frame
+
+    return BenchmarkCase(
+        f"normalize/{bars}x{tickers}",
+        bars * tickers,
+        raw_frames,
+        lambda raw: DataDownloader._normalize(raw, "bench"),
+    )
+
+
+def _sweep_case(name: str, bars: int, tickers: int) -> BenchmarkCase:
+    grid = generate_param_grid(SWEEP_GRIDS[name])
+    symbols = [f"T{i:03d}" for i in range(tickers)]
+
+    def universes() -> Iterator[dict[str, pd.DataFrame]]:
+        for i, symbol in enumerate(symbols):
+            yield {symbol: synthetic_ohlcv(bars, i)}
+
+    def sweep(data: dict[str, pd.DataFrame]) -> None:
+        (symbol,) = data
+        tasks = [SweepTask(name, params, symbol) for params in grid]
+        run_sweep(tasks, data, "1850-01-01", "2250-01-01", jobs=1)
+
+    return BenchmarkCase(
+        f"sweep/{name}/{bars}x{tickers}",
+        bars * tickers * len(grid),
+        universes,
+        sweep,
+    )
+
+
+def build_cases(
+    bar_counts: Iterable[int] = BAR_COUNTS,
+    ticker_counts: Iterable[int] = TICKER_COUNTS,
+    strategies: Iterable[str] | None = None,
+    kinds: Iterable[str] = KINDS,
+) -> list[BenchmarkCase]:
+    """Return the benchmark matrix for the given sizes, strategies and kinds."""
+    names = list(STRATEGIES) if strategies is None else list(strategies)
+    unknown = set(names) - set(STRATEGIES)
+    if unknown:
+        raise ValueError(f"Unknown strategy: {sorted(unknown)[0]}")
+    selected = set(kinds)
+    unknown = selected - set(KINDS)
+    if unknown:
+        raise ValueError(f"Unknown benchmark kind: {sorted(unknown)[0]}")
+
+    cases: list[BenchmarkCase] = []
+    for bars in bar_counts:
+        for tickers in ticker_counts:
+            for name in names:
+                cls = cast(type[Strategy], STRATEGIES[name])
+                cases.extend(
+                    case
+                    for case in _strategy_cases(name, cls, bars, tickers)
+                    if case.name.split("/")[0] in selected
+                )
+                if "sweep" in selected and name in SWEEP_GRIDS:
+                    cases.append(_sweep_case(name, bars, tickers))
+            if "normalize" in selected:
+                cases.append(_normalize_case(bars, tickers))
+    return cases
+
+
+def measure(
+    case: BenchmarkCase, memory: bool = True, repeat: int = 1
+) -> dict[str, float]:
+    """Time *case* and return its throughput and peak traced memory.
+
+    Items are built outside the timed region and each item counts with its
+    best time of *repeat* runs. With *memory* every item is run once more
+    under :mod:`tracemalloc`, so tracing does not skew the timings, and
+    the deep size of the result frames it returns adds up to ``result_mib``.
+    """
+    seconds = 0.0
+    peak = 0
+    frames = 0
+    returned = False
+    for item in case.items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            case.run(item)
+            best = min(best, time.perf_counter() - start)
+        seconds += best
+        if memory:
+            tracemalloc.start()
+            try:
+                out = case.run(item)
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+            if isinstance(out, pd.DataFrame):
+                frames += int(out.memory_usage(deep=True).sum())
+                returned = True
+    result = {
+        "bars": float(case.bars),
+        "seconds": seconds,
+        "bars_per_sec": case.bars / seconds if seconds else float("inf"),
+    }
+    if memory:
+        result["peak_mib"] = peak / 2**20
+        if returned:
+            result["result_mib"] = frames / 2**20
+    return result
+
+
+def run_benchmarks(
+    cases: Iterable[BenchmarkCase],
+    memory: bool = True,
+    repeat: int = 1,
+    progress: Callable[[str, dict[str, float]], None] | None = None,
+) -> dict[str, Any]:
+    """Measure every case and return a JSON-serializable baseline."""
+    results: dict[str, dict[str, float]] = {}
+    for case in cases:
+        results[case.name] = measure(case, memory, repeat)
+        if progress is not None:
+            progress(case.name, results[case.name])
+    return {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+class Regression(NamedTuple):
+    """A metric of one case that got worse than allowed."""
+
+    case: str
+    metric: str
+    baseline: float
+    current: float
+    change: float
+
+
+def compare(
+    baseline: Mapping[str, Any], current: Mapping[str, Any], threshold: float = 0.1
+) -> list[Regression]:
+    """Return the regressions of *current* against *baseline*.
+
+    A case regresses when its throughput drops, or its peak memory or the
+    size of its result frames grows, by more than *threshold* (a fraction).
+    Cases and metrics missing from either side are ignored.
+    """
+    regressions: list[Regression] = []
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        old, new = before["bars_per_sec"], now["bars_per_sec"]
+        if old > 0 and (old - new) / old > threshold:
+            regressions.append(
+                Regression(name, "bars_per_sec", old, new, (new - old) / old)
+            )
+        for metric in ("peak_mib", "result_mib"):
+            if metric not in before or metric not in now:
+                continue
+            old, new = before[metric], now[metric]
+            if old > 0 and (new - old) / old > threshold:
+                regressions.append(
+                    Regression(name, metric, old, new, (new - old) / old)
+                )
+    return regressions
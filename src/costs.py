@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Mapping, NamedTuple, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+FloatArray = npt.NDArray[np.float64]
+
+
+class CostModel(NamedTuple):
+    """Trading frictions charged by :class:`~engine.Backtester`.
+
+    - *bps* is charged on every unit of traded notional, in basis points.
+    - *commission_per_share* is charged per share traded; as a fraction of
+      equity that is the traded weight divided by the fill price.
+    - *spread_bps* is the quoted bid/ask spread; every trade crosses half
+      of it.
+    - *borrow_bps* is the annual cost of holding a position, e.g. the
+      financing of a leveraged ETF, either one rate for every column or a
+      ``{column: bps}`` mapping. It accrues per bar on the absolute weight.
+    - *cash_bps* is the annual yield of uninvested equity; negative values
+      model a drag on idle cash.
+
+    Annual rates are spread over *periods_per_year* bars. All fields default
+    to zero, which reproduces the frictionless engine exactly.
+    """
+
+    bps: float = 0.0
+    commission_per_share: float = 0.0
+    spread_bps: float = 0.0
+    borrow_bps: float | Mapping[str, float] = 0.0
+    cash_bps: float = 0.0
+    periods_per_year: int = 252
+
+    def trade_rate(self) -> float:
+        """Return the proportional cost of trading one unit of notional."""
+        return (self.bps + self.spread_bps / 2) / 1e4
+
+    def borrow_rates(self, columns: Sequence[str]) -> FloatArray:
+        """Return the per-bar borrow rate of every column."""
+        if isinstance(self.borrow_bps, Mapping):
+            rates = [float(self.borrow_bps.get(col, 0.0)) for col in columns]
+        else:
+            rates = [float(self.borrow_bps)] * len(columns)
+        return np.asarray(rates) / 1e4 / self.periods_per_year
+
+    def turnover_costs(
+        self, before: FloatArray, after: FloatArray, prices: FloatArray
+    ) -> FloatArray:
+        """Return the cost, as a fraction of equity, of every rebalance.
+
+        Row ``k`` of *before* and *after* holds the column weights around
+        rebalance ``k``, filled at the *prices* of the same row. Columns are
+        accumulated in order and untraded ones add nothing, so one row gives
+        bit for bit the result it gets inside a larger batch.
+        """
+        rate = self.trade_rate()
+        cost = np.zeros(len(before))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for j in range(before.shape[1]):
+                traded = np.abs(after[:, j] - before[:, j])
+                paid = traded * rate + traded * self.commission_per_share / prices[:, j]
+                cost = cost + np.where(traded > 0, paid, 0.0)
+        return cost
+
+    def carry(self, holdings: FloatArray, borrow: FloatArray) -> FloatArray:
+        """Return the per-bar cost of holding each row of *holdings*.
+
+        That is the borrow cost of the positions minus the yield of the
+        uninvested remainder. *borrow* comes from :meth:`borrow_rates`.
+        """
+        cash_rate = self.cash_bps / 1e4 / self.periods_per_year
+        paid = np.zeros(len(holdings))
+        invested = np.zeros(len(holdings))
+        for j in range(holdings.shape[1]):
+            paid = paid + np.abs(holdings[:, j]) * borrow[j]
+            invested = invested + holdings[:, j]
+        return paid - (1 - invested) * cash_rate
+
+
+def drift_weights(
+    weights: FloatArray, start_prices: FloatArray, prices: FloatArray
+) -> FloatArray:
+    """Return *weights* set at *start_prices* after prices moved to *prices*.
+
+    Each position grows with its own price while the uninvested remainder
+    stays flat, so a rebalance starts from these weights rather than from
+    the targets it restores. Rows are independent and, as in
+    :meth:`CostModel.turnover_costs`, columns are accumulated in order.
+    """
+    value = np.zeros_like(weights)
+    total = np.ones(len(weights))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for j in range(weights.shape[1]):
+            growth = prices[:, j] / start_prices[:, j]
+            value[:, j] = np.where(weights[:, j] != 0, weights[:, j] * growth, 0.0)
+            total = total - weights[:, j] + value[:, j]
+        drifted = value / total[:, None]
+    return np.where(np.isfinite(drifted), drifted, weights)
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable
+from typing import Any, Callable, Iterable, Iterator, Mapping
 
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import yfinance as yf
 
+from resample import iter_resampled
+from warehouse import Warehouse
+
 # Map of US tickers to their UCITS equivalents
 ticker_map = {
     "UPRO": "3USL",
@@ -15,13 +25,112 @@ ticker_map = {
     "TLT": "IDTL",
 }
 
+DAILY = "1d"
+# Bar intervals understood by Yahoo Finance.
+INTERVALS = (
+    "1m",
+    "2m",
+    "5m",
+    "15m",
+    "30m",
+    "60m",
+    "90m",
+    "1h",
+    "1d",
+    "5d",
+    "1wk",
+    "1mo",
+    "3mo",
+)
+# Rows per parquet row group and per chunk of :meth:`DataDownloader.iter_history`.
+DEFAULT_CHUNK_ROWS = 100_000
+# Bars younger than this may still be missing or provisional at the source,
+# so the cache only counts them as covered up to the last bar it received.
+SETTLE_PERIOD = pd.Timedelta(days=7)
+
+DownloadFunc = Callable[..., pd.DataFrame]
+
+
+def yahoo_download(
+    symbol: str, start: str, end: str, interval: str = DAILY
+) -> pd.DataFrame:
+    """Return raw OHLCV bars of *interval* for *symbol* in ``[start, end)``.
+
+    Uses ``Ticker.history`` rather than ``yf.download``, which keeps the
+    results of each call in module globals and is therefore unsafe to run
+    from several threads at once. Timestamps are returned as naive
+    exchange-local times.
+    """
+    df: pd.DataFrame = yf.Ticker(symbol).history(
+        start=start, end=end, interval=interval, auto_adjust=False, actions=False
+    )
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    return df
+
+
+class DownloadError(ValueError):
+    """Raised when one or more tickers could not be downloaded.
+
+    ``errors`` maps each failed ticker to its exception and ``results``
+    holds the frames of the tickers that succeeded.
+    """
+
+    def __init__(
+        self,
+        errors: Mapping[str, Exception],
+        results: Mapping[str, pd.DataFrame] | None = None,
+    ) -> None:
+        self.errors = dict(errors)
+        self.results = dict(results or {})
+        super().__init__("; ".join(f"{t}: {e}" for t, e in self.errors.items()))
+
 
 class DataDownloader:
-    """Download and cache historical OHLCV data."""
+    """Download and cache historical OHLCV data.
+
+    ``download`` is called as ``download(symbol, start, end)`` and returns
+    raw OHLCV bars; it defaults to :func:`yahoo_download`. Tickers are
+    fetched concurrently by up to ``max_workers`` threads, and a failing
+    download is retried ``retries`` times with exponential ``backoff``
+    seconds between attempts.
 
-    def __init__(self, cache_dir: Path | None = None) -> None:
+    With a :class:`~warehouse.Warehouse` the cache lives in its
+    memory-mapped column files instead of parquet files; new bars at the
+    end of a ticker are appended rather than rewritten.
+
+    *interval* selects the bar size, one of :data:`INTERVALS`. Intraday
+    bars are cached apart from the daily ones, under ``<TICKER>_<interval>``,
+    and passed to ``download`` as an ``interval`` keyword; daily downloads
+    keep the three-argument call.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        download: DownloadFunc | None = None,
+        max_workers: int = 4,
+        retries: int = 2,
+        backoff: float = 0.5,
+        warehouse: Warehouse | None = None,
+        interval: str = DAILY,
+    ) -> None:
+        if interval not in INTERVALS:
+            raise ValueError(f"Unknown interval: {interval}")
         self.cache_dir = cache_dir or Path("data")
         self.cache_dir.mkdir(exist_ok=True)
+        self.download = download or yahoo_download
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.warehouse = warehouse
+        self.interval = interval
+
+    def cache_name(self, ticker: str) -> str:
+        """Return the cache entry of *ticker* at this downloader's interval."""
+        if self.interval == DAILY:
+            return ticker
+        return f"{ticker}_{self.interval}"
 
     @staticmethod
     def _normalize(df: pd.DataFrame, ticker: str) -> pd.DataFrame:
@@ -41,35 +150,197 @@ class DataDownloader:
         df = df[required]
         return df.add_prefix(f"{ticker.lower()}_")
 
-    def get_history(
-        self, ticker: str | Iterable[str], start: str, end: str
+    def _download(
+        self, remote: str, orig: str, start: pd.Timestamp, end: pd.Timestamp
     ) -> pd.DataFrame:
-        """Return historical data for *ticker* between *start* and *end*."""
+        """Download *remote* for ``[start, end)`` normalized under *orig*."""
+        options: dict[str, Any] = {}
+        if self.interval != DAILY:
+            options["interval"] = self.interval
+        for attempt in range(self.retries + 1):
+            try:
+                df = self.download(
+                    remote,
+                    start.strftime("%Y-%m-%d"),
+                    end.strftime("%Y-%m-%d"),
+                    **options,
+                )
+                break
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2**attempt)
+        if df.empty:
+            return df
+        return self._normalize(df, orig)
 
-        tickers = [ticker] if isinstance(ticker, str) else list(ticker)
+    def _load_cache(
+        self, orig: str
+    ) -> tuple[pd.DataFrame, pd.Timestamp, pd.Timestamp] | None:
+        """Return the cached frame of *orig* and its covered date range."""
+        name = self.cache_name(orig)
+        if self.warehouse is not None:
+            coverage = self.warehouse.coverage(name)
+            if coverage is None:
+                return None
+            cached = self.warehouse.read(name).add_prefix(f"{orig.lower()}_")
+            return cached, coverage[0], coverage[1]
+
+        cache_file = self.cache_dir / f"{name}.parquet"
+        if not cache_file.exists():
+            return None
+        cached = pd.read_parquet(cache_file)
+        attrs, cached.attrs = cached.attrs, {}
+        if "start" not in attrs or "end" not in attrs:
+            return None
+        return cached, pd.Timestamp(attrs["start"]), pd.Timestamp(attrs["end"])
+
+    def _coverage(self, orig: str) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        """Return the date range cached for *orig* without loading its bars."""
+        name = self.cache_name(orig)
+        if self.warehouse is not None:
+            return self.warehouse.coverage(name)
+        cache_file = self.cache_dir / f"{name}.parquet"
+        if not cache_file.exists():
+            return None
+        metadata = pq.read_schema(cache_file).metadata or {}
+        attrs = json.loads(metadata.get(b"PANDAS_ATTRS", b"{}"))
+        if "start" not in attrs or "end" not in attrs:
+            return None
+        return pd.Timestamp(attrs["start"]), pd.Timestamp(attrs["end"])
 
-        remote_map = {t: ticker_map.get(t, t) for t in tickers}
+    def _store_cache(
+        self,
+        orig: str,
+        combined: pd.DataFrame,
+        covered: tuple[pd.Timestamp, pd.Timestamp],
+        appended_from: pd.Timestamp | None,
+    ) -> None:
+        """Persist *combined* as the cache of *orig* covering *covered*.
 
-        dfs: list[pd.DataFrame] = []
-        for orig, remote in remote_map.items():
-            cache_file = self.cache_dir / f"{orig}-{start}-{end}.parquet"
-            if cache_file.exists():
-                df_t = pd.read_parquet(cache_file)
+        When only bars from *appended_from* onwards are new, the warehouse
+        appends them instead of rewriting the ticker.
+        """
+        name = self.cache_name(orig)
+        if self.warehouse is not None:
+            prefix = f"{orig.lower()}_"
+            frame = combined.rename(columns=lambda c: c.removeprefix(prefix))
+            if appended_from is None:
+                self.warehouse.write(name, frame, *covered)
             else:
-                df_t = yf.download(
-                    remote,
-                    start=start,
-                    end=end,
-                    progress=False,
-                    auto_adjust=False,
+                tail = frame[frame.index >= appended_from]
+                self.warehouse.append(name, tail, end=covered[1])
+            return
+
+        cache_file = self.cache_dir / f"{name}.parquet"
+        combined.attrs = {
+            "start": covered[0].strftime("%Y-%m-%d"),
+            "end": covered[1].strftime("%Y-%m-%d"),
+        }
+        # a unique temporary file per writer, so concurrent threads and
+        # processes never write into each other's file before the rename
+        with tempfile.NamedTemporaryFile(
+            dir=self.cache_dir, prefix=f"{name}.", suffix=".tmp", delete=False
+        ) as tmp:
+            tmp_file = Path(tmp.name)
+        try:
+            # row groups let :meth:`iter_history` stream the file in chunks
+            combined.to_parquet(tmp_file, row_group_size=DEFAULT_CHUNK_ROWS)
+            os.replace(tmp_file, cache_file)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+        finally:
+            combined.attrs = {}
+
+    def _cached_history(
+        self, orig: str, remote: str, start: str, end: str
+    ) -> pd.DataFrame:
+        """Return the canonical cache of *orig* extended to ``start``..``end``.
+
+        Each ticker has one cache entry recording the covered date range.
+        Only the head and tail segments missing from that range are
+        downloaded and merged in, so the covered range stays contiguous.
+        Within :data:`SETTLE_PERIOD` of today the range only extends to the
+        last bar received, so a bar that was not yet published, or only
+        provisionally, is downloaded again by the next call.
+        """
+        start_ts, end_ts = pd.Timestamp(start), pd.Timestamp(end)
+
+        parts: list[pd.DataFrame] = []
+        segments = [(start_ts, end_ts)]
+        covered = (start_ts, end_ts)
+        appended_from: pd.Timestamp | None = None
+        loaded = self._load_cache(orig)
+        if loaded is not None:
+            cached, cached_start, cached_end = loaded
+            parts.append(cached)
+            segments = []
+            if start_ts < cached_start:
+                segments.append((start_ts, cached_start))
+            if end_ts > cached_end:
+                segments.append((cached_end, end_ts))
+                if start_ts >= cached_start:
+                    appended_from = cached_end
+            covered = (min(start_ts, cached_start), max(end_ts, cached_end))
+        if not segments:
+            return parts[0]
+
+        for seg_start, seg_end in segments:
+            df_t = self._download(remote, orig, seg_start, seg_end)
+            if not df_t.empty:
+                parts.append(df_t)
+        if not parts:
+            raise ValueError(f"No data returned for ticker '{remote}'")
+
+        combined = pd.concat(parts) if len(parts) > 1 else parts[0]
+        combined = combined[~combined.index.duplicated(keep="last")].sort_index()
+        if appended_from is not None and _revised(parts[0], combined, appended_from):
+            # the warehouse cannot update stored bars in place
+            appended_from = None
+        covered = (covered[0], _settled_end(combined, covered[1]))
+        self._store_cache(orig, combined, covered, appended_from)
+        return combined
+
+    def _fetch_all(
+        self, tickers: list[str], start: str, end: str
+    ) -> tuple[dict[str, pd.DataFrame], dict[str, Exception]]:
+        """Return cached histories of *tickers*, fetching them concurrently."""
+        frames: dict[str, pd.DataFrame] = {}
+        errors: dict[str, Exception] = {}
+        workers = max(1, min(self.max_workers, len(tickers)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                t: pool.submit(
+                    self._cached_history, t, ticker_map.get(t, t), start, end
                 )
-                if df_t.empty:
-                    raise ValueError(f"No data returned for ticker '{remote}'")
-                df_t = self._normalize(df_t, orig)
-                df_t.to_parquet(cache_file)
-            dfs.append(df_t)
+                for t in tickers
+            }
+            for t, future in futures.items():
+                try:
+                    frames[t] = future.result()
+                except Exception as exc:
+                    errors[t] = exc
+        return frames, errors
+
+    def get_history(
+        self, ticker: str | Iterable[str], start: str, end: str
+    ) -> pd.DataFrame:
+        """Return historical data for *ticker* between *start* and *end*.
+
+        Data is served from the per-ticker cache; only dates outside the
+        range cached so far are downloaded. Raises :class:`DownloadError`
+        if any ticker fails.
+        """
 
-        combined = pd.concat(dfs, axis=1)
+        tickers = [ticker] if isinstance(ticker, str) else list(ticker)
+        tickers = list(dict.fromkeys(tickers))
+
+        frames, errors = self._fetch_all(tickers, start, end)
+        if errors:
+            raise DownloadError(errors)
+
+        combined = pd.concat([frames[t] for t in tickers], axis=1)
         combined.index.name = "date"
         combined = combined.sort_index()
 
@@ -78,3 +349,172 @@ class DataDownloader:
             combined = combined.rename(columns=lambda c: c.removeprefix(prefix))
 
         return combined.loc[pd.Timestamp(start) : pd.Timestamp(end)]
+
+    def get_histories(
+        self, tickers: Iterable[str], start: str, end: str
+    ) -> dict[str, pd.DataFrame]:
+        """Return one unprefixed OHLCV frame per ticker of *tickers*.
+
+        Tickers are fetched concurrently. Failures are collected per ticker
+        and raised together as a :class:`DownloadError` whose ``results``
+        hold the frames that did load.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        frames, errors = self._fetch_all(tickers, start, end)
+        results: dict[str, pd.DataFrame] = {}
+        for t in tickers:
+            if t not in frames:
+                continue
+            prefix = f"{t.lower()}_"
+            df = frames[t].rename(columns=lambda c: c.removeprefix(prefix))
+            results[t] = df.loc[pd.Timestamp(start) : pd.Timestamp(end)]
+        if errors:
+            raise DownloadError(errors, results)
+        return results
+
+    def iter_history(
+        self,
+        ticker: str,
+        start: str,
+        end: str,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the unprefixed bars of *ticker* in frames of *chunk_rows* rows.
+
+        The cache is extended to ``start``..``end`` first if needed; the bars
+        are then streamed from it, parquet row group by row group or as
+        slices of the warehouse columns, so a long intraday history never
+        has to fit in memory at once. Concatenated, the frames equal
+        ``get_histories([ticker], start, end)[ticker]``.
+        """
+        start_ts, end_ts = pd.Timestamp(start), pd.Timestamp(end)
+        coverage = self._coverage(ticker)
+        if coverage is None or start_ts < coverage[0] or end_ts > coverage[1]:
+            self._cached_history(ticker, ticker_map.get(ticker, ticker), start, end)
+
+        name = self.cache_name(ticker)
+        if self.warehouse is not None:
+            yield from self.warehouse.iter_read(name, start_ts, end_ts, rows=chunk_rows)
+            return
+
+        prefix = f"{ticker.lower()}_"
+        parquet = pq.ParquetFile(self.cache_dir / f"{name}.parquet")
+        for batch in parquet.iter_batches(batch_size=chunk_rows):
+            frame = batch.to_pandas()
+            frame.attrs = {}
+            if frame.empty:
+                continue
+            if frame.index[0] > end_ts:
+                break
+            frame = frame.loc[start_ts:end_ts]
+            if not frame.empty:
+                yield frame.rename(columns=lambda c: c.removeprefix(prefix))
+
+    def iter_panel(
+        self,
+        tickers: Iterable[str],
+        start: str,
+        end: str,
+        field: str = "close",
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> Iterator[pd.DataFrame]:
+        """Yield *field* of every ticker aligned on the union of timestamps.
+
+        The streaming counterpart of :meth:`warehouse.Warehouse.read_panel`:
+        the tickers are read through :meth:`iter_history` side by side and a
+        frame is yielded whenever every ticker has reached a timestamp, so
+        at most about one chunk per ticker is held. Concatenated, the frames
+        have one column per ticker and ``NaN`` where a ticker has no bar.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        streams = {t: self.iter_history(t, start, end, chunk_rows) for t in tickers}
+        empty = pd.Series(dtype=float, index=pd.DatetimeIndex([], name="date"))
+        buffers = dict.fromkeys(tickers, empty)
+        live = set(tickers)
+        while True:
+            for t in tickers:
+                if t in live and buffers[t].empty:
+                    chunk = next(streams[t], None)
+                    if chunk is None:
+                        live.discard(t)
+                    else:
+                        buffers[t] = chunk[field]
+            pending = [t for t in tickers if not buffers[t].empty]
+            if not pending:
+                return
+            # bars up to the earliest buffered end of a live ticker are complete
+            ends = [buffers[t].index[-1] for t in tickers if t in live]
+            cutoff = min(ends) if ends else max(buffers[t].index[-1] for t in pending)
+            parts = {}
+            for t in tickers:
+                split = int(buffers[t].index.searchsorted(cutoff, side="right"))
+                parts[t] = buffers[t].iloc[:split]
+                buffers[t] = buffers[t].iloc[split:]
+            panel = pd.DataFrame(parts)
+            panel.index.name = "date"
+            yield panel
+
+    def get_resampled(
+        self,
+        tickers: Iterable[str],
+        start: str,
+        end: str,
+        rule: str = "1D",
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> dict[str, pd.DataFrame]:
+        """Return the bars of *tickers* aggregated into periods of *rule*.
+
+        Each ticker is streamed through :func:`resample.iter_resampled`
+        from :meth:`iter_history`, so intraday bars are reduced to daily or
+        weekly ones while holding only a few chunks per worker. Failures
+        are collected as in :meth:`get_histories`.
+        """
+        tickers = list(dict.fromkeys(tickers))
+
+        def resampled(ticker: str) -> pd.DataFrame:
+            chunks = self.iter_history(ticker, start, end, chunk_rows)
+            bars = list(iter_resampled(chunks, rule))
+            if not bars:
+                raise ValueError(f"No data for ticker '{ticker}' in {start}..{end}")
+            return pd.concat(bars)
+
+        results: dict[str, pd.DataFrame] = {}
+        errors: dict[str, Exception] = {}
+        workers = max(1, min(self.max_workers, len(tickers)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {t: pool.submit(resampled, t) for t in tickers}
+            for t, future in futures.items():
+                try:
+                    results[t] = future.result()
+                except Exception as exc:
+                    errors[t] = exc
+        if errors:
+            raise DownloadError(errors, results)
+        return results
+
+
+def _settled_end(combined: pd.DataFrame, end: pd.Timestamp) -> pd.Timestamp:
+    """Return how far the cache of *combined*, requested up to *end*, reaches.
+
+    Ranges ending more than :data:`SETTLE_PERIOD` ago are complete. Later
+    ones are only covered up to the date of the last bar received, but
+    never less than the settled range.
+    """
+    settled = pd.Timestamp.now().normalize() - SETTLE_PERIOD
+    if end <= settled or combined.empty:
+        return end
+    last = pd.Timestamp(combined.index[-1]).normalize()
+    return max(settled, min(end, last))
+
+
+def _revised(
+    cached: pd.DataFrame, combined: pd.DataFrame, since: pd.Timestamp
+) -> bool:
+    """Return whether *combined* changed bars of *cached* from *since* on."""
+    stored = cached[cached.index >= since]
+    fresh = combined.loc[stored.index, stored.columns]
+    return not np.array_equal(
+        stored.to_numpy(dtype=float, na_value=np.nan),
+        fresh.to_numpy(dtype=float, na_value=np.nan),
+        equal_nan=True,
+    )
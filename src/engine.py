@@ -1,62 +1,541 @@
 from __future__ import annotations
 
-from typing import Dict, List
+import copy
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Sequence,
+)
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
-from strategies.base import Strategy
+from costs import CostModel, drift_weights
+from metrics import TEAR_SHEET_METRICS, periods_per_year, tear_sheet
+from portfolio import Portfolio, drift, weighted_returns
+from profiling import BacktestProfiler
+from strategies.base import Strategy, signal_series
+
+Signal = str | dict[str, float]
+Trade = tuple[str, str, pd.Timestamp, float]
+# Interned weight dictionaries as (column indices, weights) in dict order.
+WeightTable = list[tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]]
 
 
 class Backtester:
-    """Simple long-only back-testing engine."""
+    """Simple long-only back-testing engine.
+
+    Pass a :class:`~profiling.BacktestProfiler` as *profiler* to collect
+    per-phase timings and strategy call histograms, and a
+    :class:`~costs.CostModel` as *costs* to charge trading costs, borrow and
+    cash carry; the results then gain a ``cost`` column with the share of
+    equity paid for the trades of every bar.
+
+    With ``portfolio=True`` the book is accounted as a
+    :class:`~portfolio.Portfolio`: positions drift with their prices
+    between rebalances instead of being held at their target weights, the
+    results gain a ``cash`` column, and :attr:`holdings` and :attr:`pnl`
+    hold the weight and the profit of every column on every bar.
+
+    The ``signal`` column of the results is categorical. Bars whose signal
+    is a weight dictionary hold a missing value there; their non-empty
+    dictionaries are kept in :attr:`rebalances`, keyed by the bar's date.
+    An empty dictionary clears the weights and has no entry.
+    """
 
-    def __init__(self, strategy: Strategy, data: pd.DataFrame) -> None:
+    def __init__(
+        self,
+        strategy: Strategy,
+        data: pd.DataFrame,
+        profiler: BacktestProfiler | None = None,
+        costs: CostModel | None = None,
+        portfolio: bool = False,
+    ) -> None:
         self.strategy = strategy
+        self.profiler = profiler
+        self.costs = costs
+        self.portfolio = portfolio
+        self.holdings: pd.DataFrame | None = None
+        self.pnl: pd.DataFrame | None = None
         self.data = data
         self.position = 0
         self.symbol: str | None = None
         self.equity = 1.0
-        self.trades: List[tuple[str, str, pd.Timestamp, float]] = []
+        self.trades: List[Trade] = []
+        self.rebalances: Dict[pd.Timestamp, Dict[str, float]] = {}
         self._multi_asset = "close" not in self.data.columns
         self.weights: Dict[str, float] = {}
 
+    @classmethod
+    def run_batch(
+        cls,
+        strategy: Strategy,
+        data: Mapping[str, pd.DataFrame],
+        profiler: BacktestProfiler | None = None,
+        costs: CostModel | None = None,
+        portfolio: bool = False,
+    ) -> dict[str, pd.DataFrame]:
+        """Back-test *strategy* independently on every ticker of *data*.
+
+        *data* maps tickers to single-asset price frames. Signals come from
+        :meth:`Strategy.generate_signals` per ticker, which leaves *strategy*
+        untouched. Tickers sharing one index whose signals are plain strings
+        are then resolved together as ``(bars, tickers)`` matrices, one
+        column per ticker; the others, and every ticker with
+        ``portfolio=True``, run through :meth:`run_vectorized`. Either way
+        each frame equals that of a separate :meth:`run_vectorized` with the
+        same *costs* and *portfolio*. Returns the result frames in the order
+        of *data*; see :func:`sweep.run_sweep` for the process-parallel
+        equivalent.
+
+        A *profiler* records one ``generate_signals`` call per ticker, while
+        the phases of a matrix are charged once for all of its tickers.
+        """
+        call = f"{type(strategy).__name__}.generate_signals"
+        signals: dict[str, pd.Series[Any]] = {}
+        for ticker, frame in data.items():
+            if profiler is not None:
+                profiler.start()
+            signals[ticker] = strategy.generate_signals(frame)
+            if profiler is not None:
+                profiler.record_call(call, profiler.lap("signals"))
+
+        results: dict[str, pd.DataFrame] = {}
+        groups: list[list[str]] = []
+        for ticker, frame in data.items():
+            plain = not portfolio and "close" in frame.columns
+            if not plain or not all(isinstance(s, str) for s in signals[ticker]):
+                backtester = cls(
+                    copy.deepcopy(strategy),
+                    frame,
+                    profiler=profiler,
+                    costs=costs,
+                    portfolio=portfolio,
+                )
+                results[ticker] = backtester.run_vectorized(signals[ticker])
+                continue
+            for group in groups:
+                if data[group[0]].index.equals(frame.index):
+                    group.append(ticker)
+                    break
+            else:
+                groups.append([ticker])
+
+        for group in groups:
+            frames = {ticker: data[ticker] for ticker in group}
+            results.update(
+                _run_matrix(frames, [signals[t] for t in group], costs, profiler)
+            )
+        return {ticker: results[ticker] for ticker in data}
+
     def run(self) -> pd.DataFrame:
-        """Run the back-test and return equity curve."""
+        """Run the back-test and return equity curve.
+
+        Per-bar results are written into preallocated typed arrays and the
+        DataFrame is built once at the end. Signals are stored as codes into
+        the distinct signal strings and become the categorical ``signal``
+        column; weight dictionaries go to the sparse :attr:`rebalances`.
+        """
+        return next(self._run([self.data]))
+
+    def iter_run(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Run the back-test over consecutive *chunks* of bars.
+
+        Yields the result frame of every chunk as soon as it is processed.
+        The strategy, equity, positions, costs and portfolio carry over from
+        one chunk to the next, so the concatenated frames, the trades and
+        the final equity equal those of :meth:`run` on the concatenated
+        chunks, while only one chunk and its results are held at a time.
+        Chunks, e.g. those of :meth:`data.DataDownloader.iter_history`, must
+        be in time order and have the columns of :attr:`data`, which is not
+        read otherwise; its first chunk will do. With ``portfolio=True``
+        :attr:`holdings` and :attr:`pnl` cover the latest chunk.
+        """
+        return self._run(chunks)
+
+    def _run(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        prof = self.profiler
+        call = f"{type(self.strategy).__name__}.next_bar"
         self.strategy.reset()
-        results = []
+        columns = list(self.data.columns)
         peak = self.equity
-        prev_close: Dict[str, float | None] = {col: None for col in self.data.columns}
-        for date, row in self.data.iterrows():
-            ts = pd.Timestamp(str(date))
-
-            # compute return for current holding before processing today's signal
-            if self.weights:
-                ret = 0.0
-                price = 0.0
-                for sym, w in self.weights.items():
-                    pc = prev_close.get(sym)
-                    p = float(row[sym])
-                    price += w * p
-                    if pc is not None:
-                        ret += w * (p - pc) / pc
-            elif self.position == 1 and self.symbol is not None:
-                price = float(row[self.symbol])
-                pc = prev_close.get(self.symbol)
-                ret = 0.0 if pc is None else (price - pc) / pc
-            else:
-                price = float(row["close"]) if not self._multi_asset else 0.0
-                ret = 0.0
+        prev_close: Dict[str, float | None] = {col: None for col in columns}
+        costs = self.costs
+        book = Portfolio(columns) if self.portfolio else None
+        col_index = {col: j for j, col in enumerate(columns)}
+        carry = 0.0
+        categories = _signal_categories(columns, self._multi_asset)
+        if book is not None:
+            initial = self._holdings(col_index)
+        if costs is not None:
+            borrow = costs.borrow_rates(columns)
+            holding = self._holdings(col_index)
+            carry = float(costs.carry(holding[None], borrow)[0])
+            entry = np.full(len(col_index), np.nan)
+        offset = 0
+        for chunk in chunks:
+            if list(chunk.columns) != columns:
+                raise ValueError(
+                    f"Chunk columns {list(chunk.columns)} differ from {columns}"
+                )
+            n = len(chunk)
+            stamps = np.empty(n, dtype=np.int64)
+            prices = np.empty(n)
+            positions = np.empty(n, dtype=np.int64)
+            equities = np.empty(n)
+            drawdowns = np.empty(n)
+            codes = np.empty(n, dtype=np.int32)
+            tz = None
+            if book is not None:
+                weights_out = np.empty((n, len(col_index)))
+                cash_out = np.empty(n)
+                pnl_out = np.empty((n, len(col_index)))
+            if costs is not None:
+                paid = np.zeros(n)
+            rows: Iterable[tuple[Any, pd.Series[Any]]] = chunk.iterrows()
+            if prof is not None:
+                rows = prof.iterate("rows", rows)
+            for i, (date, row) in enumerate(rows):
+                first = offset == 0 and i == 0
+                if prof is not None:
+                    prof.start()
+                ts = pd.Timestamp(str(date))
+                if costs is not None or book is not None:
+                    now = row.to_numpy(dtype=float, na_value=np.nan)
+
+                # compute return for current holding before processing today's signal
+                if self.weights:
+                    ret = 0.0
+                    price = 0.0
+                    for sym, w in self.weights.items():
+                        pc = prev_close.get(sym)
+                        p = float(row[sym])
+                        price += w * p
+                        if pc is not None:
+                            ret += w * (p - pc) / pc
+                elif self.position == 1 and self.symbol is not None:
+                    price = float(row[self.symbol])
+                    pc = prev_close.get(self.symbol)
+                    ret = 0.0 if pc is None else (price - pc) / pc
+                else:
+                    price = float(row["close"]) if not self._multi_asset else 0.0
+                    ret = 0.0
+                if book is not None:
+                    ret, parts = book.mark(now)
+                    if first:
+                        book.rebalance(initial)
+                    pnl_out[i] = self.equity * parts
+
+                self.equity *= 1 + ret - (0.0 if first else carry)
+                if prof is not None:
+                    prof.lap("returns")
+
+                signal = self.strategy.next_bar(row)
+                if prof is not None:
+                    prof.record_call(call, prof.lap("next_bar"))
 
-            self.equity *= 1 + ret
-            peak = max(peak, self.equity)
-            drawdown = self.equity / peak - 1
+                if isinstance(signal, dict):
+                    self.weights = signal
+                    self.position = 1 if sum(signal.values()) > 0 else 0
+                    self.symbol = None
+                elif self._multi_asset:
+                    if signal.startswith("BUY:"):
+                        ticker = signal.split(":", 1)[1]
+                        if (
+                            self.position == 1
+                            and self.symbol is not None
+                            and self.symbol != ticker
+                        ):
+                            sell_price = float(row[self.symbol])
+                            self.trades.append(("SELL", self.symbol, ts, sell_price))
+                        if self.symbol != ticker:
+                            buy_price = float(row[ticker])
+                            self.trades.append(("BUY", ticker, ts, buy_price))
+                            self.position = 1
+                            self.symbol = ticker
+                    elif signal.startswith("SELL:"):
+                        ticker = signal.split(":", 1)[1]
+                        if self.position == 1 and self.symbol == ticker:
+                            sell_price = float(row[ticker])
+                            self.trades.append(("SELL", ticker, ts, sell_price))
+                            self.position = 0
+                            self.symbol = None
+                else:
+                    if signal == "BUY" and self.position == 0:
+                        self.position = 1
+                        self.symbol = "close"
+                        buy_price = float(row["close"])
+                        self.trades.append(("BUY", "close", ts, buy_price))
+                    elif signal == "SELL" and self.position == 1:
+                        self.position = 0
+                        sell_price = float(row["close"])
+                        self.trades.append(("SELL", "close", ts, sell_price))
+                if costs is not None:
+                    if first:
+                        entry = now
+                    target = self._holdings(col_index)
+                    if isinstance(signal, dict) or not np.array_equal(target, holding):
+                        before = drift_weights(holding[None], entry[None], now[None])
+                        cost = costs.turnover_costs(before, target[None], now[None])[0]
+                        self.equity *= 1 - cost
+                        paid[i] = cost
+                        holding, entry = target, now
+                        carry = float(costs.carry(holding[None], borrow)[0])
+                if book is not None:
+                    target = self._holdings(col_index)
+                    if isinstance(signal, dict) or not np.array_equal(
+                        target, book.targets
+                    ):
+                        book.rebalance(target)
+                    weights_out[i] = book.weights
+                    cash_out[i] = book.cash
+                    if costs is not None:
+                        carry = float(costs.carry(book.weights[None], borrow)[0])
+                peak = max(peak, self.equity)
+                drawdown = self.equity / peak - 1
+                if prof is not None:
+                    prof.lap("trades")
 
-            signal = self.strategy.next_bar(row)
+                stamps[i] = ts.value
+                tz = ts.tz
+                prices[i] = price
+                positions[i] = self.position
+                equities[i] = self.equity
+                drawdowns[i] = drawdown
+                if isinstance(signal, dict):
+                    codes[i] = -1
+                    if signal:
+                        self.rebalances[ts] = signal
+                else:
+                    code = categories.get(signal)
+                    if code is None:
+                        code = categories[signal] = len(categories)
+                    codes[i] = code
 
+                for col in columns:
+                    prev_close[col] = float(row[col])
+                if prof is not None:
+                    prof.lap("record")
+
+            if prof is not None:
+                prof.start()
+            index = pd.DatetimeIndex(stamps.view("M8[ns]"), name="date")
+            if tz is not None:
+                index = index.tz_localize("UTC").tz_convert(tz)
+            frame = pd.DataFrame(
+                {
+                    "price": prices,
+                    "position": positions,
+                    "signal": _signal_column(codes, categories),
+                    "equity": equities,
+                    "drawdown": drawdowns,
+                },
+                index=index,
+                copy=False,
+            )
+            if costs is not None:
+                frame["cost"] = paid
+            if book is not None:
+                self._record_portfolio(frame, weights_out, cash_out, pnl_out)
+            if prof is not None:
+                prof.lap("assemble")
+            offset += n
+            yield frame
+
+    def run_vectorized(
+        self, signals: Sequence[Signal] | pd.Series[Any] | None = None
+    ) -> pd.DataFrame:
+        """Run the back-test from a precomputed signal array.
+
+        Produces the same DataFrame, trades and rebalances as :meth:`run`, but
+        returns, equity and drawdown are computed with NumPy array operations
+        instead of walking ``iterrows``. Only the position state machine is
+        resolved in a single pass over the signals. When *signals* is ``None``
+        they are taken from :meth:`Strategy.generate_signals`.
+        """
+        prof = self.profiler
+        if signals is None:
+            if prof is not None:
+                prof.start()
+            signals = self.strategy.generate_signals(self.data)
+            if prof is not None:
+                call = f"{type(self.strategy).__name__}.generate_signals"
+                prof.record_call(call, prof.lap("signals"))
+        if prof is not None:
+            prof.start()
+        n = len(self.data)
+        if len(signals) != n:
+            raise ValueError(f"Expected {n} signals, got {len(signals)}")
+        sig = np.empty(n, dtype=object)
+        sig[:] = list(signals)
+
+        dates = pd.DatetimeIndex(
+            pd.to_datetime(self.data.index).to_numpy(), name="date"
+        )
+        prices = self.data.to_numpy(dtype=float, na_value=np.nan)
+        col_index = {col: j for j, col in enumerate(self.data.columns)}
+
+        # state arrays hold the initial state at 0 and the state after bar t
+        # at t + 1, so holdings during bar t are simply ``state[:-1]``
+        position, held, weight_id, weight_table = self._resolve_signals(
+            sig, prices, dates, col_index
+        )
+        if prof is not None:
+            prof.lap("resolve")
+        prev_position = position[:-1]
+        prev_held = held[:-1]
+        prev_weight_id = weight_id[:-1]
+
+        rows = np.arange(n)
+        prev_prices = np.vstack([np.full((1, prices.shape[1]), np.nan), prices[:-1]])
+        has_prev = rows > 0
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            price_w, ret_w = self._weighted_returns(
+                prices, prev_prices, prev_weight_id, weight_table, has_prev
+            )
+            held_col = np.where(prev_held >= 0, prev_held, 0)
+            p_held = prices[rows, held_col]
+            pc_held = prev_prices[rows, held_col]
+            ret_held = (p_held - pc_held) / pc_held
+
+        use_weights = prev_weight_id >= 0
+        use_held = ~use_weights & (prev_position == 1) & (prev_held >= 0)
+        if self._multi_asset:
+            base_price = np.zeros(n)
+        else:
+            base_price = prices[:, col_index["close"]]
+
+        price = np.where(use_weights, price_w, np.where(use_held, p_held, base_price))
+        ret = np.where(
+            use_weights, ret_w, np.where(use_held & has_prev, ret_held, 0.0)
+        )
+
+        if self.costs is not None or self.portfolio:
+            targets, rebalance, last = self._targets(
+                sig, position, held, weight_id, weight_table, prices.shape[1]
+            )
+            carried = targets[:-1]
+        if self.portfolio:
+            weights_out, cash_out = drift(targets[1:], prices[last], prices)
+            carried = np.vstack([np.zeros_like(prices[:1]), weights_out])[:n]
+            port_ret, parts = weighted_returns(carried, prev_prices, prices)
+            ret = np.where(has_prev, port_ret, 0.0)
+
+        if self.costs is None:
+            growth = 1 + ret
+            if n:
+                growth[0] = self.equity * growth[0]
+            equity = np.cumprod(growth)
+        else:
+            carry, cost = self._cost_arrays(
+                prices, targets, rebalance, last, carried, has_prev
+            )
+            # alternate the return and trade factors of every bar so the
+            # products accumulate in the same order as in :meth:`run`
+            steps = np.empty(2 * n)
+            steps[0::2] = 1 + ret - carry
+            steps[1::2] = 1 - cost
+            if n:
+                steps[0] = self.equity * steps[0]
+            equity = np.cumprod(steps)[1::2]
+        peak = np.fmax.accumulate(np.concatenate(([self.equity], equity)))[1:]
+        drawdown = equity / peak - 1
+        if self.portfolio:
+            start_equity = np.concatenate(([self.equity], equity[:-1]))
+            pnl_out = start_equity[:, None] * parts
+
+        if n:
+            self.equity = float(equity[-1])
+        categories = _signal_categories(list(self.data.columns), self._multi_asset)
+        codes, weights = _encode_signals(sig, categories)
+        for t, signal in weights.items():
+            self.rebalances[dates[t]] = signal
+        if prof is not None:
+            prof.lap("returns")
+
+        frame = pd.DataFrame(
+            {
+                "price": price,
+                "position": position[1:],
+                "signal": _signal_column(codes, categories),
+                "equity": equity,
+                "drawdown": drawdown,
+            },
+            index=dates,
+        )
+        if self.costs is not None:
+            frame["cost"] = cost
+        if self.portfolio:
+            self._record_portfolio(frame, weights_out, cash_out, pnl_out)
+        if prof is not None:
+            prof.lap("assemble")
+        return frame
+
+    def _resolve_signals(
+        self,
+        sig: npt.NDArray[np.object_],
+        prices: npt.NDArray[np.float64],
+        dates: pd.DatetimeIndex,
+        col_index: dict[str, int],
+    ) -> tuple[
+        npt.NDArray[np.int64],
+        npt.NDArray[np.int64],
+        npt.NDArray[np.int64],
+        WeightTable,
+    ]:
+        """Return position, held column and weight id states for *sig*.
+
+        Applies the same transition rules as :meth:`run`, records trades and
+        leaves ``position``/``symbol``/``weights`` in their final state. Each
+        returned array has ``len(sig) + 1`` entries: the initial state followed
+        by the state after every signal. Weight dictionaries are interned into
+        a table of ``(column, weight)`` rows so that returns can be gathered
+        per bar with fancy indexing.
+        """
+        n = len(sig)
+        weight_table: WeightTable = []
+        interned: dict[tuple[tuple[str, float], ...], int] = {}
+
+        def intern(weights: dict[str, float]) -> int:
+            if not weights:
+                return -1
+            key = tuple(weights.items())
+            if key not in interned:
+                cols = np.fromiter(map(col_index.__getitem__, weights), np.int64)
+                values = np.fromiter(weights.values(), np.float64)
+                weight_table.append((cols, values))
+                interned[key] = len(weight_table) - 1
+            return interned[key]
+
+        def held_col() -> int:
+            return -1 if self.symbol is None else col_index[self.symbol]
+
+        if not self._multi_asset and not self.weights:
+            is_str = np.fromiter((isinstance(s, str) for s in sig), bool, n)
+            if is_str.all():
+                return self._resolve_single_asset(sig, prices, dates, col_index)
+
+        position = np.empty(n + 1, dtype=np.int64)
+        held = np.empty(n + 1, dtype=np.int64)
+        weight_id = np.empty(n + 1, dtype=np.int64)
+        current_id = intern(self.weights)
+        position[0] = self.position
+        held[0] = held_col()
+        weight_id[0] = current_id
+
+        for t, signal in enumerate(sig):
             if isinstance(signal, dict):
                 self.weights = signal
                 self.position = 1 if sum(signal.values()) > 0 else 0
                 self.symbol = None
+                current_id = intern(signal)
             elif self._multi_asset:
                 if signal.startswith("BUY:"):
                     ticker = signal.split(":", 1)[1]
@@ -65,43 +544,471 @@ class Backtester:
                         and self.symbol is not None
                         and self.symbol != ticker
                     ):
-                        sell_price = float(row[self.symbol])
-                        self.trades.append(("SELL", self.symbol, ts, sell_price))
+                        sell_price = float(prices[t, col_index[self.symbol]])
+                        self.trades.append(
+                            ("SELL", self.symbol, dates[t], sell_price)
+                        )
                     if self.symbol != ticker:
-                        buy_price = float(row[ticker])
-                        self.trades.append(("BUY", ticker, ts, buy_price))
+                        buy_price = float(prices[t, col_index[ticker]])
+                        self.trades.append(("BUY", ticker, dates[t], buy_price))
                         self.position = 1
                         self.symbol = ticker
                 elif signal.startswith("SELL:"):
                     ticker = signal.split(":", 1)[1]
                     if self.position == 1 and self.symbol == ticker:
-                        sell_price = float(row[ticker])
-                        self.trades.append(("SELL", ticker, ts, sell_price))
+                        sell_price = float(prices[t, col_index[ticker]])
+                        self.trades.append(("SELL", ticker, dates[t], sell_price))
                         self.position = 0
                         self.symbol = None
             else:
+                close = col_index["close"]
                 if signal == "BUY" and self.position == 0:
                     self.position = 1
                     self.symbol = "close"
-                    buy_price = float(row["close"])
-                    self.trades.append(("BUY", "close", ts, buy_price))
+                    self.trades.append(
+                        ("BUY", "close", dates[t], float(prices[t, close]))
+                    )
                 elif signal == "SELL" and self.position == 1:
                     self.position = 0
-                    sell_price = float(row["close"])
-                    self.trades.append(("SELL", "close", ts, sell_price))
+                    self.trades.append(
+                        ("SELL", "close", dates[t], float(prices[t, close]))
+                    )
 
-            results.append(
-                {
-                    "date": ts,
-                    "price": price,
-                    "position": self.position,
-                    "signal": signal,
-                    "equity": self.equity,
-                    "drawdown": drawdown,
-                }
+            position[t + 1] = self.position
+            held[t + 1] = held_col()
+            weight_id[t + 1] = current_id
+
+        return position, held, weight_id, weight_table
+
+    def _resolve_single_asset(
+        self,
+        sig: npt.NDArray[np.object_],
+        prices: npt.NDArray[np.float64],
+        dates: pd.DatetimeIndex,
+        col_index: dict[str, int],
+    ) -> tuple[
+        npt.NDArray[np.int64],
+        npt.NDArray[np.int64],
+        npt.NDArray[np.int64],
+        WeightTable,
+    ]:
+        """Vectorized :meth:`_resolve_signals` for plain BUY/SELL signals.
+
+        A single-asset position is the last BUY (1) or SELL (0) seen so far,
+        which is a forward fill over the signal codes.
+        """
+        n = len(sig)
+        close = col_index["close"]
+        codes = np.where(sig == "BUY", 1.0, np.where(sig == "SELL", 0.0, np.nan))
+        filled = pd.Series(np.concatenate(([float(self.position)], codes))).ffill()
+        position = filled.to_numpy().astype(np.int64)
+
+        changed = np.flatnonzero(position[1:] != position[:-1])
+        for t in changed:
+            action = "BUY" if position[t + 1] == 1 else "SELL"
+            ts = dates[int(t)]
+            self.trades.append((action, "close", ts, float(prices[t, close])))
+
+        # the loop sets ``symbol`` on the first BUY and never clears it
+        bought = np.concatenate(([False], (position[1:] == 1) & (position[:-1] == 0)))
+        has_symbol = np.logical_or.accumulate(bought) | (self.symbol is not None)
+        held = np.where(has_symbol, close, -1).astype(np.int64)
+
+        self.position = int(position[-1])
+        if has_symbol[-1]:
+            self.symbol = "close"
+        return position, held, np.full(n + 1, -1, dtype=np.int64), []
+
+    def _holdings(self, col_index: dict[str, int]) -> npt.NDArray[np.float64]:
+        """Return the current target weight of every column."""
+        holding = np.zeros(len(col_index))
+        if self.weights:
+            for sym, w in self.weights.items():
+                holding[col_index[sym]] = w
+        elif self.position == 1 and self.symbol is not None:
+            holding[col_index[self.symbol]] = 1.0
+        return holding
+
+    def _targets(
+        self,
+        sig: npt.NDArray[np.object_],
+        position: npt.NDArray[np.int64],
+        held: npt.NDArray[np.int64],
+        weight_id: npt.NDArray[np.int64],
+        weight_table: WeightTable,
+        width: int,
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.bool_], npt.NDArray[np.int64]]:
+        """Return the target weights, rebalance bars and last rebalance.
+
+        Target weights of the resolved states are laid out as one
+        ``(n + 1, width)`` matrix like the states themselves. A bar
+        rebalances when its signal is a weight dictionary or the targets
+        change; ``last[t]`` is the latest rebalance up to bar ``t``, or 0.
+        """
+        n = len(sig)
+        targets = np.zeros((n + 1, width))
+        use_weights = weight_id >= 0
+        if weight_table:
+            table, _, entry_cols, entry_weights = _flatten_weights(weight_table)
+            dense = np.zeros((len(weight_table), width))
+            dense[table, entry_cols] = entry_weights
+            targets[use_weights] = dense[weight_id[use_weights]]
+        use_held = ~use_weights & (position == 1) & (held >= 0)
+        targets[np.flatnonzero(use_held), held[use_held]] = 1.0
+
+        is_dict = np.fromiter((isinstance(s, dict) for s in sig), bool, n)
+        rebalance = is_dict | (targets[1:] != targets[:-1]).any(axis=1)
+        last = np.maximum.accumulate(np.where(rebalance, np.arange(n), 0))
+        return targets, rebalance, last
+
+    def _cost_arrays(
+        self,
+        prices: npt.NDArray[np.float64],
+        targets: npt.NDArray[np.float64],
+        rebalance: npt.NDArray[np.bool_],
+        last: npt.NDArray[np.int64],
+        carried: npt.NDArray[np.float64],
+        has_prev: npt.NDArray[np.bool_],
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        """Return the per-bar carry and trade costs of the resolved states.
+
+        Turnover and drift since the previous rebalance are computed for all
+        rebalances of :meth:`_targets` at once, and carry for every bar on
+        the *carried* weights, by the :class:`~costs.CostModel` methods.
+        """
+        assert self.costs is not None
+        n = len(prices)
+        bars = np.flatnonzero(rebalance)
+        start = np.concatenate(([0], last[:-1]))
+        before = drift_weights(targets[bars], prices[start[bars]], prices[bars])
+        cost = np.zeros(n)
+        cost[bars] = self.costs.turnover_costs(before, targets[bars + 1], prices[bars])
+
+        borrow = self.costs.borrow_rates(list(self.data.columns))
+        carry = np.where(has_prev, self.costs.carry(carried, borrow), 0.0)
+        return carry, cost
+
+    def _record_portfolio(
+        self,
+        frame: pd.DataFrame,
+        weights: npt.NDArray[np.float64],
+        cash: npt.NDArray[np.float64],
+        pnl: npt.NDArray[np.float64],
+    ) -> None:
+        """Add the ``cash`` column and set :attr:`holdings` and :attr:`pnl`."""
+        frame["cash"] = cash
+        columns = pd.Index(self.data.columns)
+        self.holdings = pd.DataFrame(weights, index=frame.index, columns=columns)
+        self.pnl = pd.DataFrame(pnl, index=frame.index, columns=columns)
+
+    @staticmethod
+    def _weighted_returns(
+        prices: npt.NDArray[np.float64],
+        prev_prices: npt.NDArray[np.float64],
+        weight_id: npt.NDArray[np.int64],
+        weight_table: WeightTable,
+        has_prev: npt.NDArray[np.bool_],
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        """Return weighted price and return for bars holding a weight dict.
+
+        Terms are accumulated in dictionary order so the floating point result
+        matches the per-row loop exactly.
+        """
+        n = len(weight_id)
+        price = np.zeros(n)
+        ret = np.zeros(n)
+        if not weight_table:
+            return price, ret
+        table, slot, entry_cols, entry_weights = _flatten_weights(weight_table)
+        width = int(slot.max()) + 1
+        cols = np.zeros((len(weight_table), width), dtype=np.int64)
+        weights = np.zeros((len(weight_table), width))
+        present = np.zeros((len(weight_table), width), dtype=bool)
+        cols[table, slot] = entry_cols
+        weights[table, slot] = entry_weights
+        present[table, slot] = True
+
+        rows = np.arange(n)
+        active = weight_id >= 0
+        ids = np.where(active, weight_id, 0)
+        for k in range(width):
+            use = active & present[ids, k]
+            col = cols[ids, k]
+            w = weights[ids, k]
+            p = prices[rows, col]
+            pc = prev_prices[rows, col]
+            price = np.where(use, price + w * p, price)
+            ret = np.where(use & has_prev, ret + w * (p - pc) / pc, ret)
+        return price, ret
+
+
+class MultiResult(NamedTuple):
+    """Outcome of :meth:`MultiBacktester.run`, keyed by strategy name.
+
+    ``results`` holds the back-test frame, ``trades`` the trade list and
+    ``rebalances`` the weight dictionaries of every strategy, as
+    :meth:`Backtester.run` returns and records them; ``metrics`` has one
+    row of :data:`~metrics.TEAR_SHEET_METRICS` per strategy.
+    """
+
+    results: dict[str, pd.DataFrame]
+    trades: dict[str, list[Trade]]
+    metrics: pd.DataFrame
+    rebalances: dict[str, dict[pd.Timestamp, dict[str, float]]]
+
+
+class MultiBacktester:
+    """Back-test several strategies on one price frame in a single pass.
+
+    *strategies* maps a name to each strategy instance. Strategies with a
+    vectorized :meth:`Strategy.generate_signals` are evaluated on the whole
+    frame and share the weekly resample and other indicators through
+    :data:`~strategies.indicator_cache.INDICATORS`; the others are
+    replayed bar by bar from one ``iterrows`` pass, so every row is
+    extracted once for all of them instead of once per strategy. Every
+    back-test is charged the :class:`~costs.CostModel` *costs*, if given,
+    and accounted as a :class:`~portfolio.Portfolio` with *portfolio*.
+    """
+
+    def __init__(
+        self,
+        strategies: Mapping[str, Strategy],
+        data: pd.DataFrame,
+        profiler: BacktestProfiler | None = None,
+        costs: CostModel | None = None,
+        portfolio: bool = False,
+    ) -> None:
+        self.strategies = dict(strategies)
+        self.data = data
+        self.profiler = profiler
+        self.costs = costs
+        self.portfolio = portfolio
+
+    def signals(self) -> dict[str, pd.Series[Any]]:
+        """Return the :meth:`Strategy.generate_signals` of every strategy.
+
+        As with ``generate_signals`` the strategies themselves are left
+        untouched; the bar-by-bar ones are replayed on reset copies.
+        """
+        prof = self.profiler
+        signals: dict[str, pd.Series[Any]] = {}
+        stepped: dict[str, Strategy] = {}
+        for name, strategy in self.strategies.items():
+            if type(strategy).generate_signals is Strategy.generate_signals:
+                stepped[name] = copy.deepcopy(strategy)
+                stepped[name].reset()
+                continue
+            if prof is not None:
+                prof.start()
+            signals[name] = strategy.generate_signals(self.data)
+            if prof is not None:
+                call = f"{type(strategy).__name__}.generate_signals"
+                prof.record_call(call, prof.lap("signals"))
+
+        if stepped:
+            emitted: dict[str, list[Signal]] = {name: [] for name in stepped}
+            rows: Iterable[tuple[Any, pd.Series[Any]]] = self.data.iterrows()
+            if prof is not None:
+                rows = prof.iterate("rows", rows)
+            for _, row in rows:
+                for name, strategy in stepped.items():
+                    if prof is not None:
+                        prof.start()
+                    emitted[name].append(strategy.next_bar(row))
+                    if prof is not None:
+                        call = f"{type(strategy).__name__}.next_bar"
+                        prof.record_call(call, prof.lap("next_bar"))
+            for name, values in emitted.items():
+                signals[name] = signal_series(values, self.data.index)
+        return {name: signals[name] for name in self.strategies}
+
+    def run(self) -> MultiResult:
+        """Back-test every strategy and return their results and metrics.
+
+        Each strategy's signals from :meth:`signals` go through
+        :meth:`Backtester.run_vectorized`, so the frames, trades and
+        rebalances match separate :meth:`Backtester.run` calls.
+        """
+        results: dict[str, pd.DataFrame] = {}
+        trades: dict[str, list[Trade]] = {}
+        rebalances: dict[str, dict[pd.Timestamp, dict[str, float]]] = {}
+        for name, signals in self.signals().items():
+            backtester = Backtester(
+                self.strategies[name],
+                self.data,
+                profiler=self.profiler,
+                costs=self.costs,
+                portfolio=self.portfolio,
             )
+            results[name] = backtester.run_vectorized(signals)
+            trades[name] = backtester.trades
+            rebalances[name] = backtester.rebalances
+
+        names = list(results)
+        metrics = pd.DataFrame(index=pd.Index(names, name="strategy"))
+        if names and len(self.data):
+            equity = np.vstack([results[n]["equity"].to_numpy() for n in names])
+            position = np.vstack([results[n]["position"].to_numpy() for n in names])
+            sheet = tear_sheet(equity, position, periods_per_year(self.data.index))
+            for metric in TEAR_SHEET_METRICS:
+                metrics[metric] = sheet[metric]
+        else:
+            for metric in TEAR_SHEET_METRICS:
+                metrics[metric] = np.full(len(names), np.nan)
+        return MultiResult(results, trades, metrics, rebalances)
+
+
+def _flatten_weights(
+    weight_table: WeightTable,
+) -> tuple[
+    npt.NDArray[np.int64],
+    npt.NDArray[np.int64],
+    npt.NDArray[np.int64],
+    npt.NDArray[np.float64],
+]:
+    """Return the table row, slot, column and weight of every table entry.
+
+    The slot is the position of an entry within its weight dictionary.
+    """
+    sizes = np.fromiter((len(cols) for cols, _ in weight_table), np.int64)
+    table = np.repeat(np.arange(len(weight_table)), sizes)
+    slot = np.arange(int(sizes.sum())) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    cols = np.concatenate([cols for cols, _ in weight_table])
+    weights = np.concatenate([weights for _, weights in weight_table])
+    return table, slot, cols, weights
+
+
+def _signal_categories(columns: Sequence[str], multi_asset: bool) -> dict[str, int]:
+    """Return the codes of the signals a back-test on *columns* can act on.
+
+    Other strings a strategy emits get the next free codes in order of
+    appearance.
+    """
+    if multi_asset:
+        names = ["HOLD", *(f"BUY:{c}" for c in columns)]
+        names += [f"SELL:{c}" for c in columns]
+    else:
+        names = ["BUY", "SELL", "HOLD"]
+    return {name: code for code, name in enumerate(names)}
+
+
+def _encode_signals(
+    sig: npt.NDArray[np.object_], categories: dict[str, int]
+) -> tuple[npt.NDArray[np.int32], dict[int, dict[str, float]]]:
+    """Return the codes of *sig* in *categories* and its weight dictionaries.
+
+    Unknown strings are added to *categories* in order of appearance, as
+    :meth:`Backtester.run` does. Bars holding a weight dictionary get the
+    code ``-1``; the non-empty ones are returned as ``{bar: weights}``.
+    """
+    is_dict = np.fromiter((isinstance(s, dict) for s in sig), bool, len(sig))
+    strings = sig[~is_dict]
+    for value in pd.unique(strings):
+        categories.setdefault(value, len(categories))
+    codes = np.full(len(sig), -1, dtype=np.int32)
+    codes[~is_dict] = pd.Categorical(strings, categories=list(categories)).codes
+    weights = {int(t): sig[t] for t in np.flatnonzero(is_dict) if sig[t]}
+    return codes, weights
+
+
+def _signal_column(
+    codes: npt.NDArray[np.int32], categories: dict[str, int]
+) -> pd.Categorical[str]:
+    """Return the categorical ``signal`` column of *codes* into *categories*.
+
+    Weight dictionary bars, coded ``-1``, become missing values.
+    """
+    return pd.Categorical.from_codes(codes, categories=pd.Index(list(categories)))
+
+
+def _run_matrix(
+    frames: Mapping[str, pd.DataFrame],
+    signals: Sequence[pd.Series[Any]],
+    costs: CostModel | None,
+    prof: BacktestProfiler | None,
+) -> dict[str, pd.DataFrame]:
+    """Back-test the BUY/SELL *signals* of same-index *frames* together.
+
+    This is :meth:`Backtester.run_vectorized` with one column per ticker:
+    positions are a forward fill down the signal codes, and returns, costs
+    and equity are computed for all tickers at once. Every cell goes
+    through the same operations in the same order as the single-ticker
+    engine, and the cost model only sees the ``close`` column, whose
+    siblings carry zero weight there, so the frames match bit for bit.
+    """
+    if prof is not None:
+        prof.start()
+    first = next(iter(frames.values()))
+    dates = pd.DatetimeIndex(pd.to_datetime(first.index).to_numpy(), name="date")
+    n, k = len(dates), len(frames)
+    close = np.empty((n, k))
+    sig = np.empty((n, k), dtype=object)
+    columns: list[pd.Categorical[str]] = []
+    for j, frame in enumerate(frames.values()):
+        close[:, j] = frame["close"].to_numpy(dtype=float, na_value=np.nan)
+        sig[:, j] = list(signals[j])
+        categories = _signal_categories(list(frame.columns), False)
+        codes, _ = _encode_signals(sig[:, j], categories)
+        columns.append(_signal_column(codes, categories))
+
+    # as in run_vectorized, row 0 is the flat state before the first bar
+    codes = np.where(sig == "BUY", 1.0, np.where(sig == "SELL", 0.0, np.nan))
+    codes = np.vstack([np.zeros((1, k)), codes])
+    rows = np.arange(n + 1)[:, None]
+    seen = np.maximum.accumulate(np.where(np.isnan(codes), 0, rows), axis=0)
+    position = np.take_along_axis(codes, seen, axis=0).astype(np.int64)
+    if prof is not None:
+        prof.lap("resolve")
+
+    prev_close = np.vstack([np.full((1, k), np.nan), close[:-1]])
+    has_prev = (np.arange(n) > 0)[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        move = (close - prev_close) / prev_close
+    ret = np.where((position[:-1] == 1) & has_prev, move, 0.0)
+
+    if costs is None:
+        equity = np.cumprod(1 + ret, axis=0)
+    else:
+        targets = position.astype(float)
+        rebalance = targets[1:] != targets[:-1]
+        last = np.maximum.accumulate(np.where(rebalance, rows[:-1], 0), axis=0)
+        start = np.vstack([np.zeros((1, k), dtype=np.int64), last[:-1]])
+        bar, col = np.nonzero(rebalance)
+        fill = close[bar, col][:, None]
+        before = drift_weights(
+            targets[bar, col][:, None], close[start[bar, col], col][:, None], fill
+        )
+        cost = np.zeros((n, k))
+        after = targets[bar + 1, col][:, None]
+        cost[bar, col] = costs.turnover_costs(before, after, fill)
+        borrow = costs.borrow_rates(["close"])
+        carry = costs.carry(targets[:-1].reshape(-1, 1), borrow).reshape(n, k)
+        carry = np.where(has_prev, carry, 0.0)
 
-            for col in self.data.columns:
-                prev_close[col] = float(row[col])
+        steps = np.empty((2 * n, k))
+        steps[0::2] = 1 + ret - carry
+        steps[1::2] = 1 - cost
+        equity = np.cumprod(steps, axis=0)[1::2]
+    peak = np.fmax.accumulate(np.vstack([np.ones((1, k)), equity]), axis=0)[1:]
+    drawdown = equity / peak - 1
+    if prof is not None:
+        prof.lap("returns")
 
-        return pd.DataFrame(results).set_index("date")
+    results: dict[str, pd.DataFrame] = {}
+    for j, ticker in enumerate(frames):
+        frame = pd.DataFrame(
+            {
+                "price": close[:, j],
+                "position": position[1:, j],
+                "signal": columns[j],
+                "equity": equity[:, j],
+                "drawdown": drawdown[:, j],
+            },
+            index=dates,
+        )
+        if costs is not None:
+            frame["cost"] = cost[:, j]
+        results[ticker] = frame
+    if prof is not None:
+        prof.lap("assemble")
+    return results
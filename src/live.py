@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import copy
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Mapping, NamedTuple, Protocol
+
+import pandas as pd
+
+from strategies.base import Strategy
+from warehouse import Warehouse
+
+Signal = str | dict[str, float]
+
+CHECKPOINT_VERSION = 1
+
+
+class SignalChange(NamedTuple):
+    """A strategy emitted a different signal than on its previous bar."""
+
+    timestamp: pd.Timestamp
+    strategy: str
+    signal: Signal
+    previous: Signal | None
+
+
+class BarSource(Protocol):
+    """Local feed of bars polled by :class:`SignalDaemon`."""
+
+    def poll(self, after: pd.Timestamp | None) -> pd.DataFrame:
+        """Return bars newer than *after*; older rows are ignored."""
+        ...
+
+
+class WarehouseSource:
+    """Poll a :class:`~warehouse.Warehouse` ticker for appended bars.
+
+    Only the rows after the last ingested timestamp are read from the
+    memory-mapped columns, so a poll costs a binary search plus the new
+    rows regardless of how much history is stored.
+    """
+
+    def __init__(
+        self, warehouse: Warehouse, ticker: str, fields: Iterable[str] | None = None
+    ) -> None:
+        self.warehouse = warehouse
+        self.ticker = ticker
+        self.fields = None if fields is None else list(fields)
+
+    def poll(self, after: pd.Timestamp | None) -> pd.DataFrame:
+        if self.warehouse.manifest(self.ticker) is None:
+            return pd.DataFrame()
+        start = None if after is None else after + pd.Timedelta(1, "ns")
+        return self.warehouse.read(self.ticker, start=start, fields=self.fields)
+
+
+class DropDirectorySource:
+    """Poll a directory for dropped CSV or parquet files of bars.
+
+    Files are read once, in name order; names starting with ``.`` or ending
+    in ``.tmp`` are skipped so writers can drop files atomically by
+    renaming them into place. CSV files need the timestamps in their first
+    column. With *archive* processed files are moved into a ``processed``
+    subdirectory instead of being remembered in memory.
+    """
+
+    def __init__(self, directory: Path | str, archive: bool = False) -> None:
+        self.directory = Path(directory)
+        self.archive = archive
+        self._seen: set[str] = set()
+
+    def _pending(self) -> list[Path]:
+        return sorted(
+            p
+            for p in self.directory.iterdir()
+            if p.is_file()
+            and p.suffix in {".csv", ".parquet"}
+            and not p.name.startswith(".")
+            and p.name not in self._seen
+        )
+
+    def poll(self, after: pd.Timestamp | None) -> pd.DataFrame:
+        frames = []
+        for path in self._pending():
+            if path.suffix == ".parquet":
+                frame = pd.read_parquet(path)
+            else:
+                frame = pd.read_csv(path, index_col=0, parse_dates=True)
+            frames.append(frame)
+            if self.archive:
+                processed = self.directory / "processed"
+                processed.mkdir(exist_ok=True)
+                path.replace(processed / path.name)
+            else:
+                self._seen.add(path.name)
+        if not frames:
+            return pd.DataFrame()
+        bars = pd.concat(frames).sort_index()
+        return bars[~bars.index.duplicated(keep="last")]
+
+
+class SignalDaemon:
+    """Keep strategies live in memory and feed them only new bars.
+
+    Each strategy is advanced with :meth:`Strategy.next_bar` once per new
+    bar, so the cost of an update does not grow with the history already
+    seen. :meth:`warmup` replays a history once to build the strategy
+    state; afterwards :meth:`ingest` or :meth:`poll` process new bars and
+    report a :class:`SignalChange` whenever a strategy's signal differs
+    from the one it emitted on the previous bar. Bars at or before the last
+    ingested timestamp are skipped.
+
+    With a *checkpoint* path the strategy states are saved there (see
+    :meth:`save_checkpoint`) after every poll that brought new bars, so a
+    restarted daemon resumes with :meth:`load_checkpoint` instead of
+    replaying the history.
+    """
+
+    def __init__(
+        self,
+        strategies: Mapping[str, Strategy],
+        source: BarSource | None = None,
+        on_change: Callable[[SignalChange], None] | None = None,
+        checkpoint: Path | str | None = None,
+    ) -> None:
+        self.strategies = dict(strategies)
+        self.source = source
+        self.on_change = on_change
+        self.checkpoint = checkpoint
+        self.last_timestamp: pd.Timestamp | None = None
+        self.signals: dict[str, Signal | None] = {name: None for name in strategies}
+        for strategy in self.strategies.values():
+            strategy.reset()
+
+    def warmup(self, history: pd.DataFrame) -> None:
+        """Replay *history* without reporting changes."""
+        self._advance(history, report=False)
+
+    def ingest(self, bars: pd.DataFrame) -> list[SignalChange]:
+        """Feed the bars of *bars* newer than the last one seen."""
+        return self._advance(bars, report=True)
+
+    def poll(self) -> list[SignalChange]:
+        """Ingest whatever the source has added since the last bar."""
+        if self.source is None:
+            raise ValueError("SignalDaemon has no source to poll")
+        last = self.last_timestamp
+        changes = self.ingest(self.source.poll(last))
+        if self.checkpoint is not None and self.last_timestamp != last:
+            self.save_checkpoint(self.checkpoint)
+        return changes
+
+    def save_checkpoint(self, path: Path | str) -> None:
+        """Atomically write every strategy's snapshot and the last signals.
+
+        Each strategy is stored with :meth:`Strategy.snapshot` as of the last
+        ingested bar.
+        """
+        payload = {
+            "version": CHECKPOINT_VERSION,
+            "last_timestamp": self.last_timestamp,
+            "signals": self.signals,
+            "strategies": {
+                name: strategy.snapshot(self.last_timestamp)
+                for name, strategy in self.strategies.items()
+            },
+        }
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+    def load_checkpoint(self, path: Path | str) -> bool:
+        """Restore the state saved by :meth:`save_checkpoint`.
+
+        Returns ``False``, leaving the daemon untouched, when *path* does
+        not exist or holds a different set of strategies; the caller then
+        warms up from history as usual. Raises :class:`ValueError` for an
+        unsupported checkpoint version.
+        """
+        try:
+            with open(path, "rb") as fh:
+                payload = pickle.load(fh)
+        except FileNotFoundError:
+            return False
+        if payload.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(
+                f"Unsupported checkpoint version {payload.get('version')}"
+            )
+        snapshots: dict[str, bytes] = payload["strategies"]
+        if set(snapshots) != set(self.strategies):
+            return False
+        restored = {name: copy.copy(s) for name, s in self.strategies.items()}
+        for name, blob in snapshots.items():
+            restored[name].restore(blob)
+        self.strategies = restored
+        self.signals = dict(payload["signals"])
+        self.last_timestamp = payload["last_timestamp"]
+        return True
+
+    def run(
+        self,
+        poll_seconds: float = 60.0,
+        stop: threading.Event | None = None,
+        max_polls: int | None = None,
+    ) -> None:
+        """Poll every *poll_seconds* seconds until *stop* is set.
+
+        *max_polls* bounds the number of polls, mainly for tests and cron
+        style invocations.
+        """
+        stop = stop or threading.Event()
+        polls = 0
+        while not stop.is_set():
+            self.poll()
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                return
+            stop.wait(poll_seconds)
+
+    def _advance(self, bars: pd.DataFrame, report: bool) -> list[SignalChange]:
+        if bars.empty:
+            return []
+        if not bars.index.is_monotonic_increasing:
+            bars = bars.sort_index()
+        if self.last_timestamp is not None:
+            bars = bars[bars.index > self.last_timestamp]
+        changes: list[SignalChange] = []
+        for date, bar in bars.iterrows():
+            ts = pd.Timestamp(str(date))
+            for name, strategy in self.strategies.items():
+                signal = strategy.next_bar(bar)
+                previous = self.signals[name]
+                if signal != previous:
+                    self.signals[name] = signal
+                    if report:
+                        change = SignalChange(ts, name, signal, previous)
+                        changes.append(change)
+                        if self.on_change is not None:
+                            self.on_change(change)
+            self.last_timestamp = ts
+        return changes
+
@@ -3,8 +3,52 @@ from __future__ import annotations
 from math import sqrt
 from typing import Any
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
+TEAR_SHEET_METRICS = (
+    "total_return",
+    "cagr",
+    "volatility",
+    "sharpe",
+    "sortino",
+    "max_drawdown",
+    "calmar",
+    "ulcer_index",
+    "max_drawdown_duration",
+    "win_rate",
+    "turnover",
+    "exposure",
+)
+
+# Tear sheet metrics that need no positions, available as rolling series.
+ROLLING_METRICS = TEAR_SHEET_METRICS[:-2]
+
+# Metrics for which the smallest value is the best one when optimizing.
+LOWER_IS_BETTER = frozenset({"volatility", "ulcer_index", "max_drawdown_duration"})
+
+
+def periods_per_year(index: pd.Index[Any]) -> int:
+    """Return the number of bars per year of a back-test over *index*.
+
+    The count follows the median spacing of the bars: 252 for daily bars,
+    as elsewhere in the package, 52 for weekly and 12 for monthly ones.
+    Intraday bars, several per date, count 252 sessions of the median
+    number of bars per date.
+    """
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 2:
+        return 252
+    sessions = index.normalize()
+    if sessions.has_duplicates:
+        _, counts = np.unique(sessions.to_numpy(), return_counts=True)
+        return int(252 * round(float(np.median(counts))))
+    days = float(np.median(np.diff(sessions.to_numpy()))) / 86_400e9
+    # business days span weekends, so anything under four days is daily
+    if days < 4:
+        return 252
+    return max(1, round(365.25 / days))
+
 
 def cagr(
     equity: pd.Series[Any], start: str | pd.Timestamp, end: str | pd.Timestamp
@@ -38,3 +82,160 @@ def max_drawdown(drawdown: pd.Series[float]) -> float:
     if drawdown.empty:
         return 0.0
     return float(drawdown.min())
+
+
+def _ratio(num: npt.ArrayLike, den: npt.ArrayLike) -> npt.NDArray[np.float64]:
+    """Return ``num / den`` with ``0`` where *den* is zero or missing."""
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    undefined = (den == 0) | np.isnan(den)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result: npt.NDArray[np.float64] = np.where(undefined, 0.0, num / den)
+    return result
+
+
+def _returns(equity: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Return the bar-over-bar changes along the last axis of *equity*."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns: npt.NDArray[np.float64] = equity[..., 1:] / equity[..., :-1] - 1
+    return returns
+
+
+def drawdown_matrix(equity: npt.ArrayLike) -> npt.NDArray[np.float64]:
+    """Return the drawdown from the running peak along the last axis.
+
+    Missing values (``NaN``) do not reset the peak and have a ``NaN``
+    drawdown.
+    """
+    values = np.asarray(equity, dtype=float)
+    peak = np.fmax.accumulate(values, axis=-1)
+    drawdown: npt.NDArray[np.float64] = values / peak - 1
+    return drawdown
+
+
+def _longest_run(flags: npt.NDArray[np.bool_]) -> npt.NDArray[np.float64]:
+    """Return the longest run of consecutive ``True`` along the last axis."""
+    count = np.cumsum(flags, axis=-1)
+    last_reset = np.maximum.accumulate(np.where(flags, 0, count), axis=-1)
+    longest: npt.NDArray[np.float64] = (count - last_reset).max(axis=-1).astype(float)
+    return longest
+
+
+def tear_sheet(
+    equity: npt.ArrayLike,
+    position: npt.ArrayLike | None = None,
+    periods_per_year: int = 252,
+    risk_free_rate: float = 0.0,
+) -> dict[str, npt.NDArray[np.float64]]:
+    """Return every metric of :data:`TEAR_SHEET_METRICS` for *equity*.
+
+    *equity* is one curve or a matrix with one run per row, time along the
+    last axis; every metric is an array shaped like *equity* without that
+    axis. Runs of different lengths may be right-padded with ``NaN``.
+    *position* holds the matching per-bar exposure, e.g. the ``position``
+    column of :meth:`Backtester.run`, and is needed for ``turnover`` and
+    ``exposure``, which are ``NaN`` without it.
+
+    Metrics use the bar-over-bar returns of the curve:
+
+    - ``volatility``, ``sharpe`` and ``sortino`` are annualized with
+      *periods_per_year* using the population deviation, as
+      :func:`sharpe_ratio`; ``sortino`` divides by the root mean square of
+      the negative excess returns.
+    - ``cagr`` compounds ``total_return`` over ``bars - 1`` periods and
+      ``calmar`` is ``cagr / |max_drawdown|``.
+    - ``ulcer_index`` is the root mean square drawdown (as a fraction) and
+      ``max_drawdown_duration`` the longest stretch of bars below a peak.
+    - ``win_rate`` is the share of positive returns among non-zero ones.
+    - ``turnover`` is the annualized sum of absolute position changes,
+      starting flat, and ``exposure`` the share of bars with a position.
+
+    Undefined ratios are ``0``.
+    """
+    values = np.asarray(equity, dtype=float)
+    if values.ndim == 0 or values.shape[-1] == 0:
+        raise ValueError("equity must have at least one bar")
+    bars = (~np.isnan(values)).sum(axis=-1).astype(float)
+    last = np.clip(bars.astype(np.int64) - 1, 0, None)
+    first_value = values[..., 0]
+    last_value = np.take_along_axis(values, last[..., None], axis=-1)[..., 0]
+    growth = np.where(bars > 0, last_value / first_value, 1.0)
+
+    returns = _returns(values)
+    periods = (~np.isnan(returns)).sum(axis=-1).astype(float)
+    excess = returns - risk_free_rate / periods_per_year
+    mean = _ratio(np.nansum(excess, axis=-1), periods)
+    std = np.sqrt(_ratio(np.nansum((excess - mean[..., None]) ** 2, axis=-1), periods))
+    downside = np.sqrt(
+        _ratio(np.nansum(np.minimum(excess, 0.0) ** 2, axis=-1), periods)
+    )
+    wins = (returns > 0).sum(axis=-1)
+    moves = ((returns != 0) & ~np.isnan(returns)).sum(axis=-1)
+
+    years = last / periods_per_year
+    with np.errstate(invalid="ignore"):
+        cagr_ = np.where(years > 0, growth ** _ratio(1.0, years) - 1, 0.0)
+
+    drawdown = np.nan_to_num(drawdown_matrix(values))
+    max_dd = drawdown.min(axis=-1)
+    annualize = sqrt(periods_per_year)
+
+    sheet = {
+        "total_return": growth - 1,
+        "cagr": cagr_,
+        "volatility": std * annualize,
+        "sharpe": _ratio(mean, std) * annualize,
+        "sortino": _ratio(mean, downside) * annualize,
+        "max_drawdown": max_dd,
+        "calmar": _ratio(cagr_, np.abs(max_dd)),
+        "ulcer_index": np.sqrt(_ratio((drawdown**2).sum(axis=-1), bars)),
+        "max_drawdown_duration": _longest_run(drawdown < 0),
+        "win_rate": _ratio(wins, moves),
+    }
+    if position is None:
+        sheet["turnover"] = np.full(values.shape[:-1], np.nan)
+        sheet["exposure"] = np.full(values.shape[:-1], np.nan)
+    else:
+        held = np.asarray(position, dtype=float)
+        if held.shape != values.shape:
+            raise ValueError(
+                f"position shape {held.shape} does not match equity {values.shape}"
+            )
+        held = np.nan_to_num(held)
+        changes = np.abs(np.diff(held, axis=-1, prepend=0.0))
+        changes = np.where(np.isnan(values), 0.0, changes).sum(axis=-1)
+        exposed = (held != 0) & ~np.isnan(values)
+        sheet["turnover"] = _ratio(changes * periods_per_year, bars)
+        sheet["exposure"] = _ratio(exposed.sum(axis=-1), bars)
+    return {name: np.asarray(sheet[name], dtype=float) for name in TEAR_SHEET_METRICS}
+
+
+def rolling_tear_sheet(
+    equity: npt.ArrayLike,
+    window: int,
+    periods_per_year: int = 252,
+    risk_free_rate: float = 0.0,
+) -> dict[str, npt.NDArray[np.float64]]:
+    """Return :data:`ROLLING_METRICS` over a trailing window of *window* returns.
+
+    Each metric is an array shaped like *equity*; the value at bar ``t``
+    is the :func:`tear_sheet` metric of bars ``t - window`` to ``t`` and is
+    ``NaN`` for the first *window* bars and wherever *equity* is missing.
+    Windows are strided views of one run at a time, so memory grows with
+    ``bars * window`` rather than with the number of runs.
+    """
+    if window < 1:
+        raise ValueError("window must be positive")
+    values = np.asarray(equity, dtype=float)
+    if values.ndim == 0:
+        raise ValueError("equity must have at least one bar")
+    runs = values.reshape(-1, values.shape[-1])
+    out = {name: np.full(runs.shape, np.nan) for name in ROLLING_METRICS}
+    if runs.shape[-1] > window:
+        for i, run in enumerate(runs):
+            windows = np.lib.stride_tricks.sliding_window_view(run, window + 1)
+            sheet = tear_sheet(windows, None, periods_per_year, risk_free_rate)
+            missing = np.isnan(run[window:])
+            for name in ROLLING_METRICS:
+                out[name][i, window:] = np.where(missing, np.nan, sheet[name])
+    return {name: out[name].reshape(values.shape) for name in ROLLING_METRICS}
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+FloatArray = npt.NDArray[np.float64]
+
+
+def drift(
+    targets: FloatArray, anchors: FloatArray, prices: FloatArray
+) -> tuple[FloatArray, FloatArray]:
+    """Return the weights and cash share of books set to *targets* at *anchors*.
+
+    Row ``k`` of *targets* was bought at the prices in row ``k`` of *anchors*;
+    each position has since grown with its price to row ``k`` of *prices*
+    while the cash stayed flat. Columns without a position are ignored, so
+    their prices may be missing. Rows are independent: one row gives bit for
+    bit the result it gets inside a larger batch.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(targets != 0, targets * (prices / anchors), 0.0)
+    cash = 1 - targets.sum(axis=1)
+    total = cash + value.sum(axis=1)
+    return value / total[:, None], cash / total
+
+
+def weighted_returns(
+    weights: FloatArray, prev_prices: FloatArray, prices: FloatArray
+) -> tuple[FloatArray, FloatArray]:
+    """Return the returns of books holding *weights* and their per-column parts.
+
+    Row ``k`` holds the weights at the close of *prev_prices* and is marked
+    to *prices*; the return is the dot product of the weights with the
+    price changes, and the second array holds the contribution of every
+    column to it. Unheld columns contribute nothing, even without prices.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = np.where(weights != 0, prices / prev_prices - 1, 0.0)
+    return np.einsum("ij,ij->i", weights, change), weights * change
+
+
+class Portfolio:
+    """Fractional holdings and cash of a back-test, tracked bar by bar.
+
+    The book holds one weight per price column plus cash. :meth:`rebalance`
+    sets target weights at the current prices; until the next rebalance the
+    positions drift with their prices while the cash stays flat.
+    :meth:`mark` returns the return of a bar and the share of it earned by
+    every column. The arithmetic is that of :func:`drift` and
+    :func:`weighted_returns`, which price all bars of a back-test at once.
+    """
+
+    def __init__(self, columns: Sequence[str]) -> None:
+        self.columns = list(columns)
+        m = len(self.columns)
+        self.targets = np.zeros(m)
+        self.anchor = np.ones(m)
+        self.weights = np.zeros(m)
+        self.cash = 1.0
+        self._prices: FloatArray | None = None
+
+    def mark(self, prices: FloatArray) -> tuple[float, FloatArray]:
+        """Move the book to *prices* and return the bar's return and parts."""
+        ret = 0.0
+        parts = np.zeros(len(self.columns))
+        if self._prices is not None:
+            rets, contributions = weighted_returns(
+                self.weights[None], self._prices[None], prices[None]
+            )
+            ret, parts = float(rets[0]), contributions[0]
+        self._prices = prices
+        self._drift()
+        return ret, parts
+
+    def rebalance(self, targets: FloatArray) -> None:
+        """Trade the book to *targets* at the prices of the last :meth:`mark`."""
+        if self._prices is None:
+            raise ValueError("Portfolio must be marked before it can be rebalanced")
+        self.targets = targets
+        self.anchor = self._prices
+        self._drift()
+
+    def _drift(self) -> None:
+        assert self._prices is not None
+        weights, cash = drift(self.targets[None], self.anchor[None], self._prices[None])
+        self.weights, self.cash = weights[0], float(cash[0])
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+import sys
+from bisect import bisect_right
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Iterable, Iterator, TypeVar
+
+import pandas as pd
+
+T = TypeVar("T")
+
+# Upper bucket edges of the call histograms in microseconds; calls slower
+# than the last edge land in an overflow bucket.
+HISTOGRAM_EDGES_US = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 10_000, 100_000)
+
+PHASE_COLUMNS = ["calls", "seconds", "share", "us_per_call", "alloc_blocks"]
+
+
+class PhaseStats:
+    """Accumulated cost of one engine phase."""
+
+    __slots__ = ("calls", "seconds", "blocks")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.blocks = 0
+
+
+class BacktestProfiler:
+    """Opt-in instrumentation for :class:`~engine.Backtester`.
+
+    Pass an instance as ``Backtester(..., profiler=prof)`` to accumulate
+    wall time per engine phase (row extraction, mark-to-market,
+    ``next_bar``, trade bookkeeping, result assembly, ...), a latency
+    histogram of the strategy calls and, with *allocations*, the net number
+    of memory blocks allocated per phase from :func:`sys.getallocatedblocks`.
+    Several back-tests may share one profiler; their costs add up.
+
+    Used as a context manager the profiler also runs :mod:`cProfile` when
+    *cprofile* is set, whose statistics :meth:`dump_stats` writes to disk.
+    A back-test without a profiler only pays a ``None`` check per phase.
+    """
+
+    def __init__(self, allocations: bool = False, cprofile: bool = False) -> None:
+        self.allocations = allocations
+        self.phases: dict[str, PhaseStats] = {}
+        self.histograms: dict[str, list[int]] = {}
+        self._profile = cProfile.Profile() if cprofile else None
+        self._mark = 0.0
+        self._blocks = 0
+
+    def __enter__(self) -> BacktestProfiler:
+        if self._profile is not None:
+            self._profile.enable()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+
+    # -- recording -------------------------------------------------------
+
+    def start(self) -> None:
+        """Start timing the next phase."""
+        if self.allocations:
+            self._blocks = sys.getallocatedblocks()
+        self._mark = perf_counter()
+
+    def lap(self, phase: str) -> float:
+        """Charge the time since the last mark to *phase* and restart.
+
+        Returns the elapsed seconds.
+        """
+        now = perf_counter()
+        elapsed = now - self._mark
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats()
+        stats.calls += 1
+        stats.seconds += elapsed
+        if self.allocations:
+            blocks = sys.getallocatedblocks()
+            stats.blocks += blocks - self._blocks
+            self._blocks = blocks
+        self._mark = perf_counter()
+        return elapsed
+
+    def record_call(self, name: str, seconds: float) -> None:
+        """Add one call of *name* lasting *seconds* to its histogram."""
+        counts = self.histograms.get(name)
+        if counts is None:
+            counts = self.histograms[name] = [0] * (len(HISTOGRAM_EDGES_US) + 1)
+        counts[bisect_right(HISTOGRAM_EDGES_US, seconds * 1e6)] += 1
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Charge the body of the ``with`` block to phase *name*."""
+        self.start()
+        try:
+            yield
+        finally:
+            self.lap(name)
+
+    def iterate(self, phase: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Yield from *iterable*, charging the time spent in ``next`` to *phase*.
+
+        Allocation counts are not taken here; the blocks created by the
+        iterator are charged to the phase timed around it, if any.
+        """
+        iterator = iter(iterable)
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats()
+        while True:
+            start = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                stats.seconds += perf_counter() - start
+                return
+            stats.seconds += perf_counter() - start
+            stats.calls += 1
+            yield item
+
+    # -- reporting -------------------------------------------------------
+
+    def summary(self) -> pd.DataFrame:
+        """Return one row per phase, slowest first."""
+        total = sum(s.seconds for s in self.phases.values())
+        rows = {
+            name: [
+                s.calls,
+                s.seconds,
+                s.seconds / total if total else 0.0,
+                s.seconds / s.calls * 1e6 if s.calls else 0.0,
+                s.blocks if self.allocations else None,
+            ]
+            for name, s in self.phases.items()
+        }
+        frame = pd.DataFrame.from_dict(rows, orient="index", columns=PHASE_COLUMNS)
+        frame.index.name = "phase"
+        return frame.sort_values("seconds", ascending=False)
+
+    def histogram(self) -> pd.DataFrame:
+        """Return the call counts per latency bucket, one row per call site."""
+        labels = [f"<{edge}us" for edge in HISTOGRAM_EDGES_US]
+        labels.append(f">={HISTOGRAM_EDGES_US[-1]}us")
+        frame = pd.DataFrame.from_dict(self.histograms, orient="index", columns=labels)
+        frame.index.name = "call"
+        return frame
+
+    def report(self) -> str:
+        """Return the phase summary and call histograms as a text table."""
+        summary = self.summary()
+        if not self.allocations:
+            summary = summary.drop(columns="alloc_blocks")
+        lines = [summary.to_string(float_format=lambda v: f"{v:.6g}")]
+        histogram = self.histogram()
+        if not histogram.empty:
+            used = histogram.loc[:, (histogram != 0).any()]
+            lines += ["", used.to_string()]
+        return "\n".join(lines)
+
+    def dump_stats(self, path: Path | str) -> None:
+        """Write the collected :mod:`cProfile` statistics to *path*."""
+        if self._profile is None:
+            raise ValueError("Profiler was created without cprofile=True")
+        pstats.Stats(self._profile).dump_stats(str(path))
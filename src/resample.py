@@ -0,0 +1,72 @@
+"""Aggregation of intraday bars into daily or weekly bars.
+
+:func:`iter_resampled` consumes bars chunk by chunk, e.g. from
+:meth:`data.DataDownloader.iter_history`, and only ever holds one chunk and
+the unfinished period at its end, so years of minute bars resample within a
+fixed memory budget.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Iterator
+
+import pandas as pd
+
+# How each OHLCV column combines over a period; other columns keep the last.
+OHLCV_AGG = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "adj_close": "last",
+    "volume": "sum",
+}
+
+
+def _spec(columns: Iterable[str]) -> dict[str, str]:
+    return {col: OHLCV_AGG.get(col, "last") for col in columns}
+
+
+def resample_ohlcv(frame: pd.DataFrame, rule: str = "1D") -> pd.DataFrame:
+    """Return the bars of *frame* aggregated into periods of *rule*.
+
+    *rule* is a pandas offset alias: ``"1D"`` gives daily bars labelled by
+    their date, ``"W-FRI"`` weekly bars labelled by their Friday as in
+    :func:`strategies.indicators.weekly_view`. Periods without any bar are
+    dropped instead of being filled with NaN.
+    """
+    bars = frame.resample(rule).agg(_spec(frame.columns))
+    sizes = pd.Series(1, index=frame.index).resample(rule).sum()
+    bars = bars[sizes.to_numpy() > 0]
+    bars.index.name = frame.index.name
+    return bars
+
+
+def iter_resampled(
+    chunks: Iterable[pd.DataFrame], rule: str = "1D"
+) -> Iterator[pd.DataFrame]:
+    """Yield the :func:`resample_ohlcv` bars of consecutive *chunks*.
+
+    Chunks must be in time order but may split a period anywhere. Each
+    chunk is aggregated on its own; its last period is held back and merged
+    with the start of the next chunk, so every bar is yielded once and
+    complete. Concatenated, the yielded frames equal ``resample_ohlcv`` of
+    the concatenated chunks.
+    """
+    pending: pd.DataFrame | None = None
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        bars = resample_ohlcv(chunk, rule)
+        if pending is not None:
+            if bars.index[0] == pending.index[0]:
+                head = pd.concat([pending, bars.iloc[:1]])
+                merged = head.groupby(level=0).agg(_spec(head.columns))
+                bars = pd.concat([merged.astype(bars.dtypes), bars.iloc[1:]])
+            else:
+                bars = pd.concat([pending, bars])
+        if len(bars) > 1:
+            yield bars.iloc[:-1]
+        pending = bars.iloc[-1:]
+    if pending is not None:
+        yield pending
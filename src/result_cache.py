@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import pickle
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, Mapping, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from costs import CostModel
+from engine import Backtester
+from metrics import periods_per_year, tear_sheet
+from profiling import BacktestProfiler
+from strategies.base import Strategy
+
+RESULT_CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = Path(".cache") / "results"
+DEFAULT_MAX_BYTES = 512 * 2**20
+
+# Modules besides the strategy's own whose source changes every cached result.
+ENGINE_MODULES = (
+    "engine",
+    "costs",
+    "portfolio",
+    "metrics",
+    "strategies.indicators",
+    "strategies.indicator_cache",
+)
+
+# Tear sheet metrics stored with every entry and added to every sweep
+# summary row after ``max_drawdown``.
+SHEET_COLUMNS = [
+    "total_return",
+    "volatility",
+    "sharpe",
+    "sortino",
+    "calmar",
+    "ulcer_index",
+    "max_drawdown_duration",
+    "win_rate",
+    "turnover",
+    "exposure",
+]
+
+
+class CachedResult(NamedTuple):
+    """A stored back-test: the engine output and the metrics computed on it."""
+
+    results: pd.DataFrame
+    metrics: dict[str, float]
+
+
+class CacheEntry(NamedTuple):
+    """One file of a :class:`ResultCache`."""
+
+    strategy: str
+    key: str
+    size: int
+    last_used: float
+    path: Path
+
+
+def data_fingerprint(data: pd.DataFrame) -> str:
+    """Return a hash of the index, columns and values of *data*.
+
+    Numeric columns are hashed as ``float64`` so a frame and its
+    :class:`~shared_data.SharedMarketData` copy share a fingerprint.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    index = pd.DatetimeIndex(data.index)
+    digest.update(repr((index.name, str(index.dtype), list(data.columns))).encode())
+    digest.update(np.ascontiguousarray(index.values).tobytes())
+    try:
+        digest.update(np.ascontiguousarray(data.to_numpy(dtype=np.float64)).tobytes())
+    except (TypeError, ValueError):
+        hashed = pd.util.hash_pandas_object(data, index=False).to_numpy()
+        digest.update(np.ascontiguousarray(hashed).tobytes())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def code_version(cls: type[Strategy]) -> str:
+    """Return a hash of the source the results of *cls* depend on.
+
+    Covers the modules of every class in its MRO plus :data:`ENGINE_MODULES`,
+    so editing a strategy, its base classes, the indicators, the engine or
+    the metrics stored with the results retires the cached results. The
+    hash is computed once per process.
+    """
+    files = {
+        inspect.getsourcefile(klass)
+        for klass in cls.__mro__
+        if klass.__module__ != "builtins"
+    }
+    files.update(
+        inspect.getsourcefile(importlib.import_module(name)) for name in ENGINE_MODULES
+    )
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(f for f in files if f):
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def sheet_row(results: pd.DataFrame) -> dict[str, float]:
+    """Return the :data:`SHEET_COLUMNS` of the tear sheet of *results*.
+
+    Empty results have no metrics.
+    """
+    if not len(results):
+        return {}
+    sheet = tear_sheet(
+        results["equity"], results["position"], periods_per_year(results.index)
+    )
+    return {name: float(sheet[name]) for name in SHEET_COLUMNS}
+
+
+def result_key(
+    cls: type[Strategy],
+    params: Mapping[str, Any],
+    fingerprint: str,
+    costs: CostModel | None = None,
+) -> str:
+    """Return the content address of back-testing *cls* with *params*.
+
+    A :class:`~costs.CostModel` is part of the address; frictionless
+    back-tests keep the key they had before cost models existed.
+    """
+    parts: list[Any] = [
+        RESULT_CACHE_VERSION,
+        f"{cls.__module__}.{cls.__qualname__}",
+        code_version(cls),
+        params,
+        fingerprint,
+    ]
+    if costs is not None:
+        parts.append(costs._asdict())
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """Content-addressed on-disk store of back-test results.
+
+    Entries are keyed by :func:`result_key`: the strategy class and the hash
+    of its code, the parameters and the :func:`data_fingerprint` of the
+    prices. A changed input therefore simply misses; stale entries are never
+    returned and age out. Each entry is one pickle under
+    ``root/<StrategyClass>/``; reading an entry refreshes its modification
+    time, and writing one evicts the least recently used entries once the
+    cache holds more than *max_bytes*. Several processes may share a root:
+    files are replaced atomically and entries removed by another process
+    count as misses.
+    """
+
+    def __init__(
+        self, root: Path | str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES
+    ) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._usage: int | None = None
+
+    def _path(self, cls: type[Strategy], key: str) -> Path:
+        return self.root / cls.__name__ / f"{key}.pkl"
+
+    def get(self, cls: type[Strategy], key: str) -> CachedResult | None:
+        """Return the entry stored under *key*, or ``None``."""
+        path = self._path(cls, key)
+        try:
+            with open(path, "rb") as fh:
+                payload = pickle.load(fh)
+            os.utime(path)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedResult(payload["results"], payload["metrics"])
+
+    def put(
+        self,
+        cls: type[Strategy],
+        key: str,
+        results: pd.DataFrame,
+        metrics: Mapping[str, float] | None = None,
+    ) -> None:
+        """Store *results* and *metrics* under *key* and enforce the size limit."""
+        path = self._path(cls, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"results": results, "metrics": dict(metrics or {})}
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as fh:
+            pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        if self._usage is None:
+            self._usage = sum(entry.size for entry in self.entries())
+        else:
+            self._usage += path.stat().st_size
+        if self._usage > self.max_bytes:
+            self.prune(self.max_bytes)
+
+    def backtest(
+        self,
+        cls: type[Strategy],
+        params: Mapping[str, Any],
+        data: pd.DataFrame,
+        profiler: BacktestProfiler | None = None,
+        fingerprint: str | None = None,
+        costs: CostModel | None = None,
+    ) -> pd.DataFrame:
+        """Return the results of :meth:`Backtester.run_vectorized`, cached.
+
+        *fingerprint* skips hashing *data* again when the caller already
+        knows it; *costs* is passed on to the :class:`~engine.Backtester`.
+        Misses store the :func:`sheet_row` metrics with the results, as
+        :func:`sweep.run_sweep` does, so either may read the entry.
+        """
+        fingerprint = fingerprint or data_fingerprint(data)
+        key = result_key(cls, params, fingerprint, costs)
+        cached = self.get(cls, key)
+        if cached is not None:
+            return cached.results
+        backtester = Backtester(cls(**params), data, profiler=profiler, costs=costs)
+        results = backtester.run_vectorized()
+        self.put(cls, key, results, sheet_row(results))
+        return results
+
+    def entries(self) -> Iterator[CacheEntry]:
+        """Yield every stored entry, in no particular order."""
+        if not self.root.is_dir():
+            return
+        for directory in self.root.iterdir():
+            if not directory.is_dir():
+                continue
+            for path in directory.glob("*.pkl"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                yield CacheEntry(
+                    directory.name, path.stem, stat.st_size, stat.st_mtime, path
+                )
+
+    def prune(self, max_bytes: int) -> int:
+        """Delete least recently used entries until at most *max_bytes* remain.
+
+        Returns the number of entries removed.
+        """
+        entries = sorted(self.entries(), key=lambda e: e.last_used)
+        usage = sum(entry.size for entry in entries)
+        removed = 0
+        for entry in entries:
+            if usage <= max_bytes:
+                break
+            entry.path.unlink(missing_ok=True)
+            usage -= entry.size
+            removed += 1
+        self._usage = usage
+        return removed
+
+    def invalidate(self, strategy: type[Strategy] | str | None = None) -> int:
+        """Drop the entries of *strategy* (a class or class name), or all.
+
+        Returns the number of entries removed.
+        """
+        if strategy is None:
+            directories = [p for p in self.root.glob("*") if p.is_dir()]
+        else:
+            name = strategy if isinstance(strategy, str) else strategy.__name__
+            directories = [self.root / name]
+        removed = 0
+        for directory in directories:
+            if directory.is_dir():
+                removed += sum(1 for _ in directory.glob("*.pkl"))
+                shutil.rmtree(directory, ignore_errors=True)
+        self._usage = None
+        return removed
@@ -0,0 +1,586 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, ClassVar, Mapping, NamedTuple, cast
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from costs import CostModel
+from metrics import LOWER_IS_BETTER
+from result_cache import ResultCache
+from sweep import SUMMARY_COLUMNS, SweepTask, generate_param_grid, run_sweep
+
+SEARCH_STATE_VERSION = 1
+
+
+class Trial(NamedTuple):
+    """A parameter set to back-test on the last *fraction* of the history."""
+
+    params: dict[str, Any]
+    fraction: float = 1.0
+
+
+def _key(params: Mapping[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+def _is_range(value: Any) -> bool:
+    return isinstance(value, Mapping) and {"low", "high"} <= set(value)
+
+
+class SearchSpace:
+    """Parameter space of a search, written like the ``--params`` of a sweep.
+
+    Lists are choices and other values are fixed, as for
+    :func:`sweep.generate_param_grid`. A mapping with ``low`` and ``high``
+    is a range: integer when both bounds are integers, otherwise float, and
+    sampled log-uniformly with ``"log": true``. Samplers work on the unit
+    cube with one axis per choice or range.
+    """
+
+    def __init__(self, params: Mapping[str, Any]) -> None:
+        self.params = dict(params)
+        self.names = [
+            name
+            for name, value in self.params.items()
+            if isinstance(value, list) or _is_range(value)
+        ]
+        for name in self.names:
+            value = self.params[name]
+            if isinstance(value, list) and not value:
+                raise ValueError(f"No choices for parameter {name}")
+            if _is_range(value) and value["low"] > value["high"]:
+                raise ValueError(f"Empty range for parameter {name}")
+
+    @property
+    def size(self) -> float:
+        """Number of distinct parameter sets, ``inf`` with a float range."""
+        size = 1.0
+        for name in self.names:
+            value = self.params[name]
+            if isinstance(value, list):
+                size *= len(value)
+            elif self._integer(value):
+                size *= value["high"] - value["low"] + 1
+            else:
+                return math.inf
+        return size
+
+    @staticmethod
+    def _integer(value: Mapping[str, Any]) -> bool:
+        return isinstance(value["low"], int) and isinstance(value["high"], int)
+
+    def grid(self) -> list[dict[str, Any]]:
+        """Return every parameter set; ranges must be given as lists."""
+        if any(_is_range(self.params[name]) for name in self.names):
+            raise ValueError("Grid search needs lists of values, not ranges")
+        return generate_param_grid(self.params)
+
+    def from_unit(self, point: npt.ArrayLike) -> dict[str, Any]:
+        """Return the parameter set at *point* of the unit cube."""
+        coords = dict(zip(self.names, np.asarray(point, dtype=float)))
+        params: dict[str, Any] = {}
+        for name, value in self.params.items():
+            if name not in coords:
+                params[name] = value
+                continue
+            u = min(max(float(coords[name]), 0.0), 1.0)
+            if isinstance(value, list):
+                params[name] = value[min(int(u * len(value)), len(value) - 1)]
+                continue
+            low, high = value["low"], value["high"]
+            if value.get("log"):
+                x = low * (high / low) ** u
+            else:
+                x = low + u * (high - low)
+            if self._integer(value):
+                x = round(x) if value.get("log") else math.floor(x + u)
+                params[name] = int(min(max(x, low), high))
+            else:
+                params[name] = float(min(max(x, low), high))
+        return params
+
+    def to_unit(self, params: Mapping[str, Any]) -> npt.NDArray[np.float64]:
+        """Return the unit cube coordinates of *params*."""
+        point = np.empty(len(self.names))
+        for i, name in enumerate(self.names):
+            value, x = self.params[name], params[name]
+            if isinstance(value, list):
+                point[i] = (value.index(x) + 0.5) / len(value)
+                continue
+            low, high = value["low"], value["high"]
+            if value.get("log"):
+                span = math.log(high / low)
+                point[i] = math.log(x / low) / span if span else 0.5
+            elif self._integer(value):
+                point[i] = (x - low + 0.5) / (high - low + 1)
+            else:
+                point[i] = (x - low) / (high - low) if high > low else 0.5
+        return point
+
+
+class Sampler(ABC):
+    """Proposes parameter sets for :func:`run_search`.
+
+    Samplers follow an ask/tell protocol: :meth:`ask` returns up to *n*
+    trials not proposed before, :meth:`tell` reports the score of each
+    (higher is better, ``-inf`` for failures) and :meth:`release` hands back
+    asked trials that will not be evaluated. An empty :meth:`ask` means the
+    space is exhausted. :meth:`state` and :meth:`load_state` round-trip
+    everything needed to resume through JSON.
+    """
+
+    name: ClassVar[str]
+
+    def __init__(self, space: SearchSpace, seed: int = 0) -> None:
+        self.space = space
+        self.rng = np.random.default_rng(seed)
+        self.seen: set[str] = set()
+
+    @abstractmethod
+    def ask(self, n: int) -> list[Trial]:
+        """Return up to *n* trials that were not proposed before."""
+
+    def tell(self, trial: Trial, score: float) -> None:
+        pass
+
+    def release(self, trials: list[Trial]) -> None:
+        for trial in trials:
+            self.seen.discard(_key(trial.params))
+
+    def state(self) -> dict[str, Any]:
+        return {"rng": self.rng.bit_generator.state, "seen": sorted(self.seen)}
+
+    def load_state(self, state: Mapping[str, Any]) -> None:
+        self.rng.bit_generator.state = state["rng"]
+        self.seen = set(state["seen"])
+
+    def _points(self, n: int) -> npt.NDArray[np.float64]:
+        """Return *n* candidate points of the unit cube."""
+        return self.rng.random((n, len(self.space.names)))
+
+    def _unseen(
+        self,
+        n: int,
+        draws: int | None = None,
+        points: Callable[[int], npt.NDArray[np.float64]] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return up to *n* new parameter sets drawn with *points*.
+
+        *points* defaults to :meth:`_points`. With *draws* a single batch of
+        that many points is drawn and every new parameter set among them
+        returned, unmarked, for the caller to rank.
+        """
+        points = points or self._points
+        found: dict[str, dict[str, Any]] = {}
+        limit = n if draws is None else draws
+        for _ in range(1 if draws is not None else 20):
+            if len(self.seen) + len(found) >= self.space.size:
+                break
+            for point in points(max(limit - len(found), 1)):
+                params = self.space.from_unit(point)
+                key = _key(params)
+                if key not in self.seen and key not in found:
+                    found[key] = params
+            if draws is None and len(found) >= n:
+                break
+        if draws is None:
+            found = dict(list(found.items())[:n])
+            self.seen.update(found)
+        return list(found.values())
+
+
+def _latin_hypercube(
+    rng: np.random.Generator, n: int, dims: int
+) -> npt.NDArray[np.float64]:
+    """Return *n* points with exactly one in each ``1 / n`` stratum per axis."""
+    strata = rng.permuted(np.tile(np.arange(n), (dims, 1)), axis=1).T
+    points: npt.NDArray[np.float64] = (strata + rng.random((n, dims))) / n
+    return points
+
+
+class GridSampler(Sampler):
+    """Every parameter set of the grid, in :func:`generate_param_grid` order."""
+
+    name = "grid"
+
+    def ask(self, n: int) -> list[Trial]:
+        trials: list[Trial] = []
+        for params in self.space.grid():
+            if len(trials) == n:
+                break
+            key = _key(params)
+            if key not in self.seen:
+                self.seen.add(key)
+                trials.append(Trial(params))
+        return trials
+
+
+class RandomSampler(Sampler):
+    """Uniformly random parameter sets, without repeats."""
+
+    name = "random"
+
+    def ask(self, n: int) -> list[Trial]:
+        return [Trial(params) for params in self._unseen(n)]
+
+
+class LatinHypercubeSampler(Sampler):
+    """Latin hypercube batches: each batch covers every axis evenly."""
+
+    name = "lhs"
+
+    def _points(self, n: int) -> npt.NDArray[np.float64]:
+        return _latin_hypercube(self.rng, n, len(self.space.names))
+
+    def ask(self, n: int) -> list[Trial]:
+        return [Trial(params) for params in self._unseen(n)]
+
+
+class SuccessiveHalvingSampler(Sampler):
+    """Successive halving on growing trailing windows of the history.
+
+    A bracket draws *configs* random parameter sets and scores them on the
+    last *min_fraction* of the bars. The best ``1 / eta`` of each rung are
+    promoted to a window *eta* times longer until the survivors run on the
+    full history; then the next bracket starts. Only the full-length runs
+    count as results, so cheap short runs weed out poor parameters.
+    """
+
+    name = "halving"
+
+    def __init__(
+        self,
+        space: SearchSpace,
+        seed: int = 0,
+        configs: int = 27,
+        eta: int = 3,
+        min_fraction: float = 1 / 9,
+    ) -> None:
+        super().__init__(space, seed)
+        if eta < 2 or not 0 < min_fraction <= 1:
+            raise ValueError("eta must be at least 2 and min_fraction in (0, 1]")
+        self.configs = configs
+        self.eta = eta
+        self.min_fraction = min_fraction
+        self.queue: list[Trial] = []
+        self.rung: list[tuple[Trial, float]] = []
+
+    def ask(self, n: int) -> list[Trial]:
+        if not self.queue:
+            self._next_rung()
+        batch, self.queue = self.queue[:n], self.queue[n:]
+        return batch
+
+    def tell(self, trial: Trial, score: float) -> None:
+        self.rung.append((trial, score))
+
+    def release(self, trials: list[Trial]) -> None:
+        self.queue[:0] = trials
+
+    def _next_rung(self) -> None:
+        if self.rung and self.rung[0][0].fraction < 1:
+            ranked = sorted(self.rung, key=lambda item: -item[1])
+            keep = max(1, len(ranked) // self.eta)
+            fraction = self.rung[0][0].fraction * self.eta
+            if fraction > 1 - 1e-9:
+                fraction = 1.0
+            self.queue = [Trial(trial.params, fraction) for trial, _ in ranked[:keep]]
+        else:
+            fresh = self._unseen(self.configs)
+            self.queue = [Trial(params, self.min_fraction) for params in fresh]
+        self.rung = []
+
+    def state(self) -> dict[str, Any]:
+        state = super().state()
+        state["queue"] = [list(trial) for trial in self.queue]
+        state["rung"] = [[*trial, score] for trial, score in self.rung]
+        return state
+
+    def load_state(self, state: Mapping[str, Any]) -> None:
+        super().load_state(state)
+        self.queue = [Trial(params, fraction) for params, fraction in state["queue"]]
+        self.rung = [
+            (Trial(params, fraction), score)
+            for params, fraction, score in state["rung"]
+        ]
+
+
+class SurrogateSampler(Sampler):
+    """Bayesian-style search with a Gaussian process surrogate.
+
+    After *initial* Latin hypercube trials, each batch is the *candidates*
+    random points with the highest upper confidence bound
+    ``mean + kappa * std`` of a Gaussian process fitted to the scores so
+    far, with an RBF kernel of *length_scale* on the unit cube.
+    """
+
+    name = "surrogate"
+
+    def __init__(
+        self,
+        space: SearchSpace,
+        seed: int = 0,
+        initial: int = 8,
+        candidates: int = 512,
+        kappa: float = 2.0,
+        length_scale: float = 0.2,
+    ) -> None:
+        super().__init__(space, seed)
+        self.initial = initial
+        self.candidates = candidates
+        self.kappa = kappa
+        self.length_scale = length_scale
+        self.points: list[list[float]] = []
+        self.scores: list[float] = []
+
+    def _kernel(
+        self, a: npt.NDArray[np.float64], b: npt.NDArray[np.float64]
+    ) -> npt.NDArray[np.float64]:
+        sq = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=-1)
+        kernel: npt.NDArray[np.float64] = np.exp(-sq / (2 * self.length_scale**2))
+        return kernel
+
+    def ask(self, n: int) -> list[Trial]:
+        if len(self.scores) < self.initial:
+            dims = len(self.space.names)
+            initial = self._unseen(
+                n, points=lambda k: _latin_hypercube(self.rng, k, dims)
+            )
+            return [Trial(params) for params in initial]
+        candidates = self._unseen(n, draws=self.candidates)
+        if not candidates:
+            return []
+        x = np.array(self.points)
+        y = np.array(self.scores)
+        scale = y.std() or 1.0
+        target = (y - y.mean()) / scale
+        chol = np.linalg.cholesky(self._kernel(x, x) + 1e-6 * np.eye(len(x)))
+        alpha = np.linalg.solve(chol.T, np.linalg.solve(chol, target))
+        grid = np.array([self.space.to_unit(p) for p in candidates])
+        cross = self._kernel(grid, x)
+        mean = cross @ alpha
+        v = np.linalg.solve(chol, cross.T)
+        std = np.sqrt(np.clip(1.0 - (v**2).sum(axis=0), 0.0, None))
+        order = np.argsort(-(mean + self.kappa * std), kind="stable")[:n]
+        chosen = [candidates[i] for i in order]
+        self.seen.update(_key(p) for p in chosen)
+        return [Trial(p) for p in chosen]
+
+    def tell(self, trial: Trial, score: float) -> None:
+        if np.isfinite(score):
+            self.points.append(self.space.to_unit(trial.params).tolist())
+            self.scores.append(float(score))
+
+    def state(self) -> dict[str, Any]:
+        state = super().state()
+        state.update(points=self.points, scores=self.scores)
+        return state
+
+    def load_state(self, state: Mapping[str, Any]) -> None:
+        super().load_state(state)
+        self.points = [list(p) for p in state["points"]]
+        self.scores = list(state["scores"])
+
+
+SAMPLERS: dict[str, type[Sampler]] = {
+    cls.name: cls
+    for cls in (
+        GridSampler,
+        RandomSampler,
+        LatinHypercubeSampler,
+        SuccessiveHalvingSampler,
+        SurrogateSampler,
+    )
+}
+
+
+class SearchResult(NamedTuple):
+    """Outcome of :func:`run_search`.
+
+    ``summary`` has the :data:`sweep.SUMMARY_COLUMNS` rows of every
+    full-length back-test, ``trials`` one row per evaluated trial with its
+    ``params``, ``fraction`` and ``score`` (the metric averaged over the
+    tickers) and ``best`` the best full-length parameter set.
+    """
+
+    summary: pd.DataFrame
+    trials: pd.DataFrame
+    best: dict[str, Any] | None
+
+
+def _evaluate(
+    strategy: str,
+    trials: list[Trial],
+    data: Mapping[str, pd.DataFrame],
+    start: str,
+    end: str,
+    jobs: int | None,
+    cache: ResultCache | None,
+    costs: CostModel | None,
+) -> list[list[dict[str, Any]]]:
+    """Return the summary rows, one per ticker, of every trial."""
+    rows: list[list[dict[str, Any]]] = [[] for _ in trials]
+    for fraction in sorted({trial.fraction for trial in trials}):
+        picked = [i for i, trial in enumerate(trials) if trial.fraction == fraction]
+        window = data
+        window_start = start
+        if fraction < 1:
+            window = {
+                t: frame.iloc[-max(2, math.ceil(fraction * len(frame))) :]
+                for t, frame in data.items()
+            }
+            first = max(frame.index[0] for frame in window.values())
+            window_start = f"{first:%Y-%m-%d}"
+        tasks = [
+            SweepTask(strategy, trials[i].params, ticker)
+            for i in picked
+            for ticker in data
+        ]
+        summary = run_sweep(
+            tasks, window, window_start, end, jobs=jobs, cache=cache, costs=costs
+        )
+        records = cast(list[dict[str, Any]], summary.to_dict("records"))
+        for n, i in enumerate(picked):
+            rows[i] = records[n * len(data) : (n + 1) * len(data)]
+    return rows
+
+
+def _save(path: Path, state: Mapping[str, Any]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+def run_search(
+    strategy: str,
+    space: SearchSpace,
+    data: Mapping[str, pd.DataFrame],
+    start: str,
+    end: str,
+    sampler: str = "random",
+    budget: float = 100,
+    metric: str = "sharpe",
+    patience: int | None = None,
+    batch: int | None = None,
+    seed: int = 0,
+    state_path: Path | str | None = None,
+    jobs: int | None = 1,
+    cache: ResultCache | None = None,
+    costs: CostModel | None = None,
+    **options: Any,
+) -> SearchResult:
+    """Search *space* for the parameters of *strategy* with the best *metric*.
+
+    *sampler* names an entry of :data:`SAMPLERS`, created with *seed* and
+    *options*. Trials are evaluated in batches of *batch* (default: one per
+    worker) with :func:`sweep.run_sweep` on every ticker of *data*, and
+    scored by *metric*, any summary column such as ``sharpe`` or ``cagr``,
+    averaged over the tickers; :data:`~metrics.LOWER_IS_BETTER` metrics are
+    minimized.
+
+    *budget* caps the number of back-tests in full-history equivalents: a
+    trial on a quarter of the bars costs ``0.25``. With *patience* the
+    search stops once that many full-length trials in a row failed to
+    improve the best score. With *state_path* the trials and the sampler
+    state are saved there after every batch, and a later call with the same
+    arguments resumes from it, e.g. with a larger budget. Every back-test
+    is charged the :class:`~costs.CostModel` *costs*.
+    """
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Unknown sampler: {sampler}")
+    if metric not in SUMMARY_COLUMNS[4:]:
+        raise ValueError(f"Unknown metric: {metric}")
+    proposer = SAMPLERS[sampler](space, seed, **options)
+    sign = -1.0 if metric in LOWER_IS_BETTER else 1.0
+    batch = batch or max(1, jobs or os.cpu_count() or 1)
+    header = {
+        "version": SEARCH_STATE_VERSION,
+        "strategy": strategy,
+        "space": space.params,
+        "tickers": list(data),
+        "metric": metric,
+        "sampler": sampler,
+        "seed": seed,
+        "options": options,
+        "costs": None if costs is None else costs._asdict(),
+    }
+    trials: list[dict[str, Any]] = []
+    spent = 0.0
+    best = -math.inf
+    stale = 0
+
+    path = None if state_path is None else Path(state_path)
+    if path is not None and path.exists():
+        state = json.loads(path.read_text())
+        saved = {name: state.get(name) for name in header}
+        if saved != json.loads(json.dumps(header)):
+            raise ValueError(f"Search state {path} belongs to a different search")
+        proposer.load_state(state["sampler_state"])
+        trials = state["trials"]
+        spent, best, stale = state["spent"], state["best"], state["stale"]
+
+    while spent < budget and not (patience and stale >= patience):
+        asked = proposer.ask(batch)
+        take: list[Trial] = []
+        cost = spent
+        for trial in asked:
+            if cost + trial.fraction > budget + 1e-9:
+                break
+            take.append(trial)
+            cost += trial.fraction
+        proposer.release(asked[len(take) :])
+        if not take:
+            break
+        results = _evaluate(strategy, take, data, start, end, jobs, cache, costs)
+        for trial, rows in zip(take, results):
+            score = float(np.mean([row[metric] for row in rows]))
+            objective = sign * score if not math.isnan(score) else -math.inf
+            proposer.tell(trial, objective)
+            trials.append(
+                {
+                    "params": trial.params,
+                    "fraction": trial.fraction,
+                    "score": score,
+                    "rows": rows,
+                }
+            )
+            if trial.fraction >= 1:
+                if objective > best:
+                    best, stale = objective, 0
+                else:
+                    stale += 1
+        spent = cost
+        if path is not None:
+            _save(
+                path,
+                {
+                    **header,
+                    "sampler_state": proposer.state(),
+                    "trials": trials,
+                    "spent": spent,
+                    "best": best,
+                    "stale": stale,
+                },
+            )
+
+    full = [t for t in trials if t["fraction"] >= 1]
+    summary = pd.DataFrame(
+        [row for t in full for row in t["rows"]], columns=SUMMARY_COLUMNS
+    )
+    table = pd.DataFrame(
+        {
+            "params": [_key(t["params"]) for t in trials],
+            "fraction": [float(t["fraction"]) for t in trials],
+            "score": [t["score"] for t in trials],
+        }
+    )
+    ranked = [t for t in full if not math.isnan(t["score"])]
+    top = max(ranked, key=lambda t: sign * t["score"], default=None)
+    return SearchResult(summary, table, None if top is None else dict(top["params"]))
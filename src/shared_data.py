@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+
+class SharedDataHandle(NamedTuple):
+    """Picklable description of a published price matrix."""
+
+    name: str
+    rows: int
+    columns: tuple[str, ...]
+    index_name: str | None
+    tz: str | None
+
+
+class SharedMarketData:
+    """Aligned price matrix stored once in shared memory.
+
+    The owning process publishes a DataFrame with :meth:`publish` and passes
+    :attr:`handle` to other processes, which :meth:`attach` to the same
+    block. The block holds the timestamps followed by one contiguous
+    ``float64`` run per column, so :meth:`column` and :meth:`to_frame` are
+    zero-copy views in every process. Views are read-only and must be
+    released before :meth:`close`.
+    """
+
+    def __init__(
+        self, shm: SharedMemory, handle: SharedDataHandle, owner: bool
+    ) -> None:
+        self._shm = shm
+        self.handle = handle
+        self._owner = owner
+        rows, width = handle.rows, len(handle.columns)
+        buffer = np.ndarray((rows * (width + 1),), dtype=np.float64, buffer=shm.buf)
+        self._stamps = buffer[:rows].view("M8[ns]")
+        self._values = buffer[rows:].reshape(width, rows)
+        self._stamps.flags.writeable = False
+        self._values.flags.writeable = False
+        self._positions = {c: i for i, c in enumerate(handle.columns)}
+
+    @classmethod
+    def publish(cls, frame: pd.DataFrame) -> SharedMarketData:
+        """Copy *frame* into a new shared memory block owned by the caller.
+
+        Values are stored as ``float64`` with missing values as ``NaN``; the
+        index must be a :class:`~pandas.DatetimeIndex`.
+        """
+        if not isinstance(frame.index, pd.DatetimeIndex):
+            raise ValueError("Shared market data requires a DatetimeIndex")
+        index = frame.index
+        tz = None if index.tz is None else str(index.tz)
+        if tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        rows, width = frame.shape
+        shm = SharedMemory(create=True, size=max(8, 8 * rows * (width + 1)))
+        name = None if index.name is None else str(index.name)
+        handle = SharedDataHandle(
+            shm.name, rows, tuple(str(c) for c in frame.columns), name, tz
+        )
+        buffer = np.ndarray((rows * (width + 1),), dtype=np.float64, buffer=shm.buf)
+        buffer[:rows].view("M8[ns]")[:] = index.as_unit("ns").to_numpy()
+        buffer[rows:].reshape(width, rows)[:] = frame.to_numpy(
+            dtype=float, na_value=np.nan
+        ).T
+        del buffer
+        return cls(shm, handle, owner=True)
+
+    @classmethod
+    def attach(cls, handle: SharedDataHandle) -> SharedMarketData:
+        """Open the block described by *handle* without copying it."""
+        return cls(SharedMemory(name=handle.name), handle, owner=False)
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return self.handle.columns
+
+    @property
+    def values(self) -> npt.NDArray[np.float64]:
+        """Column-major ``(columns, rows)`` view of the prices."""
+        return self._values
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(self._stamps, name=self.handle.index_name)
+        if self.handle.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(self.handle.tz)
+        return index
+
+    def column(self, name: str) -> npt.NDArray[np.float64]:
+        """Return the values of column *name* as a contiguous view."""
+        try:
+            position = self._positions[name]
+        except KeyError:
+            raise KeyError(f"Unknown column: {name}") from None
+        values: npt.NDArray[np.float64] = self._values[position]
+        return values
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return a DataFrame backed by the shared block."""
+        return pd.DataFrame(
+            self._values.T, index=self.index, columns=list(self.columns), copy=False
+        )
+
+    def close(self) -> None:
+        """Release this process' mapping and free the block if owned."""
+        del self._stamps, self._values
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> SharedMarketData:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
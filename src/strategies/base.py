@@ -1,14 +1,68 @@
 from __future__ import annotations
 
+import copy
+import pickle
+import struct
+import zlib
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, ClassVar, Iterable
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
 
+SNAPSHOT_MAGIC = b"STSN"
+SNAPSHOT_VERSION = 1
+# magic, format version, as-of timestamp in ns (NaT when unknown), class
+# name length; followed by the class name and the zlib-compressed state
+_SNAPSHOT_HEADER = struct.Struct("<4sHqH")
+_NAT = np.iinfo(np.int64).min
+
+
+def signal_series(signals: Iterable[Any], index: pd.Index[Any]) -> pd.Series[Any]:
+    """Return *signals* as an object Series aligned to *index*."""
+    values = np.empty(len(index), dtype=object)
+    values[:] = list(signals)
+    return pd.Series(values, index=index, name="signal")
+
+
+def position_signals(position: npt.NDArray[np.int64]) -> list[str]:
+    """Return BUY/SELL/HOLD for the transitions of a 0/1 *position* array.
+
+    The position before the first bar is flat, as after :meth:`Strategy.reset`.
+    """
+    prev = np.concatenate(([0], position[:-1]))
+    signals = np.where(
+        position > prev, "BUY", np.where(position < prev, "SELL", "HOLD")
+    )
+    return [str(s) for s in signals]
+
+
+def latch_positions(
+    enter: npt.NDArray[np.bool_], exit: npt.NDArray[np.bool_]
+) -> npt.NDArray[np.int64]:
+    """Return the 0/1 position of a strategy that enters and exits on flags.
+
+    The position switches to 1 on *enter* and back to 0 on *exit* and is
+    carried forward otherwise. *enter* and *exit* must not both be set on
+    the same bar.
+    """
+    state = np.where(enter, 1.0, np.where(exit, 0.0, np.nan))
+    filled = pd.Series(state).ffill().fillna(0.0)
+    return filled.to_numpy().astype(np.int64)
+
+
 class Strategy(ABC):
     """Base class for trading strategies."""
 
+    param_constraints: ClassVar[tuple[str, ...]] = ()
+    """Comparisons every valid parameter set satisfies, e.g. ``"fast < slow"``.
+
+    Parameter sweeps skip the sets that break them; see
+    :class:`sweep.Constraint` for the syntax.
+    """
+
     def __init__(self, **params: Any) -> None:
         self.params = params
         self.reset()
@@ -23,16 +77,68 @@ class Strategy(ABC):
         """Process the next market bar and return a trading signal."""
         raise NotImplementedError
 
+    def snapshot(self, as_of: pd.Timestamp | None = None) -> bytes:
+        """Return the internal state as a compact, versioned binary blob.
 
-class HistoryStrategy(Strategy):
-    """Base strategy that keeps a history of closing prices."""
+        The blob holds everything :meth:`next_bar` depends on, i.e. the
+        parameters, position, history buffers and indicator accumulators.
+        *as_of* records the timestamp of the last bar fed to the strategy
+        so the caller knows where to resume.
+        """
+        name = type(self).__qualname__.encode()
+        stamp = _NAT if as_of is None else pd.Timestamp(as_of).as_unit("ns").value
+        header = _SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, stamp, len(name)
+        )
+        state = pickle.dumps(self.__dict__, protocol=pickle.HIGHEST_PROTOCOL)
+        return header + name + zlib.compress(state)
 
-    def __init__(self, **params: Any) -> None:  # noqa: D401 - simple init
-        """Initialize strategy and close history."""
-        super().__init__(**params)
-        self._close_history = pd.Series(dtype=float)
+    def restore(self, snapshot: bytes) -> pd.Timestamp | None:
+        """Replace the state of this instance with *snapshot*.
 
-    def reset(self) -> None:
-        """Reset state and clear close history."""
-        super().reset()
-        self._close_history = pd.Series(dtype=float)
+        *snapshot* must come from :meth:`snapshot` of the same strategy
+        class; its parameters replace those of this instance. Returns the
+        recorded as-of timestamp. Snapshots are unpickled, so only restore
+        ones from a trusted source.
+        """
+        size = _SNAPSHOT_HEADER.size
+        try:
+            magic, version, stamp, length = _SNAPSHOT_HEADER.unpack_from(snapshot)
+        except struct.error:
+            raise ValueError("Not a strategy snapshot") from None
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Not a strategy snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported strategy snapshot version {version}")
+        name = snapshot[size : size + length].decode()
+        if name != type(self).__qualname__:
+            raise ValueError(
+                f"Snapshot of {name} cannot restore {type(self).__qualname__}"
+            )
+        state = pickle.loads(zlib.decompress(snapshot[size + length :]))
+        self.__dict__.clear()
+        self.__dict__.update(state)
+        return None if stamp == _NAT else pd.Timestamp(stamp)
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.Series[Any]:
+        """Return the signal for every bar of *df* in one call.
+
+        Signals are those a freshly reset strategy would emit from
+        :meth:`next_bar`. The default replays ``next_bar`` on a copy, so the
+        live state of this instance is left untouched; subclasses override it
+        with vectorized implementations.
+        """
+        strategy = copy.deepcopy(self)
+        strategy.reset()
+        return signal_series(
+            (strategy.next_bar(bar) for _, bar in df.iterrows()), df.index
+        )
+
+
+class HistoryStrategy(Strategy):
+    """Base strategy for look-back calculations on the ``close`` column.
+
+    Subclasses keep no raw close history: their look-back windows live in
+    the bounded incremental indicators of :mod:`strategies.indicators`,
+    which :meth:`reset` recreates.
+    """
@@ -2,38 +2,37 @@ from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
-from .base import Strategy as BaseStrategy
+from .base import HistoryStrategy, signal_series
+from .indicators import RollingStats, WeeklyBars, weekly_sma, weekly_std, weekly_view
 
 
-class BollingerStrategy(BaseStrategy):
+class BollingerStrategy(HistoryStrategy):
     """Weekly Bollinger Band mean-reversion strategy."""
 
     def __init__(self, length: int = 20, dev: float = 2.0) -> None:
-        super().__init__(length=length, dev=dev)
         self.length = length
         self.dev = dev
-        self._close_history = pd.Series(dtype=float)
+        super().__init__(length=length, dev=dev)
 
     def reset(self) -> None:
         super().reset()
-        self._close_history = pd.Series(dtype=float)
+        self._weekly = WeeklyBars()
+        self._stats = RollingStats(self.length)
 
     def next_bar(self, bar: pd.Series[Any]) -> str:
         if not isinstance(bar.name, pd.Timestamp):
             raise ValueError("Bar index must be a pd.Timestamp for Bollinger strategy")
         close = float(bar["close"])
-        self._close_history.at[bar.name] = close
 
-        weekly_close = self._close_history.resample("W-FRI").last()
-        ma = weekly_close.rolling(self.length).mean()
-        std = weekly_close.rolling(self.length).std()
-        lower_band = ma - self.dev * std
+        for week_close in self._weekly.update(bar.name, close):
+            self._stats.update(week_close)
 
-        last_close = float(weekly_close.iloc[-1])
-        lb = lower_band.iloc[-1]
-        mid = ma.iloc[-1]
+        last_close = self._weekly.current
+        mid = self._stats.mean(last_close)
+        lb = mid - self.dev * self._stats.std(last_close)
 
         if pd.isna(lb) or pd.isna(mid):
             return "HOLD"
@@ -43,3 +42,24 @@ class BollingerStrategy(BaseStrategy):
         if last_close >= float(mid):
             return "SELL"
         return "HOLD"
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.Series[Any]:
+        """Return Bollinger Band signals for every bar of *df*."""
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError(
+                "Data index must be a DatetimeIndex for Bollinger strategy"
+            )
+        close = df["close"]
+        view = weekly_view(close)
+        ma = weekly_sma(close, self.length)
+        std = weekly_std(close, self.length)
+        lower_band = ma - self.dev * std
+
+        last_close = view.partial
+        signals = np.where(
+            last_close < lower_band,
+            "BUY",
+            np.where(last_close >= ma, "SELL", "HOLD"),
+        )
+        signals = np.where(np.isnan(lower_band), "HOLD", signals)
+        return signal_series(signals.tolist(), df.index)
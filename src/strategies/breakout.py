@@ -2,42 +2,64 @@ from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
-from .base import Strategy as BaseStrategy
+from .base import HistoryStrategy, signal_series
+from .indicator_cache import INDICATORS
+from .indicators import (
+    RollingMax,
+    RollingStats,
+    WeeklyBars,
+    WeeklyView,
+    previous_week,
+    weekly_view,
+)
 
 
-class BreakoutStrategy(BaseStrategy):
+def _previous_weeks_high(view: WeeklyView, weeks: int) -> npt.NDArray[np.float64]:
+    """Return the highest weekly close of the *weeks* weeks before each bar's."""
+    if weeks <= 0:
+        return np.full(len(view.week), -np.inf)
+    highest = previous_week(
+        pd.Series(view.weekly).rolling(weeks, min_periods=1).max().to_numpy(),
+        view.week,
+    )
+    return np.where(view.week == 0, -np.inf, highest)
+
+
+class BreakoutStrategy(HistoryStrategy):
     """52-week high breakout momentum strategy."""
 
     def __init__(self, lookback_weeks: int = 52, stop_pct: float = 0.08) -> None:
-        super().__init__(lookback_weeks=lookback_weeks, stop_pct=stop_pct)
         self.lookback_weeks = lookback_weeks
         self.stop_pct = stop_pct
-        self._close_history = pd.Series(dtype=float)
-        self._highest_close: float | None = None
+        super().__init__(lookback_weeks=lookback_weeks, stop_pct=stop_pct)
 
     def reset(self) -> None:
         super().reset()
-        self._close_history = pd.Series(dtype=float)
-        self._highest_close = None
+        self._highest_close: float | None = None
+        self._weekly = WeeklyBars()
+        self._weekly_high = RollingMax(self.lookback_weeks)
+        self._sma_200 = RollingStats(200)
 
     def next_bar(self, bar: pd.Series[Any]) -> str:
         """Return trading signal based on breakout logic."""
         if not isinstance(bar.name, pd.Timestamp):
             raise ValueError("Bar index must be a pd.Timestamp for Breakout strategy")
         close = float(bar["close"])
-        self._close_history.at[bar.name] = close
 
-        weekly_close = self._close_history.resample("W-FRI").last()
-        current_week_close = float(weekly_close.iloc[-1])
-        lookback_window = weekly_close.iloc[-self.lookback_weeks - 1 : -1]
-        if lookback_window.empty:
+        for week_close in self._weekly.update(bar.name, close):
+            self._weekly_high.update(week_close)
+        current_week_close = self._weekly.current
+        if self._weekly_high.count == 0:
             highest_weekly_close = float("-inf")
         else:
-            highest_weekly_close = float(lookback_window.max())
+            highest_weekly_close = self._weekly_high.value
 
-        sma_200 = self._close_history.rolling(window=200).mean().iloc[-1]
+        self._sma_200.update(close)
+        sma_200 = self._sma_200.mean()
         sma_200_value: float | None = float(sma_200) if not pd.isna(sma_200) else None
 
         signal = "HOLD"
@@ -60,3 +82,53 @@ class BreakoutStrategy(BaseStrategy):
                 self.position = 0
                 self._highest_close = None
         return signal
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.Series[Any]:
+        """Return breakout signals for every bar of *df*.
+
+        Indicators are computed for all bars at once; only the trailing stop,
+        which depends on the entry, is tracked in a scalar pass.
+        """
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError(
+                "Data index must be a DatetimeIndex for Breakout strategy"
+            )
+        close = df["close"].astype(float)
+        view = weekly_view(close)
+        highest = INDICATORS.get(
+            close,
+            "previous_weeks_high",
+            self.lookback_weeks,
+            lambda: _previous_weeks_high(view, self.lookback_weeks),
+        )
+        sma_200 = INDICATORS.get(
+            close, "sma", 200, lambda: close.rolling(window=200).mean().to_numpy()
+        )
+
+        signals = []
+        position = 0
+        highest_close: float | None = None
+        for current, high, price, sma in zip(
+            view.partial.tolist(),
+            highest.tolist(),
+            close.tolist(),
+            sma_200.tolist(),
+        ):
+            signal = "HOLD"
+            if position == 0:
+                if current > high:
+                    signal = "BUY"
+                    position = 1
+                    highest_close = current
+            else:
+                if highest_close is None:
+                    highest_close = current
+                highest_close = max(highest_close, current)
+                if current < highest_close * (1 - self.stop_pct) or (
+                    not np.isnan(sma) and price < sma
+                ):
+                    signal = "SELL"
+                    position = 0
+                    highest_close = None
+            signals.append(signal)
+        return signal_series(signals, df.index)
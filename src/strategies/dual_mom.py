@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+from collections import deque
 from typing import Any, Iterable
 
 import pandas as pd
 
 from .base import Strategy as BaseStrategy
+from .indicators import WeeklyBars
 
 
 class DualMomentumStrategy(BaseStrategy):
@@ -16,7 +18,6 @@ class DualMomentumStrategy(BaseStrategy):
         self.universe = list(universe)
         self.lookback_weeks = lookback_weeks
         self.top_k = top_k
-        self._close_history: dict[str, pd.Series[float]] = {}
         self._current_symbol: str | None = None
         super().__init__(
             universe=self.universe, lookback_weeks=lookback_weeks, top_k=top_k
@@ -24,8 +25,11 @@ class DualMomentumStrategy(BaseStrategy):
 
     def reset(self) -> None:
         super().reset()
-        self._close_history = {t: pd.Series(dtype=float) for t in self.universe}
         self._current_symbol = None
+        self._weekly = {t: WeeklyBars() for t in self.universe}
+        self._past_weeks: dict[str, deque[float]] = {
+            t: deque(maxlen=self.lookback_weeks) for t in self.universe
+        }
 
     @staticmethod
     def _is_month_end(ts: pd.Timestamp) -> bool:
@@ -38,22 +42,19 @@ class DualMomentumStrategy(BaseStrategy):
             )
         ts = bar.name
         for ticker in self.universe:
-            series = self._close_history.setdefault(ticker, pd.Series(dtype=float))
-            series.at[ts] = float(bar[ticker])
+            close = float(bar[ticker])
+            self._past_weeks[ticker].extend(self._weekly[ticker].update(ts, close))
 
         signal = "HOLD"
         if self._is_month_end(ts):
-            weekly = {
-                t: series.resample("W-FRI").last()
-                for t, series in self._close_history.items()
-            }
             trailing: dict[str, float] = {}
-            for t, series in weekly.items():
-                if len(series) < self.lookback_weeks + 1:
+            for t, weekly in self._weekly.items():
+                if weekly.count < self.lookback_weeks + 1:
                     trailing[t] = float("-inf")
                 else:
-                    start = float(series.iloc[-self.lookback_weeks - 1])
-                    end = float(series.iloc[-1])
+                    past = self._past_weeks[t]
+                    end = weekly.current
+                    start = past[0] if past else end
                     trailing[t] = (end - start) / start
             ranked = sorted(trailing, key=lambda t: trailing[t], reverse=True)
             winners = [t for t in ranked[: self.top_k] if trailing[t] > 0]
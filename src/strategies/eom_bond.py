@@ -2,10 +2,11 @@ from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
 import pandas as pd
 from pandas.tseries.offsets import BDay, BMonthEnd
 
-from .base import Strategy
+from .base import Strategy, position_signals, signal_series
 
 
 class EndOfMonthBondPopStrategy(Strategy):
@@ -35,3 +36,15 @@ class EndOfMonthBondPopStrategy(Strategy):
             self.position = 0
             return "SELL"
         return "HOLD"
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.Series[Any]:
+        """Return window entry and exit signals for every bar of *df*."""
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError(
+                "Data index must be a DatetimeIndex for EndOfMonthBondPop strategy"
+            )
+        ts = df.index
+        end = ts + BMonthEnd(0)
+        start = end - BDay(self.hold_days - 1)
+        active = np.asarray((start <= ts) & (ts <= end))
+        return signal_series(position_signals(active.astype("int64")), df.index)
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 from .base import Strategy as BaseStrategy
+from .base import signal_series
 
 
 class IBSStrategy(BaseStrategy):
@@ -15,26 +17,27 @@ class IBSStrategy(BaseStrategy):
         self.buy_thr = buy_thr
         self.sell_thr = sell_thr
 
-    def next_bar(self, bar: pd.Series[Any]) -> str:
-        """Return trading signal based on IBS."""
+    @staticmethod
+    def _columns(labels: pd.Index[Any]) -> tuple[str, str, str]:
+        """Return the high, low and close column names found in *labels*."""
         high_col = "high"
         low_col = "low"
         close_col = "close"
 
-        if high_col not in bar.index:
+        if high_col not in labels:
             prefixes = {
                 c.removesuffix("_high")
-                for c in bar.index
+                for c in labels
                 if c.endswith("_high")
             }
             prefixes &= {
                 c.removesuffix("_low")
-                for c in bar.index
+                for c in labels
                 if c.endswith("_low")
             }
             prefixes &= {
                 c.removesuffix("_close")
-                for c in bar.index
+                for c in labels
                 if c.endswith("_close")
             }
 
@@ -45,7 +48,11 @@ class IBSStrategy(BaseStrategy):
                 close_col = f"{prefix}_close"
             else:
                 raise KeyError("Missing high/low/close columns")
+        return high_col, low_col, close_col
 
+    def next_bar(self, bar: pd.Series[Any]) -> str:
+        """Return trading signal based on IBS."""
+        high_col, low_col, close_col = self._columns(bar.index)
         high = float(bar[high_col])
         low = float(bar[low_col])
         close = float(bar[close_col])
@@ -60,3 +67,19 @@ class IBSStrategy(BaseStrategy):
         if ibs >= self.sell_thr:
             return "SELL"
         return "HOLD"
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.Series[Any]:
+        """Return IBS signals for every bar of *df*."""
+        high_col, low_col, close_col = self._columns(df.columns)
+        high = df[high_col].to_numpy(dtype=float)
+        low = df[low_col].to_numpy(dtype=float)
+        close = df[close_col].to_numpy(dtype=float)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ibs = np.where(high == low, 0.5, (close - low) / (high - low))
+        signals = np.where(
+            ibs <= self.buy_thr,
+            "BUY",
+            np.where(ibs >= self.sell_thr, "SELL", "HOLD"),
+        )
+        return signal_series(signals.tolist(), df.index)
@@ -0,0 +1,127 @@
+"""Memoized indicator arrays shared by strategies and parameter sets.
+
+Strategies ask :data:`INDICATORS` for an indicator of a close series instead
+of computing it inline. Entries are keyed by a fingerprint of the series, the
+indicator name and its parameters, so a sweep over ``dev`` reuses the
+Bollinger moving average of every ``length``, and Bollinger and
+LeveragedTrend share the same weekly SMA.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, TypeVar
+
+import numpy as np
+import pandas as pd
+
+T = TypeVar("T")
+
+DEFAULT_INDICATOR_BYTES = 256 * 2**20
+
+
+def series_fingerprint(series: pd.Series[Any]) -> str:
+    """Return a hash of the index and ``float64`` values of *series*."""
+    digest = hashlib.blake2b(digest_size=16)
+    index = series.index
+    digest.update(str(index.dtype).encode())
+    if index.dtype == object:
+        labels = pd.util.hash_pandas_object(index, index=False).to_numpy()
+    else:
+        labels = np.asarray(index.values)
+    digest.update(np.ascontiguousarray(labels).tobytes())
+    digest.update(np.ascontiguousarray(series.to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def _freeze(value: Any) -> int:
+    """Make the arrays of *value* read-only and return their size in bytes."""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sum(_freeze(item) for item in value)
+    return 0
+
+
+class IndicatorCache:
+    """In-memory LRU store of indicator arrays.
+
+    Entries are keyed by ``(data fingerprint, indicator, params)``. Cached
+    arrays are shared between callers and therefore made read-only. Once
+    the arrays held exceed *max_bytes* the least recently used entries are
+    dropped; ``max_bytes=0`` disables caching. :attr:`hits`,
+    :attr:`misses` and :attr:`evictions` count lookups for tuning the size.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_INDICATOR_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries: OrderedDict[tuple[str, str, Hashable], tuple[Any, int]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        series: pd.Series[Any],
+        name: str,
+        params: Hashable,
+        compute: Callable[[], T],
+    ) -> T:
+        """Return indicator *name* of *series* for *params*, computing once.
+
+        *compute* is called on a miss; its result, an array or a tuple of
+        arrays, is stored unless it alone exceeds :attr:`max_bytes`.
+        """
+        key = (series_fingerprint(series), name, params)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]  # type: ignore[no-any-return]
+        self.misses += 1
+        value = compute()
+        size = _freeze(value)
+        if size <= self.max_bytes:
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            self._evict()
+        return value
+
+    def resize(self, max_bytes: int) -> None:
+        """Change the size limit, evicting entries beyond the new one."""
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        self._entries.clear()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        """Return the counters, entry count and bytes held."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+        }
+
+    def _evict(self) -> None:
+        while self.nbytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.nbytes -= size
+            self.evictions += 1
+
+
+INDICATORS = IndicatorCache()
+"""Process-wide cache the strategies compute their indicators through."""
@@ -0,0 +1,585 @@
+"""Indicator helpers shared by the strategies.
+
+Most strategies evaluate their indicators on a weekly (``W-FRI``) resample of
+the closes seen so far, in which the last week is still in progress. The batch
+helpers reproduce that view for every bar of a history at once:
+:func:`weekly_view` splits daily closes into completed weekly closes plus the
+running close of the current week, and the ``partial_*`` functions evaluate an
+indicator over "completed weeks + current partial week" for each bar.
+
+The streaming classes further down keep the same indicators up to date one
+bar at a time in O(1) (O(log n) for the median), for the live ``next_bar``
+path.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from heapq import heapify, heappop, heappush
+from math import copysign, sqrt
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from .indicator_cache import INDICATORS
+
+FloatArray = npt.NDArray[np.float64]
+IntArray = npt.NDArray[np.int64]
+
+
+class WeeklyView(NamedTuple):
+    """Weekly closes of a daily series as seen from each bar."""
+
+    weekly: FloatArray
+    """Final close of every ``W-FRI`` week (``NaN`` for empty weeks)."""
+    week: IntArray
+    """Position in ``weekly`` of the week each bar belongs to."""
+    partial: FloatArray
+    """Close of the bar's week as of that bar."""
+
+
+def weekly_view(close: pd.Series[float]) -> WeeklyView:
+    """Return the :class:`WeeklyView` of a daily *close* series.
+
+    Views are memoized in :data:`~strategies.indicator_cache.INDICATORS`,
+    so their arrays are read-only.
+    """
+    return INDICATORS.get(close, "weekly_view", (), lambda: _weekly_view(close))
+
+
+def _weekly_view(close: pd.Series[float]) -> WeeklyView:
+    close = close.astype(float)
+    weekly = close.resample("W-FRI").last()
+    index = pd.DatetimeIndex(close.index)
+    labels = index.normalize() + pd.to_timedelta((4 - index.weekday) % 7, unit="D")
+    week = weekly.index.searchsorted(labels).astype(np.int64)
+    partial = np.asarray(close.groupby(week).ffill(), dtype=np.float64)
+    return WeeklyView(np.asarray(weekly, dtype=np.float64), week, partial)
+
+
+def previous_week(values: FloatArray, week: IntArray) -> FloatArray:
+    """Return ``values`` of the week before each bar's week (``NaN`` if none)."""
+    padded = np.concatenate(([np.nan], values))
+    return padded[week]
+
+
+def partial_window(
+    weekly: FloatArray, week: IntArray, current: FloatArray, length: int
+) -> FloatArray:
+    """Return the trailing *length*-week window ending in *current* per bar.
+
+    Row ``t`` holds the ``length - 1`` completed weeks before bar ``t``'s week
+    followed by ``current[t]``. Weeks before the start are ``NaN``, matching a
+    rolling window that is not yet full.
+    """
+    padded = np.concatenate((np.full(length - 1, np.nan), weekly))
+    cols = week[:, None] + np.arange(length - 1)
+    return np.column_stack((padded[cols], current))
+
+
+def ewm_com(span: float | None = None, alpha: float | None = None) -> float:
+    """Return the center of mass pandas derives from *span* or *alpha*."""
+    if span is not None:
+        return (span - 1) / 2
+    if alpha is not None:
+        return (1 - alpha) / alpha
+    raise ValueError("Either span or alpha must be given")
+
+
+def ewm_weekly(values: FloatArray, com: float) -> FloatArray:
+    """Return ``ewm(com=com, adjust=False).mean()`` of completed *values*."""
+    return pd.Series(values).ewm(com=com, adjust=False).mean().to_numpy()
+
+
+def partial_ewm(
+    weekly: FloatArray,
+    week: IntArray,
+    current: FloatArray,
+    com: float,
+    min_periods: int = 0,
+) -> FloatArray:
+    """Return the ``adjust=False`` EWM of completed weeks + *current* per bar.
+
+    The exponential average is recursive, so each bar only needs the state
+    after the previous completed week and one update step with its own value.
+    The update mirrors pandas, including the extra decay after ``NaN`` weeks.
+    """
+    alpha = 1.0 / (1.0 + com)
+    factor = 1.0 - alpha
+    state = previous_week(ewm_weekly(weekly, com), week)
+
+    observed = ~np.isnan(weekly)
+    nobs = previous_week(np.cumsum(observed).astype(float), week)
+    nobs = np.nan_to_num(nobs) + ~np.isnan(current)
+    idx = np.arange(len(weekly))
+    last_obs = np.maximum.accumulate(np.where(observed, idx, -1))
+    gap = previous_week((idx - last_obs).astype(float), week)
+    old_wt = factor ** (np.nan_to_num(gap) + 1)
+
+    with np.errstate(invalid="ignore"):
+        stepped = (old_wt * state + alpha * current) / (old_wt + alpha)
+    value = np.where(
+        np.isnan(state),
+        current,
+        np.where(np.isnan(current) | (state == current), state, stepped),
+    )
+    return np.where(nobs >= max(min_periods, 1), value, np.nan)
+
+
+def weekly_sma(close: pd.Series[float], weeks: int) -> FloatArray:
+    """Return the memoized mean of the trailing *weeks*-week partial window."""
+
+    def compute() -> FloatArray:
+        view = weekly_view(close)
+        window = partial_window(view.weekly, view.week, view.partial, weeks)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean: FloatArray = window.mean(axis=1)
+        return mean
+
+    return INDICATORS.get(close, "weekly_sma", weeks, compute)
+
+
+def weekly_std(close: pd.Series[float], weeks: int) -> FloatArray:
+    """Return the memoized sample deviation of the *weeks*-week partial window."""
+
+    def compute() -> FloatArray:
+        view = weekly_view(close)
+        window = partial_window(view.weekly, view.week, view.partial, weeks)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            std: FloatArray = window.std(axis=1, ddof=1)
+        return std
+
+    return INDICATORS.get(close, "weekly_std", weeks, compute)
+
+
+def weekly_ema(close: pd.Series[float], span: float) -> tuple[FloatArray, FloatArray]:
+    """Return the memoized weekly EMA of *close* for *span*.
+
+    The first array holds the EMA of the completed weeks (see
+    :func:`ewm_weekly`), the second the EMA as seen from each bar, with the
+    current partial week included (see :func:`partial_ewm`).
+    """
+
+    def compute() -> tuple[FloatArray, FloatArray]:
+        view = weekly_view(close)
+        com = ewm_com(span=span)
+        return (
+            ewm_weekly(view.weekly, com),
+            partial_ewm(view.weekly, view.week, view.partial, com),
+        )
+
+    return INDICATORS.get(close, "weekly_ema", span, compute)
+
+
+class WeeklyBars:
+    """Incremental ``resample("W-FRI").last()`` of a stream of closes.
+
+    Each :meth:`update` returns the weeks completed by the new bar (``NaN``
+    for weeks without any bar), while :attr:`current` holds the running close
+    of the week in progress and :attr:`count` the number of weeks so far,
+    including the current one.
+    """
+
+    def __init__(self) -> None:
+        self._label: int | None = None
+        self.current = float("nan")
+        self.count = 0
+
+    @staticmethod
+    def _week_label(ts: pd.Timestamp) -> int:
+        """Return the proleptic ordinal of the Friday ending *ts*'s week."""
+        return ts.toordinal() + (4 - ts.weekday()) % 7
+
+    def update(self, ts: pd.Timestamp, close: float) -> list[float]:
+        """Add a bar and return the closes of the weeks it completed."""
+        label = self._week_label(ts)
+        if self._label is None:
+            self._label = label
+            self.count = 1
+            self.current = close
+            return []
+        if label == self._label:
+            if close == close:
+                self.current = close
+            return []
+        empty_weeks = (label - self._label) // 7 - 1
+        completed = [self.current] + [float("nan")] * empty_weeks
+        self._label = label
+        self.count += empty_weeks + 1
+        self.current = close
+        return completed
+
+
+class EWM:
+    """Streaming ``ewm(com=com, adjust=False).mean()``.
+
+    Follows the pandas recursion exactly, including the extra decay applied
+    after missing values, so committed outputs match the batch result.
+    """
+
+    def __init__(self, com: float, min_periods: int = 0) -> None:
+        self.alpha = 1.0 / (1.0 + com)
+        self._factor = 1.0 - self.alpha
+        self.min_periods = max(min_periods, 1)
+        self._weighted = float("nan")
+        self._old_wt = 1.0
+        self._nobs = 0
+
+    def _step(self, x: float) -> tuple[float, float, int]:
+        weighted, old_wt, nobs = self._weighted, self._old_wt, self._nobs
+        observed = x == x
+        nobs += observed
+        if weighted == weighted:
+            old_wt *= self._factor
+            if observed:
+                if weighted != x:
+                    weighted = (old_wt * weighted + self.alpha * x) / (
+                        old_wt + self.alpha
+                    )
+                old_wt = 1.0
+        elif observed:
+            weighted = x
+        return weighted, old_wt, nobs
+
+    def _output(self, weighted: float, nobs: int) -> float:
+        return weighted if nobs >= self.min_periods else float("nan")
+
+    def update(self, x: float) -> float:
+        """Append *x* and return the new average."""
+        self._weighted, self._old_wt, self._nobs = self._step(x)
+        return self.value
+
+    def peek(self, x: float) -> float:
+        """Return the average if *x* were appended, without appending it."""
+        weighted, _, nobs = self._step(x)
+        return self._output(weighted, nobs)
+
+    @property
+    def value(self) -> float:
+        """Average of the values appended so far."""
+        return self._output(self._weighted, self._nobs)
+
+
+class WilderRSI:
+    """Streaming counterpart of :func:`strategies.rsi.wilder_rsi`."""
+
+    def __init__(self, length: int = 14) -> None:
+        com = ewm_com(alpha=1 / length)
+        self._gain = EWM(com, min_periods=length)
+        self._loss = EWM(com, min_periods=length)
+        self._prev = float("nan")
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        if avg_gain == 0 and avg_loss == 0:
+            return 50.0
+        if avg_loss == 0:
+            return 100.0 if avg_gain == avg_gain else float("nan")
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+    @staticmethod
+    def _split(delta: float) -> tuple[float, float]:
+        if delta != delta:
+            return delta, delta
+        return max(delta, 0.0), -min(delta, 0.0)
+
+    def update(self, x: float) -> float:
+        """Append *x* and return the RSI."""
+        gain, loss = self._split(x - self._prev)
+        self._prev = x
+        return self._rsi(self._gain.update(gain), self._loss.update(loss))
+
+    def peek(self, x: float) -> float:
+        """Return the RSI if *x* were appended, without appending it."""
+        gain, loss = self._split(x - self._prev)
+        return self._rsi(self._gain.peek(gain), self._loss.peek(loss))
+
+
+class _MeanState:
+    """Running state of pandas' ``roll_mean`` (Kahan compensated sum)."""
+
+    def __init__(self) -> None:
+        self.nobs = 0
+        self.total = 0.0
+        self.neg_ct = 0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.run = 0
+        self.prev = float("nan")
+
+    def copy(self) -> _MeanState:
+        state = _MeanState()
+        state.__dict__.update(self.__dict__)
+        return state
+
+    def add(self, x: float) -> None:
+        if x != x:
+            return
+        self.nobs += 1
+        y = x - self.comp_add
+        t = self.total + y
+        self.comp_add = t - self.total - y
+        self.total = t
+        self.neg_ct += copysign(1.0, x) < 0
+        self.run = self.run + 1 if x == self.prev else 1
+        self.prev = x
+
+    def remove(self, x: float) -> None:
+        if x != x:
+            return
+        self.nobs -= 1
+        y = -x - self.comp_remove
+        t = self.total + y
+        self.comp_remove = t - self.total - y
+        self.total = t
+        self.neg_ct -= copysign(1.0, x) < 0
+
+    def result(self, min_periods: int) -> float:
+        if self.nobs < min_periods or self.nobs == 0:
+            return float("nan")
+        if self.run >= self.nobs:
+            return self.prev
+        result = self.total / self.nobs
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+        return result
+
+
+class _VarState:
+    """Running state of pandas' ``roll_var`` (compensated Welford)."""
+
+    def __init__(self) -> None:
+        self.nobs = 0
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.run = 0
+        self.prev = float("nan")
+
+    def copy(self) -> _VarState:
+        state = _VarState()
+        state.__dict__.update(self.__dict__)
+        return state
+
+    def add(self, x: float) -> None:
+        if x != x:
+            return
+        self.run = self.run + 1 if x == self.prev else 1
+        self.prev = x
+        self.nobs += 1
+        prev_mean = self.mean - self.comp_add
+        y = x - self.comp_add
+        t = y - self.mean
+        self.comp_add = t + self.mean - y
+        self.mean = self.mean + t / self.nobs
+        self.ssqdm = self.ssqdm + (x - prev_mean) * (x - self.mean)
+
+    def remove(self, x: float) -> None:
+        if x != x:
+            return
+        self.nobs -= 1
+        if self.nobs:
+            prev_mean = self.mean - self.comp_remove
+            y = x - self.comp_remove
+            t = y - self.mean
+            self.comp_remove = t + self.mean - y
+            self.mean = self.mean - t / self.nobs
+            self.ssqdm = self.ssqdm - (x - prev_mean) * (x - self.mean)
+        else:
+            self.mean = self.ssqdm = 0.0
+
+    def result(self, min_periods: int, ddof: int = 1) -> float:
+        if self.nobs < min_periods or self.nobs <= ddof:
+            return float("nan")
+        if self.nobs == 1 or self.run >= self.nobs:
+            return 0.0
+        return sqrt(max(self.ssqdm / (self.nobs - ddof), 0.0))
+
+
+class RollingStats:
+    """Rolling mean and sample standard deviation over *window* values.
+
+    Reproduces the add/remove updates of pandas' ``rolling(window)`` so
+    results match the batch computation bit for bit, while every update and
+    query is O(1). A window holding ``NaN`` or fewer than *window* values
+    yields ``NaN``. Queries take an optional *pending* value evaluated as if
+    it had been appended, which is how the running close of the current
+    week is combined with the completed weeks.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self._values: deque[float] = deque()
+        self._mean = _MeanState()
+        self._var = _VarState()
+
+    def update(self, x: float) -> None:
+        """Append *x*, dropping the oldest value once the window is full."""
+        self._values.append(x)
+        self._mean, self._var = self._step(self._mean, self._var, x)
+        if len(self._values) > self.window:
+            self._values.popleft()
+
+    def _step(
+        self, mean: _MeanState, var: _VarState, x: float
+    ) -> tuple[_MeanState, _VarState]:
+        """Apply one window slide ending in *x* (already in ``_values``)."""
+        if self.window == 1:
+            # pandas restarts the accumulators when windows do not overlap
+            mean, var = _MeanState(), _VarState()
+        elif len(self._values) > self.window:
+            oldest = self._values[0]
+            mean.remove(oldest)
+            var.remove(oldest)
+        mean.add(x)
+        var.add(x)
+        return mean, var
+
+    def _query(self, pending: float | None) -> tuple[_MeanState, _VarState]:
+        if pending is None:
+            return self._mean, self._var
+        self._values.append(pending)
+        try:
+            return self._step(self._mean.copy(), self._var.copy(), pending)
+        finally:
+            self._values.pop()
+
+    def mean(self, pending: float | None = None) -> float:
+        """Return the mean of the window (ending in *pending* if given)."""
+        return self._query(pending)[0].result(self.window)
+
+    def std(self, pending: float | None = None) -> float:
+        """Return the sample standard deviation (``ddof=1``) of the window."""
+        return self._query(pending)[1].result(self.window)
+
+
+class RollingMax:
+    """Maximum of the last *window* values, skipping ``NaN``.
+
+    Uses a monotonic deque, so updates are amortised O(1). :attr:`value` is
+    ``NaN`` while the window holds no valid value and :attr:`count` reports
+    how many values, valid or not, the window holds.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self._seen = 0
+        self._maxima: deque[tuple[int, float]] = deque()
+
+    def update(self, x: float) -> float:
+        """Append *x* and return the window maximum."""
+        if x == x:
+            while self._maxima and self._maxima[-1][1] <= x:
+                self._maxima.pop()
+            self._maxima.append((self._seen, x))
+        self._seen += 1
+        while self._maxima and self._maxima[0][0] <= self._seen - 1 - self.window:
+            self._maxima.popleft()
+        return self.value
+
+    @property
+    def count(self) -> int:
+        """Number of values in the window."""
+        return min(self._seen, self.window)
+
+    @property
+    def value(self) -> float:
+        """Maximum of the valid values in the window."""
+        return self._maxima[0][1] if self._maxima else float("nan")
+
+
+class RollingMedian:
+    """Median of the last *window* values kept in two heaps.
+
+    ``_lo`` is a max-heap (stored negated) of the lower half and ``_hi`` a
+    min-heap of the upper half. Values leaving the window are only counted in
+    ``_stale`` and dropped once they reach a heap top, so an update costs
+    O(log n). Stale entries buried below a top are swept by rebuilding both
+    heaps once they outnumber the window, which keeps the state bounded. The
+    result is ``NaN`` until the window is full and while it contains ``NaN``.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.window = window
+        self._values: deque[float] = deque()
+        self._lo: list[float] = []
+        self._hi: list[float] = []
+        self._lo_size = 0
+        self._hi_size = 0
+        self._stale: dict[float, int] = {}
+        self._nans = 0
+
+    def update(self, x: float) -> float:
+        """Append *x* and return the window median."""
+        self._values.append(x)
+        if x == x:
+            if not self._lo_size or x <= -self._lo[0]:
+                heappush(self._lo, -x)
+                self._lo_size += 1
+            else:
+                heappush(self._hi, x)
+                self._hi_size += 1
+        else:
+            self._nans += 1
+        if len(self._values) > self.window:
+            old = self._values.popleft()
+            if old == old:
+                self._discard(old)
+            else:
+                self._nans -= 1
+        self._balance()
+        if len(self._lo) + len(self._hi) > 2 * self.window:
+            self._rebuild()
+        return self.value
+
+    def _discard(self, x: float) -> None:
+        self._stale[x] = self._stale.get(x, 0) + 1
+        if x <= -self._lo[0]:
+            self._lo_size -= 1
+            self._prune(self._lo, -1.0)
+        else:
+            self._hi_size -= 1
+            self._prune(self._hi, 1.0)
+
+    def _prune(self, heap: list[float], sign: float) -> None:
+        while heap and self._stale.get(sign * heap[0], 0):
+            x = sign * heappop(heap)
+            self._stale[x] -= 1
+            if not self._stale[x]:
+                del self._stale[x]
+
+    def _balance(self) -> None:
+        if self._lo_size > self._hi_size + 1:
+            heappush(self._hi, -heappop(self._lo))
+            self._lo_size -= 1
+            self._hi_size += 1
+            self._prune(self._lo, -1.0)
+        elif self._lo_size < self._hi_size:
+            heappush(self._lo, -heappop(self._hi))
+            self._lo_size += 1
+            self._hi_size -= 1
+            self._prune(self._hi, 1.0)
+
+    def _rebuild(self) -> None:
+        live = sorted(v for v in self._values if v == v)
+        half = (len(live) + 1) // 2
+        self._lo = [-v for v in live[:half]]
+        self._hi = live[half:]
+        heapify(self._lo)
+        heapify(self._hi)
+        self._lo_size, self._hi_size = half, len(live) - half
+        self._stale.clear()
+
+    @property
+    def value(self) -> float:
+        """Median of the window."""
+        if len(self._values) < self.window or self._nans:
+            return float("nan")
+        if self._lo_size > self._hi_size:
+            return -self._lo[0]
+        return (-self._lo[0] + self._hi[0]) / 2
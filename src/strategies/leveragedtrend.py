@@ -2,17 +2,24 @@ from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
-from .base import HistoryStrategy
+from .base import HistoryStrategy, latch_positions, position_signals, signal_series
+from .indicators import RollingStats, WeeklyBars, weekly_sma, weekly_view
 
 
 class LeveragedTrendStrategy(HistoryStrategy):
     """Simple trend-following strategy using a leveraged S&P 500 ETF."""
 
     def __init__(self, sma_len: int = 200) -> None:
-        super().__init__(sma_len=sma_len)
         self.sma_len = sma_len
+        super().__init__(sma_len=sma_len)
+
+    def reset(self) -> None:
+        super().reset()
+        self._weekly = WeeklyBars()
+        self._sma = RollingStats(max(1, self.sma_len // 5))
 
     def next_bar(self, bar: pd.Series[Any]) -> str:
         if not isinstance(bar.name, pd.Timestamp):
@@ -20,16 +27,15 @@ class LeveragedTrendStrategy(HistoryStrategy):
                 "Bar index must be a pd.Timestamp for LeveragedTrend strategy"
             )
         close = float(bar["close"])
-        self._close_history.at[bar.name] = close
 
-        weeks = max(1, self.sma_len // 5)
-        weekly_close = self._close_history.resample("W-FRI").last()
-        sma = weekly_close.rolling(weeks).mean().iloc[-1]
+        for week_close in self._weekly.update(bar.name, close):
+            self._sma.update(week_close)
+        current = self._weekly.current
+        sma = self._sma.mean(current)
 
         if pd.isna(sma):
             return "HOLD"
 
-        current = float(weekly_close.iloc[-1])
         if self.position == 0 and current > float(sma):
             self.position = 1
             return "BUY"
@@ -37,3 +43,19 @@ class LeveragedTrendStrategy(HistoryStrategy):
             self.position = 0
             return "SELL"
         return "HOLD"
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.Series[Any]:
+        """Return trend signals for every bar of *df*."""
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError(
+                "Data index must be a DatetimeIndex for LeveragedTrend strategy"
+            )
+        weeks = max(1, self.sma_len // 5)
+        close = df["close"]
+        view = weekly_view(close)
+        sma = weekly_sma(close, weeks)
+
+        valid = ~np.isnan(sma)
+        above = view.partial > sma
+        position = latch_positions(valid & above, valid & ~above)
+        return signal_series(position_signals(position), df.index)
@@ -2,47 +2,86 @@ from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
-from .base import Strategy as BaseStrategy
+from .base import HistoryStrategy, signal_series
+from .indicators import (
+    EWM,
+    WeeklyBars,
+    ewm_com,
+    ewm_weekly,
+    partial_ewm,
+    previous_week,
+    weekly_ema,
+    weekly_view,
+)
 
 
-class MACDStrategy(BaseStrategy):
+class MACDStrategy(HistoryStrategy):
     """Moving Average Convergence Divergence crossover strategy."""
 
+    param_constraints = ("fast < slow",)
+
     def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9) -> None:
-        super().__init__(fast=fast, slow=slow, signal=signal)
         self.fast = fast
         self.slow = slow
         self.signal = signal
-        self._close_history = pd.Series(dtype=float)
+        super().__init__(fast=fast, slow=slow, signal=signal)
 
     def reset(self) -> None:
         super().reset()
-        self._close_history = pd.Series(dtype=float)
+        self._weekly = WeeklyBars()
+        self._ema_fast = EWM(ewm_com(span=self.fast))
+        self._ema_slow = EWM(ewm_com(span=self.slow))
+        self._signal_ema = EWM(ewm_com(span=self.signal))
+        self._prev_macd = float("nan")
+        self._prev_signal = float("nan")
 
     def next_bar(self, bar: pd.Series[Any]) -> str:
         if not isinstance(bar.name, pd.Timestamp):
             raise ValueError("Bar index must be a pd.Timestamp for MACD strategy")
         close = float(bar["close"])
-        self._close_history.at[bar.name] = close
 
-        weekly_close = self._close_history.resample("W-FRI").last()
-        ema_fast = weekly_close.ewm(span=self.fast, adjust=False).mean()
-        ema_slow = weekly_close.ewm(span=self.slow, adjust=False).mean()
-        macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=self.signal, adjust=False).mean()
+        for week_close in self._weekly.update(bar.name, close):
+            self._prev_macd = self._ema_fast.update(
+                week_close
+            ) - self._ema_slow.update(week_close)
+            self._prev_signal = self._signal_ema.update(self._prev_macd)
 
-        if len(macd_line) < 2:
+        if self._weekly.count < 2:
             return "HOLD"
 
-        prev_macd = macd_line.iloc[-2]
-        prev_signal = signal_line.iloc[-2]
-        curr_macd = macd_line.iloc[-1]
-        curr_signal = signal_line.iloc[-1]
+        current = self._weekly.current
+        prev_macd = self._prev_macd
+        prev_signal = self._prev_signal
+        curr_macd = self._ema_fast.peek(current) - self._ema_slow.peek(current)
+        curr_signal = self._signal_ema.peek(curr_macd)
 
         if prev_macd <= prev_signal and curr_macd > curr_signal:
             return "BUY"
         if prev_macd >= prev_signal and curr_macd < curr_signal:
             return "SELL"
         return "HOLD"
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.Series[Any]:
+        """Return MACD crossover signals for every bar of *df*."""
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError("Data index must be a DatetimeIndex for MACD strategy")
+        close = df["close"]
+        view = weekly_view(close)
+        signal_com = ewm_com(span=self.signal)
+        weekly_fast, curr_fast = weekly_ema(close, self.fast)
+        weekly_slow, curr_slow = weekly_ema(close, self.slow)
+
+        weekly_macd = weekly_fast - weekly_slow
+        weekly_signal = ewm_weekly(weekly_macd, signal_com)
+        curr_macd = curr_fast - curr_slow
+        curr_signal = partial_ewm(weekly_macd, view.week, curr_macd, signal_com)
+        prev_macd = previous_week(weekly_macd, view.week)
+        prev_signal = previous_week(weekly_signal, view.week)
+
+        buy = (prev_macd <= prev_signal) & (curr_macd > curr_signal)
+        sell = (prev_macd >= prev_signal) & (curr_macd < curr_signal)
+        signals = np.where(buy, "BUY", np.where(sell, "SELL", "HOLD"))
+        return signal_series(signals.tolist(), df.index)
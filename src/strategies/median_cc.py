@@ -4,16 +4,21 @@ from typing import Any
 
 import pandas as pd
 
-from .base import HistoryStrategy
+from .base import HistoryStrategy, latch_positions, position_signals, signal_series
+from .indicators import RollingMedian
 
 
 class CoveredCallMedianStrategy(HistoryStrategy):
     """Median-reversion strategy for a covered call ETF."""
 
     def __init__(self, band: float = 0.01, median_len: int = 60) -> None:
-        super().__init__(band=band, median_len=median_len)
         self.band = band / 100 if band >= 1 else band
         self.median_len = median_len
+        super().__init__(band=band, median_len=median_len)
+
+    def reset(self) -> None:
+        super().reset()
+        self._median = RollingMedian(self.median_len)
 
     def next_bar(self, bar: pd.Series[Any]) -> str:
         if not isinstance(bar.name, pd.Timestamp):
@@ -21,9 +26,8 @@ class CoveredCallMedianStrategy(HistoryStrategy):
                 "Bar index must be a pd.Timestamp for CoveredCallMedian strategy"
             )
         close = float(bar["close"])
-        self._close_history.at[bar.name] = close
 
-        med = self._close_history.rolling(self.median_len).median().iloc[-1]
+        med = self._median.update(close)
         if pd.isna(med):
             return "HOLD"
 
@@ -37,3 +41,20 @@ class CoveredCallMedianStrategy(HistoryStrategy):
             self.position = 0
             return "SELL"
         return "HOLD"
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.Series[Any]:
+        """Return median-reversion signals for every bar of *df*."""
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError(
+                "Data index must be a DatetimeIndex for CoveredCallMedian strategy"
+            )
+        close = df["close"].astype(float)
+        med = close.rolling(self.median_len).median().to_numpy()
+        price = close.to_numpy()
+        enter = price <= med * (1 - self.band)
+        exit = price >= med * (1 + self.band)
+        if (enter & exit).any():
+            # a zero or negative band flips the position on the same bar
+            return super().generate_signals(df)
+        position = latch_positions(enter, exit)
+        return signal_series(position_signals(position), df.index)
@@ -2,9 +2,20 @@ from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
-from .base import Strategy as BaseStrategy
+from .base import HistoryStrategy, signal_series
+from .indicator_cache import INDICATORS
+from .indicators import (
+    WeeklyBars,
+    WilderRSI,
+    ewm_com,
+    partial_ewm,
+    previous_week,
+    weekly_view,
+)
 
 
 def wilder_rsi(series: pd.Series[float], length: int = 14) -> pd.Series[float]:
@@ -23,38 +34,72 @@ def wilder_rsi(series: pd.Series[float], length: int = 14) -> pd.Series[float]:
     return rsi
 
 
-class RSIStrategy(BaseStrategy):
+def _weekly_rsi(close: pd.Series[float], length: int) -> npt.NDArray[np.float64]:
+    """Return the Wilder RSI of completed weeks + current partial week per bar."""
+    view = weekly_view(close)
+    weekly_delta = np.diff(view.weekly, prepend=np.nan)
+    delta = view.partial - previous_week(view.weekly, view.week)
+    com = ewm_com(alpha=1 / length)
+    averages = []
+    for weekly_part, part in (
+        (np.clip(weekly_delta, 0, None), np.clip(delta, 0, None)),
+        (-np.clip(weekly_delta, None, 0), -np.clip(delta, None, 0)),
+    ):
+        averages.append(partial_ewm(weekly_part, view.week, part, com, length))
+    avg_gain, avg_loss = averages
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    return np.where((avg_gain == 0) & (avg_loss == 0), 50.0, rsi)
+
+
+class RSIStrategy(HistoryStrategy):
     """Weekly RSI mean-reversion strategy."""
 
+    param_constraints = ("rsi_buy < rsi_sell",)
+
     def __init__(
         self, rsi_buy: float = 30, rsi_sell: float = 70, length: int = 14
     ) -> None:
-        super().__init__(rsi_buy=rsi_buy, rsi_sell=rsi_sell, length=length)
         self.rsi_buy = rsi_buy
         self.rsi_sell = rsi_sell
         self.length = length
-        self._close_history = pd.Series(dtype=float)
+        super().__init__(rsi_buy=rsi_buy, rsi_sell=rsi_sell, length=length)
 
     def reset(self) -> None:
         super().reset()
-        self._close_history = pd.Series(dtype=float)
+        self._weekly = WeeklyBars()
+        self._rsi = WilderRSI(self.length)
 
     def next_bar(self, bar: pd.Series[Any]) -> str:
         """Return trading signal based on weekly RSI."""
         if not isinstance(bar.name, pd.Timestamp):
             raise ValueError("Bar index must be a pd.Timestamp for RSI strategy")
         close = float(bar["close"])
-        self._close_history.at[bar.name] = close
 
-        weekly_close = self._close_history.resample("W-FRI").last()
-        rsi_series = wilder_rsi(weekly_close, self.length)
-        clean_rsi = rsi_series.dropna()
-        rsi_value = clean_rsi.iloc[-1] if not clean_rsi.empty else None
+        for week_close in self._weekly.update(bar.name, close):
+            self._rsi.update(week_close)
+        # once available the RSI never turns back to NaN, so a NaN here
+        # means no weekly RSI has been produced yet
+        rsi_value = self._rsi.peek(self._weekly.current)
 
-        if rsi_value is None:
+        if pd.isna(rsi_value):
             return "HOLD"
         if rsi_value <= self.rsi_buy:
             return "BUY"
         if rsi_value >= self.rsi_sell:
             return "SELL"
         return "HOLD"
+
+    def generate_signals(self, df: pd.DataFrame) -> pd.Series[Any]:
+        """Return weekly RSI signals for every bar of *df*."""
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise ValueError("Data index must be a DatetimeIndex for RSI strategy")
+        close = df["close"]
+        rsi = INDICATORS.get(
+            close, "weekly_rsi", self.length, lambda: _weekly_rsi(close, self.length)
+        )
+        signals = np.where(
+            rsi <= self.rsi_buy, "BUY", np.where(rsi >= self.rsi_sell, "SELL", "HOLD")
+        )
+        return signal_series(signals.tolist(), df.index)
@@ -0,0 +1,589 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import operator
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Sequence,
+    TypeVar,
+    cast,
+)
+
+import pandas as pd
+
+from costs import CostModel
+from engine import Backtester, MultiBacktester
+from metrics import cagr, max_drawdown
+from profiling import BacktestProfiler
+from result_cache import (
+    SHEET_COLUMNS,
+    ResultCache,
+    data_fingerprint,
+    result_key,
+    sheet_row,
+)
+from shared_data import SharedDataHandle, SharedMarketData
+from strategies import STRATEGIES
+from strategies.base import Strategy
+
+T = TypeVar("T")
+
+SUMMARY_COLUMNS = [
+    "strategy",
+    "ticker",
+    "params",
+    "paramhash",
+    "cagr",
+    "max_drawdown",
+    *SHEET_COLUMNS,
+]
+
+
+class SweepTask(NamedTuple):
+    """One back-test of a sweep: a strategy, its parameters and a ticker."""
+
+    strategy: str
+    params: dict[str, Any]
+    ticker: str
+
+
+# Tasks a streamed sweep hands to the workers at a time.
+DEFAULT_CHUNK_SIZE = 10_000
+
+_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+_OPERAND = r"\s*([A-Za-z_]\w*|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*"
+_CONSTRAINT = re.compile(_OPERAND + r"(<=|>=|==|!=|<|>)" + _OPERAND)
+
+
+class Constraint:
+    """Declarative comparison that a parameter set must satisfy.
+
+    *expr* compares a parameter with another parameter or a number, e.g.
+    ``"fast < slow"`` or ``"dev >= 1.5"``, using ``<``, ``<=``, ``>``,
+    ``>=``, ``==`` or ``!=``. The expression is parsed, never evaluated.
+    """
+
+    def __init__(self, expr: str) -> None:
+        match = _CONSTRAINT.fullmatch(expr)
+        if match is None:
+            raise ValueError(f"Invalid constraint: {expr!r}")
+        left, op, right = match.groups()
+        self.expr = expr.strip()
+        self._op = _OPERATORS[op]
+        self._left = self._operand(left)
+        self._right = self._operand(right)
+        self.names = {o for o in (self._left, self._right) if isinstance(o, str)}
+        if not self.names:
+            raise ValueError(f"Constraint compares no parameters: {expr!r}")
+
+    @staticmethod
+    def _operand(token: str) -> str | float:
+        if token[0].isalpha() or token[0] == "_":
+            return token
+        return float(token)
+
+    def __call__(self, params: Mapping[str, Any]) -> bool:
+        left, right = self._left, self._right
+        return bool(
+            self._op(
+                params[left] if isinstance(left, str) else left,
+                params[right] if isinstance(right, str) else right,
+            )
+        )
+
+    def __repr__(self) -> str:
+        return f"Constraint({self.expr!r})"
+
+
+def normalize_param(value: Any) -> Any:
+    """Return *value* in the form used to detect duplicate parameter values.
+
+    Integral floats compare as ints, so ``10`` and ``10.0`` are one value.
+    """
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _unique(values: Sequence[Any]) -> list[Any]:
+    """Return *values* without normalized duplicates, keeping the first."""
+    seen: set[str] = set()
+    unique = []
+    for value in values:
+        key = json.dumps(normalize_param(value), sort_keys=True, default=repr)
+        if key not in seen:
+            seen.add(key)
+            unique.append(value)
+    return unique
+
+
+def iter_param_grid(
+    params: Mapping[str, Any], constraints: Iterable[str | Constraint] = ()
+) -> Iterator[dict[str, Any]]:
+    """Lazily yield the cartesian product of parameter values.
+
+    Any value that is a list is expanded, single values are kept as-is.
+    Repeated values of a parameter (after :func:`normalize_param`) are
+    expanded once, so the product holds no duplicate parameter sets, and
+    sets that fail any of the *constraints* are skipped. Combinations are
+    generated one at a time, so a grid of millions of sets is never held
+    in memory. Constraints naming unknown parameters raise ``ValueError``
+    immediately rather than on the first set.
+    """
+    keys = list(params)
+    values = [_unique(v) if isinstance(v, list) else [v] for v in params.values()]
+    checks = [c if isinstance(c, Constraint) else Constraint(c) for c in constraints]
+    for check in checks:
+        unknown = check.names - set(keys)
+        if unknown:
+            raise ValueError(
+                f"Constraint {check.expr!r} names unknown parameters: "
+                + ", ".join(sorted(unknown))
+            )
+    return _grid(keys, values, checks)
+
+
+def _grid(
+    keys: list[str], values: list[list[Any]], checks: list[Constraint]
+) -> Iterator[dict[str, Any]]:
+    for combo in itertools.product(*values):
+        params = dict(zip(keys, combo))
+        if all(check(params) for check in checks):
+            yield params
+
+
+def generate_param_grid(
+    params: dict[str, Any], constraints: Iterable[str | Constraint] = ()
+) -> list[dict[str, Any]]:
+    """Return cartesian product of parameter values.
+
+    Any value that is a list will be expanded. Single values are kept as-is.
+    See :func:`iter_param_grid` for deduplication and *constraints*.
+    """
+    return list(iter_param_grid(params, constraints))
+
+
+def strategy_constraints(
+    strategy: str, params: Mapping[str, Any]
+) -> list[Constraint]:
+    """Return the declared constraints of *strategy* that apply to *params*.
+
+    Strategies list them in :attr:`Strategy.param_constraints`; those naming
+    a parameter missing from *params* are left out.
+    """
+    cls = cast(type[Strategy], STRATEGIES[strategy])
+    declared = [Constraint(expr) for expr in cls.param_constraints]
+    return [c for c in declared if c.names <= params.keys()]
+
+
+def param_hash(params: Mapping[str, Any]) -> str:
+    """Return the short hash used to label *params* in result files."""
+    encoded = json.dumps(params, sort_keys=True).encode()
+    return hashlib.md5(encoded).hexdigest()[:8]
+
+
+# Per-process sweep context, set once by the pool initializer.
+_context: dict[str, Any] = {}
+
+
+def _init_worker(
+    data: Mapping[str, pd.DataFrame],
+    start: str | None,
+    end: str | None,
+    results_dir: Path | None,
+    profiler: BacktestProfiler | None = None,
+    cache: ResultCache | None = None,
+    costs: CostModel | None = None,
+) -> None:
+    _context.update(
+        data=data,
+        start=start,
+        end=end,
+        results_dir=results_dir,
+        profiler=profiler,
+        cache=cache,
+        costs=costs,
+        fingerprints={},
+    )
+
+
+def _attach_worker(
+    handles: Mapping[str, SharedDataHandle],
+    start: str | None,
+    end: str | None,
+    results_dir: Path | None,
+    cache: ResultCache | None = None,
+    costs: CostModel | None = None,
+) -> None:
+    stores = {t: SharedMarketData.attach(h) for t, h in handles.items()}
+    _context["stores"] = stores
+    data = {t: store.to_frame() for t, store in stores.items()}
+    _init_worker(data, start, end, results_dir, cache=cache, costs=costs)
+
+
+def _strategy_class(name: str) -> type[Strategy]:
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {name}")
+    return cast(type[Strategy], STRATEGIES[name])
+
+
+def _cache_key(cls: type[Strategy], task: SweepTask) -> str:
+    fingerprints: dict[str, str] = _context["fingerprints"]
+    if task.ticker not in fingerprints:
+        fingerprints[task.ticker] = data_fingerprint(_context["data"][task.ticker])
+    return result_key(
+        cls, task.params, fingerprints[task.ticker], _context.get("costs")
+    )
+
+
+def _backtest(task: SweepTask) -> tuple[pd.DataFrame, dict[str, float]]:
+    """Return the results and tear sheet row of *task*, through the cache."""
+    cls = _strategy_class(task.strategy)
+    data = _context["data"][task.ticker]
+    cache: ResultCache | None = _context.get("cache")
+    key: str | None = None
+    if cache is not None:
+        key = _cache_key(cls, task)
+        cached = cache.get(cls, key)
+        if cached is not None:
+            return cached.results, cached.metrics
+    backtester = Backtester(
+        cls(**task.params),
+        data,
+        profiler=_context.get("profiler"),
+        costs=_context.get("costs"),
+    )
+    results = backtester.run_vectorized()
+    sheet = sheet_row(results)
+    if cache is not None and key is not None:
+        cache.put(cls, key, results, sheet)
+    return results, sheet
+
+
+def _summary_row(
+    task: SweepTask, results: pd.DataFrame, sheet: Mapping[str, float]
+) -> dict[str, Any]:
+    paramhash = param_hash(task.params)
+    results_dir: Path | None = _context["results_dir"]
+    if results_dir is not None:
+        out_file = results_dir / f"{task.strategy}_{paramhash}_{task.ticker}.csv"
+        results.to_csv(out_file)
+    row: dict[str, Any] = {
+        "strategy": task.strategy,
+        "ticker": task.ticker,
+        "params": json.dumps(task.params, sort_keys=True),
+        "paramhash": paramhash,
+        "cagr": cagr(results["equity"], _context["start"], _context["end"]),
+        "max_drawdown": max_drawdown(results["drawdown"]),
+    }
+    row.update(sheet)
+    return row
+
+
+def _run_task(task: SweepTask) -> dict[str, Any]:
+    return _summary_row(task, *_backtest(task))
+
+
+def _results_task(task: SweepTask) -> pd.DataFrame:
+    return _backtest(task)[0]
+
+
+class _TaskRunner:
+    """Maps functions over sweep tasks in-process or on a live worker pool."""
+
+    def __init__(self, pool: ProcessPoolExecutor | None, workers: int) -> None:
+        self.pool = pool
+        self.workers = workers
+
+    def map(self, func: Callable[[SweepTask], T], tasks: list[SweepTask]) -> list[T]:
+        if self.pool is None:
+            return [func(task) for task in tasks]
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        return list(self.pool.map(func, tasks, chunksize=chunksize))
+
+
+@contextmanager
+def _task_runner(
+    data: Mapping[str, pd.DataFrame],
+    start: str | None,
+    end: str | None,
+    workers: int,
+    results_dir: Path | None = None,
+    profiler: BacktestProfiler | None = None,
+    cache: ResultCache | None = None,
+    costs: CostModel | None = None,
+) -> Iterator[_TaskRunner]:
+    """Set up the sweep context, or a pool sharing *data*, for many batches."""
+    if profiler is not None and workers > 1:
+        raise ValueError("Profiling requires an in-process sweep (jobs=1)")
+
+    if workers == 1:
+        saved = dict(_context)
+        _init_worker(data, start, end, results_dir, profiler, cache, costs)
+        try:
+            yield _TaskRunner(None, 1)
+        finally:
+            _context.clear()
+            _context.update(saved)
+        return
+
+    with ExitStack() as stack:
+        handles = {
+            t: stack.enter_context(SharedMarketData.publish(frame)).handle
+            for t, frame in data.items()
+        }
+        pool = stack.enter_context(
+            ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_attach_worker,
+                initargs=(handles, start, end, results_dir, cache, costs),
+            )
+        )
+        yield _TaskRunner(pool, workers)
+
+
+def _map_tasks(
+    func: Callable[[SweepTask], T],
+    tasks: Iterable[SweepTask],
+    data: Mapping[str, pd.DataFrame],
+    start: str | None,
+    end: str | None,
+    jobs: int | None,
+    results_dir: Path | None = None,
+    profiler: BacktestProfiler | None = None,
+    cache: ResultCache | None = None,
+    costs: CostModel | None = None,
+) -> list[T]:
+    """Apply *func* to every task in-process or in a pool sharing *data*."""
+    task_list = list(tasks)
+    workers = jobs or os.cpu_count() or 1
+    workers = min(workers, max(1, len(task_list)))
+    used = {task.ticker for task in task_list}
+    if workers > 1:
+        data = {t: frame for t, frame in data.items() if t in used}
+    with _task_runner(
+        data, start, end, workers, results_dir, profiler, cache, costs
+    ) as runner:
+        return runner.map(func, task_list)
+
+
+def run_sweep(
+    tasks: Iterable[SweepTask],
+    data: Mapping[str, pd.DataFrame],
+    start: str,
+    end: str,
+    jobs: int | None = 1,
+    results_dir: Path | None = None,
+    profiler: BacktestProfiler | None = None,
+    cache: ResultCache | None = None,
+    costs: CostModel | None = None,
+) -> pd.DataFrame:
+    """Back-test every task and return one summary row per task.
+
+    *data* maps each ticker to its price frame, loaded once by the caller.
+    ``jobs`` sets the number of worker processes (``None`` or ``0`` uses
+    every core); ``1`` runs in-process. Worker processes read the prices
+    from :class:`~shared_data.SharedMarketData` blocks published once, so
+    they see ``float64`` columns without holding a copy each.
+    Rows are returned in task order regardless of worker scheduling. When
+    *results_dir* is given each back-test DataFrame is written there too.
+    A *profiler* collects the engine timings of every back-test and needs
+    the sweep to run in-process. With a *cache* each back-test and its tear
+    sheet are looked up in the :class:`~result_cache.ResultCache` first and
+    stored there after a miss; hits skip the engine and the profiler.
+    Every back-test is charged the :class:`~costs.CostModel` *costs*.
+    """
+    rows = _map_tasks(
+        _run_task, tasks, data, start, end, jobs, results_dir, profiler, cache, costs
+    )
+    return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+
+
+def run_backtests(
+    tasks: Iterable[SweepTask],
+    data: Mapping[str, pd.DataFrame],
+    jobs: int | None = 1,
+    cache: ResultCache | None = None,
+    costs: CostModel | None = None,
+) -> list[pd.DataFrame]:
+    """Return the :meth:`Backtester.run_vectorized` results of every task.
+
+    Runs like :func:`run_sweep`, in task order and sharing *data* with the
+    worker processes, but returns the full result frames instead of
+    summary rows.
+    """
+    return _map_tasks(
+        _results_task, tasks, data, None, None, jobs, cache=cache, costs=costs
+    )
+
+
+def stream_sweep(
+    tasks: Iterable[SweepTask],
+    data: Mapping[str, pd.DataFrame],
+    start: str,
+    end: str,
+    out_dir: Path,
+    jobs: int | None = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cache: ResultCache | None = None,
+    costs: CostModel | None = None,
+) -> int:
+    """Back-test a lazily generated sweep, streaming its rows to disk.
+
+    Works like :func:`run_sweep` but takes *tasks* from any iterable, e.g.
+    built on :func:`iter_param_grid`, *chunk_size* at a time. After every
+    chunk its summary rows are appended to ``out_dir/sweep_<ticker>.csv``
+    (each file is rewritten when its first row arrives), so neither the
+    task list nor the summary is ever held in memory at once. One pool of
+    *jobs* workers, sharing *data*, serves all chunks. Returns the number
+    of rows written.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    workers = jobs or os.cpu_count() or 1
+    pending = iter(tasks)
+    started: set[str] = set()
+    written = 0
+    with _task_runner(
+        data, start, end, workers, cache=cache, costs=costs
+    ) as runner:
+        while chunk := list(itertools.islice(pending, chunk_size)):
+            rows = pd.DataFrame(runner.map(_run_task, chunk), columns=SUMMARY_COLUMNS)
+            for ticker, group in rows.groupby("ticker", sort=False):
+                header = ticker not in started
+                group.to_csv(
+                    out_dir / f"sweep_{ticker}.csv",
+                    mode="w" if header else "a",
+                    header=header,
+                    index=False,
+                )
+                started.add(str(ticker))
+            written += len(rows)
+    return written
+
+
+def run_strategies(
+    tasks: Iterable[SweepTask],
+    data: Mapping[str, pd.DataFrame],
+    start: str,
+    end: str,
+    results_dir: Path | None = None,
+    profiler: BacktestProfiler | None = None,
+    cache: ResultCache | None = None,
+    costs: CostModel | None = None,
+) -> pd.DataFrame:
+    """Back-test every task like :func:`run_sweep`, one pass per ticker.
+
+    The tasks of each ticker run together through
+    :class:`~engine.MultiBacktester`, which extracts every bar once for all
+    bar-by-bar strategies and shares the weekly resample between the
+    vectorized ones. Runs in-process; back-tests found in the *cache* are
+    left out of the pass. Returns the same rows as :func:`run_sweep`.
+    """
+    task_list = list(tasks)
+    classes = [_strategy_class(task.strategy) for task in task_list]
+    outcomes: dict[int, tuple[pd.DataFrame, dict[str, float]]] = {}
+    keys: dict[int, str] = {}
+    with _task_runner(data, start, end, 1, results_dir, profiler, cache, costs):
+        by_ticker: dict[str, list[int]] = {}
+        for i, task in enumerate(task_list):
+            by_ticker.setdefault(task.ticker, []).append(i)
+        for ticker, indices in by_ticker.items():
+            pending: dict[str, Strategy] = {}
+            for i in indices:
+                cls, task = classes[i], task_list[i]
+                if cache is not None:
+                    keys[i] = _cache_key(cls, task)
+                    cached = cache.get(cls, keys[i])
+                    if cached is not None:
+                        outcomes[i] = (cached.results, cached.metrics)
+                        continue
+                pending[str(i)] = cls(**task.params)
+            if not pending:
+                continue
+            run = MultiBacktester(
+                pending, data[ticker], profiler=profiler, costs=costs
+            ).run()
+            for label, results in run.results.items():
+                i = int(label)
+                row = run.metrics.loc[label, SHEET_COLUMNS] if len(results) else None
+                sheet = {} if row is None else cast(dict[str, float], row.to_dict())
+                outcomes[i] = (results, sheet)
+                if cache is not None:
+                    cache.put(classes[i], keys[i], *outcomes[i])
+        rows = [_summary_row(task, *outcomes[i]) for i, task in enumerate(task_list)]
+    return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+
+
+def run_universe(
+    tasks: Iterable[SweepTask],
+    data: Mapping[str, pd.DataFrame],
+    start: str,
+    end: str,
+    results_dir: Path | None = None,
+    profiler: BacktestProfiler | None = None,
+    cache: ResultCache | None = None,
+    costs: CostModel | None = None,
+) -> pd.DataFrame:
+    """Back-test every task like :func:`run_sweep`, one batch per parameter set.
+
+    The tickers of every strategy and parameter set run together through
+    :meth:`Backtester.run_batch`, which resolves tickers sharing one index
+    as a single bars x tickers matrix. Runs in-process; back-tests found in
+    the *cache* are left out of the batch. Returns the same rows as
+    :func:`run_sweep`, whose worker processes remain the parallel route.
+    """
+    task_list = list(tasks)
+    classes = [_strategy_class(task.strategy) for task in task_list]
+    outcomes: dict[int, tuple[pd.DataFrame, dict[str, float]]] = {}
+    with _task_runner(data, start, end, 1, results_dir, profiler, cache, costs):
+        batches: dict[tuple[str, str], list[int]] = {}
+        for i, task in enumerate(task_list):
+            batch = (task.strategy, param_hash(task.params))
+            batches.setdefault(batch, []).append(i)
+        for indices in batches.values():
+            pending: dict[str, list[int]] = {}
+            keys: dict[str, str] = {}
+            for i in indices:
+                cls, task = classes[i], task_list[i]
+                if cache is not None:
+                    keys[task.ticker] = _cache_key(cls, task)
+                    cached = cache.get(cls, keys[task.ticker])
+                    if cached is not None:
+                        outcomes[i] = (cached.results, cached.metrics)
+                        continue
+                pending.setdefault(task.ticker, []).append(i)
+            if not pending:
+                continue
+            cls, params = classes[indices[0]], task_list[indices[0]].params
+            frames = {ticker: data[ticker] for ticker in pending}
+            batch_results = Backtester.run_batch(
+                cls(**params), frames, profiler=profiler, costs=costs
+            )
+            for ticker, results in batch_results.items():
+                sheet = sheet_row(results)
+                for i in pending[ticker]:
+                    outcomes[i] = (results, sheet)
+                if cache is not None:
+                    cache.put(cls, keys[ticker], results, sheet)
+        rows = [_summary_row(task, *outcomes[i]) for i, task in enumerate(task_list)]
+    return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, Mapping, NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from costs import CostModel
+from metrics import (
+    LOWER_IS_BETTER,
+    TEAR_SHEET_METRICS,
+    periods_per_year,
+    tear_sheet,
+)
+from result_cache import ResultCache
+from sweep import SweepTask, param_hash, run_backtests
+
+WINDOW_COLUMNS = [
+    "train_start",
+    "train_end",
+    "test_start",
+    "test_end",
+    "params",
+    "paramhash",
+    "train_score",
+    "test_score",
+    "test_return",
+]
+
+
+class WalkForwardResult(NamedTuple):
+    """Outcome of :func:`walk_forward`.
+
+    ``windows`` has one row per window with its dates, the chosen parameters
+    and their in- and out-of-sample scores; ``equity`` and ``position`` are
+    the stitched out-of-sample curve, starting at ``1.0`` before the first
+    test bar, and the positions held along it.
+    """
+
+    windows: pd.DataFrame
+    equity: pd.Series
+    position: pd.Series
+
+
+def walk_forward_windows(
+    bars: int, train: int, test: int, anchored: bool = False
+) -> list[tuple[slice, slice]]:
+    """Return ``(train, test)`` bar slices of a walk-forward over *bars* bars.
+
+    Windows advance by *test* bars, so the test periods tile the history
+    after the first training period; the last one may be shorter. With
+    *anchored* every training period starts at the first bar instead of
+    keeping *train* bars.
+    """
+    if train < 2 or test < 1:
+        raise ValueError("train needs at least 2 bars and test at least 1")
+    windows = []
+    for split in range(train, bars, test):
+        first = 0 if anchored else split - train
+        windows.append((slice(first, split), slice(split, min(split + test, bars))))
+    return windows
+
+
+def _scores(
+    equity: npt.NDArray[np.float64],
+    position: npt.NDArray[np.float64],
+    bars: slice,
+    metric: str,
+    periods: int = 252,
+) -> npt.NDArray[np.float64]:
+    # Include the bar before the window so its first return counts too.
+    first = max(bars.start - 1, 0)
+    sheet = tear_sheet(
+        equity[:, first : bars.stop], position[:, first : bars.stop], periods
+    )
+    return sheet[metric]
+
+
+def walk_forward(
+    strategy: str,
+    grid: Iterable[Mapping[str, Any]],
+    data: pd.DataFrame,
+    train: int,
+    test: int,
+    metric: str = "sharpe",
+    anchored: bool = False,
+    jobs: int | None = 1,
+    cache: ResultCache | None = None,
+    costs: CostModel | None = None,
+) -> WalkForwardResult:
+    """Walk-forward optimize *strategy* over the parameter *grid*.
+
+    For every window of :func:`walk_forward_windows` the parameter set with
+    the best *metric* (a :data:`~metrics.TEAR_SHEET_METRICS` name) over the
+    training bars is selected and its returns over the following test bars
+    are appended to the out-of-sample curve. Ties go to the earlier set.
+
+    Strategies only look back, so the signals of a parameter set at any bar
+    do not depend on where a window starts. Each set is therefore
+    back-tested once over the whole history, with :func:`sweep.run_backtests`
+    spreading the runs over *jobs* processes, reading *cache* and charging
+    the :class:`~costs.CostModel` *costs*, and every window scores all sets
+    at once with :func:`~metrics.tear_sheet` on slices of those runs.
+    Indicators are warmed up on the bars before a window, as they would be
+    when trading it.
+    """
+    if metric not in TEAR_SHEET_METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+    param_sets = [dict(params) for params in grid]
+    if not param_sets:
+        raise ValueError("Parameter grid is empty")
+    windows = walk_forward_windows(len(data), train, test, anchored)
+    if not windows:
+        raise ValueError(f"{len(data)} bars are too few for {train} training bars")
+
+    tasks = [SweepTask(strategy, params, "data") for params in param_sets]
+    runs = run_backtests(tasks, {"data": data}, jobs=jobs, cache=cache, costs=costs)
+    equity = np.vstack([run["equity"].to_numpy(dtype=float) for run in runs])
+    position = np.vstack([run["position"].to_numpy(dtype=float) for run in runs])
+    sign = -1.0 if metric in LOWER_IS_BETTER else 1.0
+
+    rows = []
+    returns: list[npt.NDArray[np.float64]] = []
+    held: list[npt.NDArray[np.float64]] = []
+    index = runs[0].index
+    periods = periods_per_year(index)
+    for train_bars, test_bars in windows:
+        scores = np.nan_to_num(
+            sign * _scores(equity, position, train_bars, metric, periods), nan=-np.inf
+        )
+        best = int(np.argmax(scores))
+        curve = equity[best, test_bars.start - 1 : test_bars.stop]
+        returns.append(curve[1:] / curve[:-1] - 1)
+        held.append(position[best, test_bars])
+        test_score = _scores(
+            equity[best : best + 1],
+            position[best : best + 1],
+            test_bars,
+            metric,
+            periods,
+        )
+        rows.append(
+            {
+                "train_start": index[train_bars.start],
+                "train_end": index[train_bars.stop - 1],
+                "test_start": index[test_bars.start],
+                "test_end": index[test_bars.stop - 1],
+                "params": json.dumps(param_sets[best], sort_keys=True),
+                "paramhash": param_hash(param_sets[best]),
+                "train_score": sign * scores[best],
+                "test_score": float(test_score[0]),
+                "test_return": float(curve[-1] / curve[0] - 1),
+            }
+        )
+
+    oos_index = index[windows[0][1].start : windows[-1][1].stop]
+    stitched = np.cumprod(1 + np.concatenate(returns))
+    return WalkForwardResult(
+        pd.DataFrame(rows, columns=WINDOW_COLUMNS),
+        pd.Series(stitched, index=oos_index, name="equity"),
+        pd.Series(np.concatenate(held), index=oos_index, name="position"),
+    )
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+try:  # advisory write lock; writers are not serialized without it
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+MANIFEST = "manifest.json"
+
+
+class Warehouse:
+    """Columnar on-disk store of bars with memory-mapped reads.
+
+    Each ticker lives in its own directory under *root*: one raw ``float64``
+    file per field, an ``int64`` nanosecond timestamp file acting as the
+    calendar index, and ``manifest.json`` recording the committed row count,
+    the field names, the covered date range and a file generation.
+
+    Appends write past the committed rows and then replace the manifest
+    atomically, so concurrent readers, which map exactly the rows listed in
+    the manifest they read, never see a partial write. :meth:`write`
+    replaces a ticker by writing a new file generation before switching the
+    manifest to it.
+    """
+
+    def __init__(self, root: Path | str) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def tickers(self) -> list[str]:
+        """Return the tickers stored in the warehouse."""
+        return sorted(p.parent.name for p in self.root.glob(f"*/{MANIFEST}"))
+
+    def manifest(self, ticker: str) -> dict[str, Any] | None:
+        """Return the committed manifest of *ticker* or ``None``."""
+        try:
+            with open(self.root / ticker / MANIFEST) as fh:
+                manifest: dict[str, Any] = json.load(fh)
+        except FileNotFoundError:
+            return None
+        return manifest
+
+    def coverage(self, ticker: str) -> tuple[pd.Timestamp, pd.Timestamp] | None:
+        """Return the ``(start, end)`` range recorded for *ticker*."""
+        manifest = self.manifest(ticker)
+        if manifest is None:
+            return None
+        return pd.Timestamp(manifest["start"]), pd.Timestamp(manifest["end"])
+
+    # -- reading ---------------------------------------------------------
+
+    def _map(
+        self, ticker: str, manifest: dict[str, Any], name: str, dtype: str
+    ) -> npt.NDArray[Any]:
+        rows = manifest["rows"]
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        path = self.root / ticker / f"{name}.{manifest['generation']}"
+        return np.memmap(path, dtype=dtype, mode="r", shape=(rows,))
+
+    def _snapshot(
+        self, ticker: str, fields: Iterable[str] | None
+    ) -> tuple[npt.NDArray[np.datetime64], dict[str, npt.NDArray[np.float64]]]:
+        for _ in range(3):
+            manifest = self.manifest(ticker)
+            if manifest is None:
+                raise KeyError(f"Unknown ticker: {ticker}")
+            names = manifest["fields"] if fields is None else list(fields)
+            missing = set(names) - set(manifest["fields"])
+            if missing:
+                raise KeyError(f"Unknown fields for {ticker}: {sorted(missing)}")
+            try:
+                dates = self._map(ticker, manifest, "date", "M8[ns]")
+                columns = {f: self._map(ticker, manifest, f, "f8") for f in names}
+            except FileNotFoundError:
+                # a concurrent write() retired this generation; re-read
+                continue
+            return dates, columns
+        raise RuntimeError(f"Could not read a consistent snapshot of {ticker}")
+
+    def dates(self, ticker: str) -> npt.NDArray[np.datetime64]:
+        """Return the calendar index of *ticker* as a memory-mapped array."""
+        return self._snapshot(ticker, [])[0]
+
+    def column(self, ticker: str, field: str) -> npt.NDArray[np.float64]:
+        """Return *field* of *ticker* as a memory-mapped array."""
+        return self._snapshot(ticker, [field])[1][field]
+
+    def read(
+        self,
+        ticker: str,
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+        fields: Iterable[str] | None = None,
+    ) -> pd.DataFrame:
+        """Return the bars of *ticker* between *start* and *end* inclusive."""
+        dates, columns = self._snapshot(ticker, fields)
+        lo, hi = _bounds(dates, start, end)
+        return _frame(dates, columns, lo, hi)
+
+    def iter_read(
+        self,
+        ticker: str,
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+        fields: Iterable[str] | None = None,
+        rows: int = 100_000,
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the bars of :meth:`read` in frames of at most *rows* rows.
+
+        All frames come from one snapshot and view its memory-mapped
+        columns, so only the pages of the frame in use are resident.
+        """
+        dates, columns = self._snapshot(ticker, fields)
+        lo, hi = _bounds(dates, start, end)
+        for pos in range(lo, hi, rows):
+            yield _frame(dates, columns, pos, min(pos + rows, hi))
+
+    def read_panel(
+        self,
+        tickers: Iterable[str],
+        field: str = "close",
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+    ) -> pd.DataFrame:
+        """Return *field* of every ticker aligned on the union of dates."""
+        series = {
+            t: self.read(t, start, end, fields=[field])[field] for t in tickers
+        }
+        panel = pd.DataFrame(series)
+        panel.index.name = "date"
+        return panel
+
+    # -- writing ---------------------------------------------------------
+
+    @contextmanager
+    def _lock(self, ticker: str) -> Iterator[None]:
+        directory = self.root / ticker
+        directory.mkdir(exist_ok=True)
+        with open(directory / ".lock", "w") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            yield
+
+    def _commit(self, ticker: str, manifest: dict[str, Any]) -> None:
+        path = self.root / ticker / MANIFEST
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as fh:
+            json.dump(manifest, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _columns(
+        frame: pd.DataFrame,
+    ) -> tuple[npt.NDArray[np.int64], dict[str, npt.NDArray[np.float64]]]:
+        if not isinstance(frame.index, pd.DatetimeIndex):
+            raise ValueError("Warehouse data requires a DatetimeIndex")
+        if frame.index.tz is not None:
+            raise ValueError("Warehouse data requires a timezone-naive index")
+        if not frame.index.is_monotonic_increasing or frame.index.has_duplicates:
+            raise ValueError("Warehouse data index must be strictly increasing")
+        stamps = frame.index.as_unit("ns").to_numpy().view(np.int64)
+        columns = {
+            str(c): frame[c].to_numpy(dtype=np.float64, na_value=np.nan)
+            for c in frame.columns
+        }
+        return stamps, columns
+
+    @staticmethod
+    def _append_file(path: Path, committed: int, values: npt.NDArray[Any]) -> None:
+        with open(path, "r+b" if path.exists() else "w+b") as fh:
+            # drop bytes left behind by an append that never committed
+            fh.truncate(committed * values.itemsize)
+            fh.seek(0, os.SEEK_END)
+            fh.write(values.tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def write(
+        self,
+        ticker: str,
+        frame: pd.DataFrame,
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+    ) -> None:
+        """Replace the stored bars of *ticker* with *frame*.
+
+        *start* and *end* record the covered range and default to the first
+        and last timestamps of *frame*. Values are stored as ``float64``.
+        """
+        stamps, columns = self._columns(frame)
+        with self._lock(ticker):
+            self._replace(ticker, frame, stamps, columns, start, end)
+
+    def _replace(
+        self,
+        ticker: str,
+        frame: pd.DataFrame,
+        stamps: npt.NDArray[np.int64],
+        columns: dict[str, npt.NDArray[np.float64]],
+        start: str | pd.Timestamp | None,
+        end: str | pd.Timestamp | None,
+    ) -> None:
+        # callers hold the lock of *ticker*
+        old = self.manifest(ticker)
+        generation = 0 if old is None else old["generation"] + 1
+        directory = self.root / ticker
+        self._append_file(directory / f"date.{generation}", 0, stamps)
+        for field, values in columns.items():
+            self._append_file(directory / f"{field}.{generation}", 0, values)
+        self._commit(
+            ticker,
+            {
+                "generation": generation,
+                "rows": len(frame),
+                "fields": list(columns),
+                "start": _iso(start, frame.index, 0),
+                "end": _iso(end, frame.index, -1),
+            },
+        )
+        if old is not None:
+            for name in ["date", *old["fields"]]:
+                try:
+                    os.remove(directory / f"{name}.{old['generation']}")
+                except OSError:
+                    pass
+
+    def append(
+        self, ticker: str, frame: pd.DataFrame, end: str | pd.Timestamp | None = None
+    ) -> int:
+        """Append the bars of *frame* newer than the stored ones.
+
+        Rows at or before the last stored timestamp are skipped, so repeated
+        appends are idempotent. *end* extends the recorded coverage. Returns
+        the number of rows appended.
+        """
+        with self._lock(ticker):
+            manifest = self.manifest(ticker)
+            if manifest is None:
+                stamps, columns = self._columns(frame)
+                self._replace(ticker, frame, stamps, columns, None, end)
+                return len(frame)
+            if set(map(str, frame.columns)) != set(manifest["fields"]):
+                raise ValueError(
+                    f"Fields of {ticker} are {manifest['fields']}, "
+                    f"got {list(frame.columns)}"
+                )
+            rows = manifest["rows"]
+            if rows:
+                last = self._map(ticker, manifest, "date", "M8[ns]")[-1]
+                frame = frame[frame.index > pd.Timestamp(last)]
+            if len(frame):
+                stamps, columns = self._columns(frame[manifest["fields"]])
+                directory = self.root / ticker
+                generation = manifest["generation"]
+                self._append_file(directory / f"date.{generation}", rows, stamps)
+                for field, values in columns.items():
+                    self._append_file(
+                        directory / f"{field}.{generation}", rows, values
+                    )
+                manifest["rows"] = rows + len(frame)
+            if end is not None or len(frame):
+                manifest["end"] = max(manifest["end"], _iso(end, frame.index, -1))
+            self._commit(ticker, manifest)
+            return len(frame)
+
+
+def _bounds(
+    dates: npt.NDArray[np.datetime64],
+    start: str | pd.Timestamp | None,
+    end: str | pd.Timestamp | None,
+) -> tuple[int, int]:
+    lo = 0 if start is None else int(np.searchsorted(dates, _stamp(start)))
+    hi = (
+        len(dates)
+        if end is None
+        else int(np.searchsorted(dates, _stamp(end), side="right"))
+    )
+    return lo, hi
+
+
+def _frame(
+    dates: npt.NDArray[np.datetime64],
+    columns: dict[str, npt.NDArray[np.float64]],
+    lo: int,
+    hi: int,
+) -> pd.DataFrame:
+    index = pd.DatetimeIndex(dates[lo:hi], name="date")
+    return pd.DataFrame(
+        {f: values[lo:hi] for f, values in columns.items()},
+        index=index,
+        copy=False,
+    )
+
+
+def _stamp(value: str | pd.Timestamp) -> np.datetime64:
+    return np.datetime64(pd.Timestamp(value).as_unit("ns").value, "ns")
+
+
+def _iso(
+    value: str | pd.Timestamp | None, index: pd.Index[Any], position: int
+) -> str:
+    if value is None:
+        if not len(index):
+            raise ValueError("Covered range is required for an empty frame")
+        value = index[position]
+    return pd.Timestamp(value).isoformat()
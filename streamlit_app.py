@@ -14,8 +14,9 @@ sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
 
 import strategies
 from data import DataDownloader
-from engine import Backtester
+from engine import MultiBacktester
 from metrics import cagr, max_drawdown, sharpe_ratio
+from result_cache import ResultCache
 
 
 @st.cache_data
@@ -24,6 +25,11 @@ def load_data(ticker: str, start: str, end: str) -> pd.DataFrame:
     return downloader.get_history(ticker, start, end)
 
 
+@st.cache_resource
+def result_cache() -> ResultCache:
+    return ResultCache()
+
+
 def get_param_inputs(strategy_cls: type[Any]) -> dict[str, Any]:
     params: dict[str, Any] = {}
     with st.sidebar.expander("Parameters", expanded=False):
@@ -57,9 +63,7 @@ def run_backtest(
         st.error(f"Data download failed: {exc}")
         return
 
-    strategy = strategy_cls(**params)
-    bt = Backtester(strategy, data)
-    results = bt.run()
+    results = result_cache().backtest(strategy_cls, params, data)
 
     rets = results["equity"].pct_change().dropna()
     metrics = {
@@ -91,9 +95,8 @@ def latest_signal(
         return
 
     strat = strategy_cls(**params)
-    signal = "HOLD"
-    for _, row in data.iterrows():
-        signal = strat.next_bar(row)
+    signals = strat.generate_signals(data)
+    signal = signals.iloc[-1] if len(signals) else "HOLD"
 
     color = {"BUY": "green", "SELL": "red", "HOLD": "gray"}.get(signal, "gray")
     badge = (
@@ -110,12 +113,13 @@ def all_latest_signals(ticker: str, start: str, end: str) -> None:
         st.error(f"Data download failed: {exc}")
         return
 
+    # Every strategy is evaluated in one pass over the bars.
+    signals = MultiBacktester(
+        {name: cls() for name, cls in strategies.STRATEGIES.items()}, data
+    ).signals()
     results = []
-    for name, cls in strategies.STRATEGIES.items():
-        strat = cls()
-        signal = "HOLD"
-        for _, row in data.iterrows():
-            signal = strat.next_bar(row)
+    for name, series in signals.items():
+        signal = series.iloc[-1] if len(series) else "HOLD"
         results.append({"Strategy": name, "Signal": signal})
 
     df = pd.DataFrame(results)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+import benchmark  # noqa: E402
+from benchmarks import (  # noqa: E402
+    build_cases,
+    compare,
+    measure,
+    run_benchmarks,
+    synthetic_ohlcv,
+)
+
+
+def test_synthetic_ohlcv_is_deterministic() -> None:
+    first = synthetic_ohlcv(500, seed=3)
+    pd.testing.assert_frame_equal(first, synthetic_ohlcv(500, seed=3))
+    assert not first.equals(synthetic_ohlcv(500, seed=4))
+    assert list(first.columns) == [
+        "open",
+        "high",
+        "low",
+        "close",
+        "adj_close",
+        "volume",
+    ]
+    assert (first["high"] >= first[["open", "close"]].max(axis=1)).all()
+    assert (first["low"] <= first[["open", "close"]].min(axis=1)).all()
+
+
+def test_synthetic_ohlcv_spans_100k_business_days() -> None:
+    index = synthetic_ohlcv(100_000).index
+    assert index.is_monotonic_increasing
+    assert (index.dayofweek < 5).all()
+    pd.testing.assert_index_equal(
+        synthetic_ohlcv(500).index,
+        pd.bdate_range("1850-01-01", periods=500, name="date"),
+        check_exact=True,
+    )
+
+
+def test_build_cases_covers_requested_matrix() -> None:
+    cases = build_cases([300], [2], ["rsi", "dualmomentum"])
+    names = [case.name for case in cases]
+
+    assert "run/rsi/300x2" in names
+    assert "vectorized/dualmomentum/300x2" in names
+    assert "sweep/rsi/300x2" in names
+    assert "normalize/300x2" in names
+    assert "sweep/dualmomentum/300x2" not in names
+    assert build_cases([300], [1], ["rsi"], ["vectorized"])[0].bars == 300
+    with pytest.raises(ValueError):
+        build_cases([300], [1], ["nope"])
+    with pytest.raises(ValueError):
+        build_cases([300], [1], ["rsi"], ["nope"])
+
+
+def test_measure_reports_throughput_and_memory() -> None:
+    (case,) = build_cases([300], [2], ["macd"], ["run"])
+    result = measure(case, repeat=2)
+
+    assert result["bars"] == 600
+    assert result["seconds"] > 0
+    assert result["bars_per_sec"] == pytest.approx(600 / result["seconds"])
+    assert result["peak_mib"] > 0
+    assert 0 < result["result_mib"] < result["peak_mib"]
+    assert "peak_mib" not in measure(case, memory=False)
+    (replay,) = build_cases([300], [1], ["macd"], ["next_bar"])
+    assert "result_mib" not in measure(replay)
+
+
+def test_compare_flags_slowdowns_and_memory_growth() -> None:
+    baseline = {
+        "results": {
+            "a": {"bars_per_sec": 1000.0, "peak_mib": 10.0, "result_mib": 2.0},
+            "b": {"bars_per_sec": 1000.0, "peak_mib": 10.0},
+            "gone": {"bars_per_sec": 1000.0},
+        }
+    }
+    current = {
+        "results": {
+            "a": {"bars_per_sec": 950.0, "peak_mib": 10.5, "result_mib": 3.0},
+            "b": {"bars_per_sec": 700.0, "peak_mib": 13.0},
+            "new": {"bars_per_sec": 1.0},
+        }
+    }
+    regressions = compare(baseline, current, threshold=0.1)
+
+    assert [(r.case, r.metric) for r in regressions] == [
+        ("a", "result_mib"),
+        ("b", "bars_per_sec"),
+        ("b", "peak_mib"),
+    ]
+    assert regressions[1].change == pytest.approx(-0.3)
+    assert compare(baseline, current, threshold=0.5) == []
+
+
+def test_cli_run_and_compare(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    output = tmp_path / "current.json"
+    argv = ["run", "--bars", "300", "--tickers", "1", "--strategies", "ibs"]
+    argv += ["--kinds", "vectorized", "--no-memory", "--output", str(output)]
+    assert benchmark.main(argv) == 0
+
+    results = json.loads(output.read_text())
+    assert list(results["results"]) == ["vectorized/ibs/300x1"]
+    assert "vectorized/ibs/300x1" in capsys.readouterr().out
+
+    slow = json.loads(output.read_text())
+    slow["results"]["vectorized/ibs/300x1"]["bars_per_sec"] *= 10
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(slow))
+    assert benchmark.main(["compare", str(baseline), str(output)]) == 1
+    assert "1 regression(s)" in capsys.readouterr().out
+    assert benchmark.main(["compare", str(output), str(output)]) == 0
+
+
+def test_run_benchmarks_reports_progress() -> None:
+    seen: list[str] = []
+    cases = build_cases([300], [1], ["rsi"], ["next_bar", "sweep"])
+    results = run_benchmarks(
+        cases, memory=False, progress=lambda name, _: seen.append(name)
+    )
+
+    assert seen == ["next_bar/rsi/300x1", "sweep/rsi/300x1"]
+    assert results["results"]["sweep/rsi/300x1"]["bars"] == 300 * 9
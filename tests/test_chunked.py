@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+from benchmarks import synthetic_intraday, synthetic_ohlcv  # noqa: E402
+from costs import CostModel  # noqa: E402
+from data import DataDownloader  # noqa: E402
+from engine import Backtester  # noqa: E402
+from strategies import MACDStrategy, RSIStrategy  # noqa: E402
+from strategies.dual_mom import DualMomentumStrategy  # noqa: E402
+
+COSTS = CostModel(bps=5, borrow_bps=80, cash_bps=200)
+
+
+def _chunks(frame: pd.DataFrame, rows: int) -> list[pd.DataFrame]:
+    return [frame.iloc[pos : pos + rows] for pos in range(0, len(frame), rows)]
+
+
+def _yahoo(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame.rename(columns=lambda c: c.replace("_", " ").title())
+
+
+@pytest.mark.parametrize("rows", [1, 97, 1000])
+@pytest.mark.parametrize("costs", [None, COSTS])
+@pytest.mark.parametrize("portfolio", [False, True])
+def test_iter_run_matches_run(
+    rows: int, costs: CostModel | None, portfolio: bool
+) -> None:
+    data = synthetic_ohlcv(600, seed=6)
+    for cls in (RSIStrategy, MACDStrategy):
+        whole = Backtester(cls(), data, costs=costs, portfolio=portfolio)
+        expected = whole.run()
+        chunked = Backtester(cls(), data.iloc[:0], costs=costs, portfolio=portfolio)
+        result = pd.concat(list(chunked.iter_run(_chunks(data, rows))))
+
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+        assert chunked.trades == whole.trades
+        assert chunked.equity == whole.equity
+
+
+def test_multi_asset_panel_streams_from_cache(tmp_path: Path) -> None:
+    frames = {
+        "AAA": synthetic_ohlcv(400, seed=1, start="2020-01-01"),
+        "BBB": synthetic_ohlcv(300, seed=2, start="2020-02-03").iloc[::3],
+    }
+
+    def fake_download(ticker: str, start: str, end: str) -> pd.DataFrame:
+        frame = frames[ticker]
+        return _yahoo(frame[(frame.index >= start) & (frame.index < end)])
+
+    loader = DataDownloader(cache_dir=tmp_path, download=fake_download)
+    start, end = "2020-01-01", "2021-12-31"
+    histories = loader.get_histories(["AAA", "BBB"], start, end)
+    panel = pd.DataFrame({t: histories[t]["close"] for t in histories})
+    panel.index.name = "date"
+
+    chunks = list(loader.iter_panel(["AAA", "BBB"], start, end, chunk_rows=64))
+    assert max(len(chunk) for chunk in chunks) <= 2 * 64
+    pd.testing.assert_frame_equal(pd.concat(chunks), panel, check_freq=False)
+    assert panel["BBB"].isna().any()
+
+    filled = panel.ffill().dropna()
+    universe = ["AAA", "BBB"]
+    whole = Backtester(DualMomentumStrategy(universe, 4), filled, costs=COSTS)
+    expected = whole.run()
+    header = filled.iloc[:0]
+    chunked = Backtester(DualMomentumStrategy(universe, 4), header, costs=COSTS)
+    result = pd.concat(list(chunked.iter_run(_chunks(filled, 50))))
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
+def test_iter_run_streams_intraday_history(tmp_path: Path) -> None:
+    minutes = synthetic_intraday(5, seed=2)
+
+    def fake_download(
+        ticker: str, start: str, end: str, interval: str = "1d"
+    ) -> pd.DataFrame:
+        return _yahoo(minutes[(minutes.index >= start) & (minutes.index < end)])
+
+    loader = DataDownloader(cache_dir=tmp_path, download=fake_download, interval="1m")
+    chunks = loader.iter_history("AAA", "2024-01-02", "2024-01-09", chunk_rows=300)
+    bt = Backtester(RSIStrategy(), minutes.iloc[:0])
+    ends = [frame["equity"].iloc[-1] for frame in bt.iter_run(chunks)]
+
+    assert len(ends) == int(np.ceil(len(minutes) / 300))
+    assert ends[-1] == Backtester(RSIStrategy(), minutes).run()["equity"].iloc[-1]
+
+
+def test_iter_run_rejects_other_columns() -> None:
+    data = synthetic_ohlcv(20)
+    bt = Backtester(RSIStrategy(), data)
+    with pytest.raises(ValueError, match="columns"):
+        list(bt.iter_run([data[["close"]]]))
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
+from typing import Any
 
 import pandas as pd
 import pytest
@@ -13,6 +14,8 @@ sys.path.insert(0, str(project_root))
 import importlib.util  # noqa: E402
 
 import backtest  # noqa: E402
+from engine import Backtester  # noqa: E402
+from strategies.base import Strategy  # noqa: E402
 
 signal_path = project_root / "signal.py"
 spec = importlib.util.spec_from_file_location("signal_cli", signal_path)
@@ -21,16 +24,21 @@ signal_cli = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(signal_cli)
 
 
+def _fake_histories(
+    self: object, tickers: list[str], start: str, end: str
+) -> dict[str, pd.DataFrame]:
+    index = pd.date_range("2020-01-01", periods=3, freq="D")
+    return {t: pd.DataFrame({"close": [1.0, 1.1, 1.2]}, index=index) for t in tickers}
+
+
 def test_backtest_main(
     tmp_path: Path,
     monkeypatch: pytest.MonkeyPatch,
     capsys: pytest.CaptureFixture[str],
 ) -> None:
-    def fake_get_history(*args: str, **kwargs: str) -> pd.DataFrame:
-        index = pd.date_range("2020-01-01", periods=3, freq="D")
-        return pd.DataFrame({"close": [1.0, 1.1, 1.2]}, index=index)
-
-    monkeypatch.setattr(backtest.DataDownloader, "get_history", fake_get_history)
+    monkeypatch.setattr(
+        backtest.DataDownloader, "get_histories", _fake_histories
+    )
 
     monkeypatch.chdir(tmp_path)
 
@@ -55,6 +63,84 @@ def test_backtest_main(
     assert result_file.exists()
 
 
+def test_backtest_main_profile(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    monkeypatch.setattr(
+        backtest.DataDownloader, "get_histories", _fake_histories
+    )
+    monkeypatch.chdir(tmp_path)
+
+    argv = [
+        "backtest.py",
+        "--strategy",
+        "rsi",
+        "--ticker",
+        "TEST",
+        "--start",
+        "2020-01-01",
+        "--end",
+        "2020-01-04",
+        "--profile-output",
+        "run.pstats",
+    ]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    backtest.main()
+    out = capsys.readouterr().out
+    assert "phase" in out
+    assert "RSIStrategy.generate_signals" in out
+    assert (tmp_path / "run.pstats").exists()
+
+
+def test_backtest_main_universe(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    def partial_histories(
+        self: object, tickers: list[str], start: str, end: str
+    ) -> dict[str, pd.DataFrame]:
+        frames = _fake_histories(self, tickers, start, end)
+        missing = frames.pop("GONE")
+        assert missing is not None
+        raise backtest.DownloadError({"GONE": ValueError("no data")}, frames)
+
+    monkeypatch.setattr(
+        backtest.DataDownloader, "get_histories", partial_histories
+    )
+    monkeypatch.chdir(tmp_path)
+    universe = tmp_path / "universe.txt"
+    universe.write_text("# test universe\nAAA\nBBB, GONE\n\nAAA\n")
+    assert backtest.read_universe(universe) == ["AAA", "BBB", "GONE"]
+
+    argv = ["backtest.py", "--strategy", "rsi", "--universe-file", str(universe)]
+    argv += ["--start", "2020-01-01", "--end", "2020-01-04", "--sweep"]
+    argv += ["--params", '{"length": [5, 14]}']
+    monkeypatch.setattr(sys, "argv", argv)
+    batches: list[list[str]] = []
+    run_batch = Backtester.run_batch
+
+    def spy(strategy: Strategy, data: dict[str, pd.DataFrame], **kwargs: Any) -> Any:
+        batches.append(list(data))
+        return run_batch(strategy, data, **kwargs)
+
+    monkeypatch.setattr(Backtester, "run_batch", spy)
+
+    backtest.main()
+    assert batches == [["AAA", "BBB"], ["AAA", "BBB"]]
+    captured = capsys.readouterr()
+    assert "Skipping GONE" in captured.err
+    assert "ticker" in captured.out
+
+    summary = pd.read_csv(tmp_path / "results" / "batch_summary.csv")
+    assert summary["ticker"].tolist() == ["AAA", "BBB", "AAA", "BBB"]
+    assert (tmp_path / "results" / "sweep_AAA.csv").exists()
+    assert len(pd.read_csv(tmp_path / "results" / "sweep_BBB.csv")) == 2
+
+
 def test_signal_main(
     monkeypatch: pytest.MonkeyPatch,
     capsys: pytest.CaptureFixture[str],
@@ -125,3 +211,64 @@ def test_signal_main_all(
         assert name in signal_cli.STRATEGIES
         assert val in {"BUY", "SELL", "HOLD", "N/A"}
 
+
+
+def test_signal_main_follow_drop_dir(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    index = pd.bdate_range("2020-01-01", periods=40)
+    close = [100.0 + (i % 9) - (i % 4) * 3 for i in range(40)]
+    data = pd.DataFrame({"close": close}, index=index)
+
+    def fake_get_history(*args: str, **kwargs: str) -> pd.DataFrame:
+        return data.iloc[:30]
+
+    monkeypatch.setattr(signal_cli.DataDownloader, "get_history", fake_get_history)
+    data.iloc[25:].to_csv(tmp_path / "bars.csv")
+
+    argv = ["signal.py", "--strategy", "rsi", "--ticker", "TEST", "--follow"]
+    argv += ["--drop-dir", str(tmp_path), "--poll-seconds", "0", "--max-polls", "2"]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    signal_cli.main()
+    lines = capsys.readouterr().out.strip().splitlines()
+    expected = signal_cli.load_strategy("rsi").generate_signals(data).tolist()
+    changes = [
+        f"{index[t]:%Y-%m-%d %H:%M:%S} rsi: {expected[t]}"
+        for t in range(30, 40)
+        if expected[t] != expected[t - 1]
+    ]
+    assert lines == [f"rsi: {expected[29]}", *changes]
+
+
+def test_signal_main_checkpoint_fetches_only_new_bars(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    index = pd.bdate_range("2020-01-01", periods=60)
+    close = [100.0 + (i % 9) - (i % 4) * 3 for i in range(60)]
+    data = pd.DataFrame({"close": close}, index=index)
+    available = {"rows": 40}
+    starts: list[str] = []
+
+    def fake_get_history(self: object, ticker: str, start: str, end: str) -> Any:
+        starts.append(start)
+        return data.iloc[: available["rows"]].loc[start:]
+
+    monkeypatch.setattr(signal_cli.DataDownloader, "get_history", fake_get_history)
+    checkpoint = tmp_path / "rsi.ckpt"
+    argv = ["signal.py", "--strategy", "rsi", "--ticker", "TEST"]
+    argv += ["--lookback", "100000", "--checkpoint", str(checkpoint)]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    signal_cli.main()
+    available["rows"] = 60
+    signal_cli.main()
+
+    expected = signal_cli.load_strategy("rsi").generate_signals(data).tolist()
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert lines[-1] == f"rsi: {expected[-1]}"
+    assert starts[1] == str(index[39].date())
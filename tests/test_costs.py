@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+import backtest  # noqa: E402
+from benchmarks import synthetic_ohlcv  # noqa: E402
+from costs import CostModel, drift_weights  # noqa: E402
+from engine import Backtester, MultiBacktester  # noqa: E402
+from result_cache import ResultCache, result_key  # noqa: E402
+from strategies import MACDStrategy, RSIStrategy  # noqa: E402
+from strategies.base import Strategy  # noqa: E402
+from strategies.dual_mom import DualMomentumStrategy  # noqa: E402
+from strategies.hfea55 import HFEA55Strategy  # noqa: E402
+from sweep import SweepTask, run_sweep  # noqa: E402
+
+COSTS = CostModel(
+    bps=5,
+    commission_per_share=0.01,
+    spread_bps=10,
+    borrow_bps={"3USL": 95, "3TYL": 95},
+    cash_bps=200,
+)
+
+
+def _leveraged() -> pd.DataFrame:
+    index = pd.date_range("2024-01-02", periods=90, freq="B")
+    return pd.DataFrame(
+        {
+            "3USL": [50 + (i % 7) * 0.8 + i * 0.2 for i in range(90)],
+            "3TYL": [30 - (i % 5) * 0.3 + i * 0.05 for i in range(90)],
+        },
+        index=index,
+    )
+
+
+def test_cost_model_arithmetic() -> None:
+    model = CostModel(bps=10, commission_per_share=0.02, spread_bps=4, cash_bps=252)
+    before = np.array([[0.0, 1.0]])
+    after = np.array([[0.5, 0.5]])
+    prices = np.array([[10.0, 20.0]])
+
+    assert model.trade_rate() == pytest.approx(12e-4)
+    expected = 0.5 * 12e-4 + 0.5 * 0.02 / 10 + 0.5 * 12e-4 + 0.5 * 0.02 / 20
+    assert model.turnover_costs(before, after, prices)[0] == pytest.approx(expected)
+    assert model.turnover_costs(after, after, prices)[0] == 0.0
+
+    borrow = CostModel(borrow_bps={"B": 252}).borrow_rates(["A", "B"])
+    np.testing.assert_allclose(borrow, [0.0, 1e-4])
+    carry = model.carry(np.array([[0.25, 0.0]]), np.array([1e-4, 0.0]))
+    assert carry[0] == pytest.approx(0.25e-4 - 0.75e-4)
+
+    drifted = drift_weights(
+        np.array([[0.5, 0.0]]), np.array([[10.0, 1.0]]), np.array([[12.0, 2.0]])
+    )
+    np.testing.assert_allclose(drifted, [[0.6 / 1.1, 0.0]])
+
+
+@pytest.mark.parametrize(
+    "make_strategy, data",
+    [
+        (RSIStrategy, synthetic_ohlcv(800, seed=3)),
+        (MACDStrategy, synthetic_ohlcv(800, seed=3)),
+        (lambda: HFEA55Strategy(rebalance_days=20), _leveraged()),
+        (lambda: DualMomentumStrategy(["3USL", "3TYL"], 2), _leveraged()),
+    ],
+)
+def test_costs_match_between_loop_and_vectorized(make_strategy, data) -> None:
+    loop = Backtester(make_strategy(), data, costs=COSTS)
+    expected = loop.run()
+    vec = Backtester(make_strategy(), data, costs=COSTS)
+    result = vec.run_vectorized()
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    assert vec.equity == loop.equity
+    assert (expected["cost"] > 0).any()
+    frictionless = Backtester(make_strategy(), data).run_vectorized()
+    zero = Backtester(make_strategy(), data, costs=CostModel()).run_vectorized()
+    pd.testing.assert_frame_equal(zero.drop(columns="cost"), frictionless)
+    assert (zero["cost"] == 0).all()
+
+
+class MonthlyRebalance(Strategy):
+    """Restore a 55/45 book every 20 bars and hold it in between."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.bar = 0
+
+    def next_bar(self, bar: pd.Series) -> dict[str, float] | str:  # type: ignore[override]
+        self.bar += 1
+        return {"3USL": 0.55, "3TYL": 0.45} if self.bar % 20 == 1 else "HOLD"
+
+
+def test_rebalances_pay_for_drift() -> None:
+    data = _leveraged()
+    results = Backtester(MonthlyRebalance(), data, costs=CostModel(bps=10)).run()
+    paid = results["cost"][results["cost"] > 0]
+
+    # the first trade buys the whole book, later ones only the drift
+    assert list(paid.index) == list(data.index[::20])
+    assert paid.iloc[0] == pytest.approx(10e-4)
+    assert (paid.iloc[1:] < 1e-4).all()
+    vec = Backtester(MonthlyRebalance(), data, costs=CostModel(bps=10))
+    pd.testing.assert_frame_equal(vec.run_vectorized(), results, check_exact=True)
+
+
+def test_costs_flow_through_sweeps_and_cache(tmp_path: Path) -> None:
+    data = {"SPY": synthetic_ohlcv(600, seed=2)}
+    tasks = [SweepTask("macd", {"fast": 8, "slow": 26, "signal": 9}, "SPY")]
+    args = (tasks, data, "1850-01-01", "1852-05-01")
+    cache = ResultCache(tmp_path)
+    free = run_sweep(*args, cache=cache)
+    charged = run_sweep(*args, cache=cache, costs=CostModel(bps=20))
+
+    assert charged.loc[0, "total_return"] < free.loc[0, "total_return"]
+    assert len(list(cache.entries())) == 2
+    assert result_key(MACDStrategy, {}, "f") == result_key(MACDStrategy, {}, "f", None)
+    assert result_key(MACDStrategy, {}, "f") != result_key(
+        MACDStrategy, {}, "f", CostModel()
+    )
+    multi = MultiBacktester(
+        {"macd": MACDStrategy(8, 26, 9)}, data["SPY"], costs=CostModel(bps=20)
+    ).run()
+    assert multi.metrics.loc["macd", "total_return"] == pytest.approx(
+        charged.loc[0, "total_return"]
+    )
+
+
+def test_parse_borrow() -> None:
+    assert backtest.parse_borrow("50") == 50.0
+    assert backtest.parse_borrow("3USL=95, 3TYL=80") == {"3USL": 95.0, "3TYL": 80.0}
+    with pytest.raises(ValueError):
+        backtest.parse_borrow("3USL=95,=1")
@@ -1,28 +1,23 @@
 import pandas as pd
 import pytest
-import yfinance as yf
 
 from data import DataDownloader
 
 
-def test_get_history_raises_on_empty(monkeypatch, tmp_path):
-    downloader = DataDownloader(cache_dir=tmp_path)
-
+def test_get_history_raises_on_empty(tmp_path):
     def fake_download(*args, **kwargs):
         return pd.DataFrame()
 
-    monkeypatch.setattr(yf, "download", fake_download)
+    downloader = DataDownloader(cache_dir=tmp_path, download=fake_download)
 
     with pytest.raises(ValueError, match="No data returned for ticker 'NONE'"):
         downloader.get_history("NONE", "2020-01-01", "2020-01-05")
 
-    cache_file = tmp_path / "NONE-2020-01-01-2020-01-05.parquet"
+    cache_file = tmp_path / "NONE.parquet"
     assert not cache_file.exists()
 
 
-def test_get_history_single_ticker_columns(monkeypatch, tmp_path):
-    downloader = DataDownloader(cache_dir=tmp_path)
-
+def test_get_history_single_ticker_columns(tmp_path):
     index = pd.date_range("2020-01-01", periods=2, freq="D")
     df = pd.DataFrame(
         {
@@ -39,7 +34,7 @@ def test_get_history_single_ticker_columns(monkeypatch, tmp_path):
     def fake_download(*args, **kwargs):
         return df
 
-    monkeypatch.setattr(yf, "download", fake_download)
+    downloader = DataDownloader(cache_dir=tmp_path, download=fake_download)
 
     result = downloader.get_history("AAPL", "2020-01-01", "2020-01-02")
     assert list(result.columns) == [
@@ -50,3 +45,166 @@ def test_get_history_single_ticker_columns(monkeypatch, tmp_path):
         "adj_close",
         "volume",
     ]
+
+
+def _fake_yahoo(calls):
+    def fake_download(ticker, start, end):
+        calls.append((start, end))
+        index = pd.bdate_range(start, end, inclusive="left")
+        closes = [float(ts.day) for ts in index]
+        return pd.DataFrame(
+            {
+                "Open": closes,
+                "High": closes,
+                "Low": closes,
+                "Close": closes,
+                "Adj Close": closes,
+                "Volume": [1] * len(index),
+            },
+            index=index,
+        )
+
+    return fake_download
+
+
+def test_get_history_serves_sub_range_from_cache(tmp_path):
+    calls = []
+    downloader = DataDownloader(cache_dir=tmp_path, download=_fake_yahoo(calls))
+
+    full = downloader.get_history("AAPL", "2020-01-01", "2020-03-01")
+    part = downloader.get_history("AAPL", "2020-01-15", "2020-02-01")
+
+    assert calls == [("2020-01-01", "2020-03-01")]
+    pd.testing.assert_frame_equal(
+        part, full.loc["2020-01-15":"2020-02-01"], check_freq=False
+    )
+    assert (tmp_path / "AAPL.parquet").exists()
+
+
+def test_get_history_fetches_only_missing_segments(tmp_path):
+    calls = []
+    downloader = DataDownloader(cache_dir=tmp_path, download=_fake_yahoo(calls))
+
+    downloader.get_history("AAPL", "2020-02-01", "2020-03-01")
+    result = downloader.get_history("AAPL", "2020-01-01", "2020-04-01")
+
+    assert calls == [
+        ("2020-02-01", "2020-03-01"),
+        ("2020-01-01", "2020-02-01"),
+        ("2020-03-01", "2020-04-01"),
+    ]
+    expected = pd.bdate_range("2020-01-01", "2020-04-01", inclusive="left")
+    assert list(result.index) == list(expected)
+    assert not result.index.has_duplicates
+    assert result.attrs == {}
+
+    downloader.get_history("AAPL", "2020-01-10", "2020-03-20")
+    assert len(calls) == 3
+
+
+def test_get_history_empty_tail_keeps_cache(tmp_path):
+    calls = []
+    downloader = DataDownloader(cache_dir=tmp_path, download=_fake_yahoo(calls))
+    downloader.get_history("AAPL", "2020-01-01", "2020-01-04")
+
+    # Saturday to Monday has no business days
+    result = downloader.get_history("AAPL", "2020-01-01", "2020-01-06")
+    assert calls[-1] == ("2020-01-04", "2020-01-06")
+    assert len(result) == 3
+
+    downloader.get_history("AAPL", "2020-01-02", "2020-01-05")
+    assert len(calls) == 2
+
+
+def test_get_history_refetches_unsettled_tail(tmp_path):
+    calls = []
+    fake = _fake_yahoo(calls)
+    published = {"last": pd.Timestamp.now().normalize() - pd.offsets.BDay(2)}
+
+    def download(ticker, start, end):
+        frame = fake(ticker, start, end)
+        return frame[frame.index <= published["last"]]
+
+    downloader = DataDownloader(cache_dir=tmp_path, download=download)
+    today = pd.Timestamp.now().normalize()
+    start = (today - pd.Timedelta(days=30)).strftime("%Y-%m-%d")
+    end = (today + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    first = downloader.get_history("AAPL", start, end)
+    assert first.index[-1] == published["last"]
+
+    # the next bar is published after the first call
+    published["last"] += pd.offsets.BDay(1)
+    second = downloader.get_history("AAPL", start, end)
+    assert calls[-1] == (first.index[-1].strftime("%Y-%m-%d"), end)
+    assert second.index[-1] == published["last"]
+    assert not second.index.has_duplicates
+    assert [p.name for p in tmp_path.iterdir()] == ["AAPL.parquet"]
+
+
+def test_get_histories_downloads_concurrently(tmp_path):
+    import threading
+
+    barrier = threading.Barrier(3, timeout=5)
+    calls = []
+    fake = _fake_yahoo(calls)
+
+    def concurrent_download(ticker, start, end):
+        barrier.wait()
+        return fake(ticker, start, end)
+
+    downloader = DataDownloader(
+        cache_dir=tmp_path, download=concurrent_download, max_workers=3
+    )
+    result = downloader.get_histories(["AAA", "BBB", "CCC"], "2020-01-01", "2020-01-10")
+
+    assert list(result) == ["AAA", "BBB", "CCC"]
+    assert list(result["BBB"].columns)[:4] == ["open", "high", "low", "close"]
+    for ticker in ("AAA", "BBB", "CCC"):
+        assert (tmp_path / f"{ticker}.parquet").exists()
+
+
+def test_download_retries_with_backoff(tmp_path):
+    calls = []
+    fake = _fake_yahoo(calls)
+    failures = []
+
+    def flaky(ticker, start, end):
+        if len(failures) < 2:
+            failures.append(ticker)
+            raise ConnectionError("temporary")
+        return fake(ticker, start, end)
+
+    downloader = DataDownloader(cache_dir=tmp_path, download=flaky, backoff=0)
+    result = downloader.get_history("AAPL", "2020-01-01", "2020-01-10")
+
+    assert failures == ["AAPL", "AAPL"]
+    assert len(result) == 7
+
+
+def test_get_histories_collects_errors(tmp_path):
+    from data import DownloadError
+
+    calls = []
+    fake = _fake_yahoo(calls)
+    attempts = []
+
+    def download(ticker, start, end):
+        if ticker == "BAD":
+            attempts.append(ticker)
+            raise ConnectionError("offline")
+        if ticker == "EMPTY":
+            return pd.DataFrame()
+        return fake(ticker, start, end)
+
+    downloader = DataDownloader(
+        cache_dir=tmp_path, download=download, retries=1, backoff=0
+    )
+    with pytest.raises(DownloadError) as excinfo:
+        downloader.get_histories(["GOOD", "BAD", "EMPTY"], "2020-01-01", "2020-01-10")
+
+    errors = excinfo.value.errors
+    assert set(errors) == {"BAD", "EMPTY"}
+    assert isinstance(errors["BAD"], ConnectionError)
+    assert "No data returned for ticker 'EMPTY'" in str(errors["EMPTY"])
+    assert attempts == ["BAD", "BAD"]
+    assert list(excinfo.value.results) == ["GOOD"]
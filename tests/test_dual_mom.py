@@ -4,8 +4,6 @@ import sys
 from pathlib import Path
 
 import pandas as pd
-import pytest
-import yfinance as yf
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
@@ -35,9 +33,7 @@ def test_backtester_multi_asset() -> None:
     assert any(t[0] == "BUY" for t in bt.trades)
 
 
-def test_downloader_and_backtester_multi_asset(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
-) -> None:
+def test_downloader_and_backtester_multi_asset(tmp_path: Path) -> None:
     def fake_download(ticker: str, *args: str, **kwargs: str) -> pd.DataFrame:
         index = pd.date_range("2020-01-01", periods=3, freq="D")
         data = {
@@ -50,9 +46,7 @@ def test_downloader_and_backtester_multi_asset(
         }
         return pd.DataFrame(data, index=index)
 
-    monkeypatch.setattr(yf, "download", fake_download)
-
-    downloader = DataDownloader(cache_dir=tmp_path)
+    downloader = DataDownloader(cache_dir=tmp_path, download=fake_download)
     data = downloader.get_history(["AAA", "BBB"], "2020-01-01", "2020-01-04")
     close_cols = {
         "AAA": "aaa_close",
@@ -1,7 +1,19 @@
+from pathlib import Path
+
 import pandas as pd
+import pytest
 
-from engine import Backtester
+import strategies
+from benchmarks import synthetic_ohlcv
+from costs import CostModel
+from engine import Backtester, MultiBacktester
+from metrics import tear_sheet
+from profiling import BacktestProfiler
 from strategies.base import Strategy
+from strategies.dual_mom import DualMomentumStrategy
+from strategies.hfea55 import HFEA55Strategy
+
+SAMPLE_DIR = Path(__file__).with_name("test_data")
 
 
 class SequenceStrategy(Strategy):
@@ -49,3 +61,206 @@ def test_backtester_single_asset_flow() -> None:
         ("BUY", "close", pd.Timestamp("2024-01-01"), 10.0),
         ("SELL", "close", pd.Timestamp("2024-01-02"), 11.0),
     ]
+
+
+def _assert_parity(make_strategy, data: pd.DataFrame) -> None:
+    loop = Backtester(make_strategy(), data)
+    expected = loop.run()
+    vec = Backtester(make_strategy(), data)
+    result = vec.run_vectorized()
+
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+    assert vec.trades == loop.trades
+    assert vec.rebalances == loop.rebalances
+    assert (vec.position, vec.symbol, vec.weights, vec.equity) == (
+        loop.position,
+        loop.symbol,
+        loop.weights,
+        loop.equity,
+    )
+
+
+def test_run_vectorized_matches_loop_single_asset() -> None:
+    data = pd.read_csv(SAMPLE_DIR / "sample_SPY.csv")
+    data.index = pd.date_range("2024-01-01", periods=len(data), freq="D")
+    for name, cls in strategies.STRATEGIES.items():
+        if name in {"dualmomentum", "hfea55"}:
+            continue
+        _assert_parity(cls, data)
+
+
+def test_run_vectorized_matches_loop_multi_asset() -> None:
+    index = pd.date_range("2023-01-01", periods=120, freq="D")
+    data = pd.DataFrame(
+        {
+            "AAA": [100 + (i % 17) * 1.5 + i * 0.1 for i in range(120)],
+            "BBB": [100 + (i % 11) * 2.0 - i * 0.05 for i in range(120)],
+        },
+        index=index,
+    )
+    _assert_parity(lambda: DualMomentumStrategy(["AAA", "BBB"], 2), data)
+    _assert_parity(
+        lambda: SequenceStrategy(["BUY:AAA", "BUY:BBB", "HOLD", "SELL:BBB"]), data
+    )
+
+
+def test_run_vectorized_matches_loop_weights() -> None:
+    index = pd.date_range("2024-01-02", periods=90, freq="B")
+    data = pd.DataFrame(
+        {
+            "3USL": [50 + (i % 7) * 0.8 + i * 0.2 for i in range(90)],
+            "3TYL": [30 - (i % 5) * 0.3 + i * 0.05 for i in range(90)],
+        },
+        index=index,
+    )
+    _assert_parity(lambda: HFEA55Strategy(rebalance_days=20), data)
+    bt = Backtester(HFEA55Strategy(rebalance_days=20), data)
+    results = bt.run_vectorized()
+    assert results["signal"].isna().all()
+    assert list(bt.rebalances) == [index[i] for i in (0, 21, 42, 63, 85)]
+    assert all(bt.rebalances.values())
+
+
+def test_run_vectorized_precomputed_signals() -> None:
+    data = pd.DataFrame(
+        {"close": [10.0, 11.0, 12.0, 9.0]},
+        index=pd.date_range("2024-01-01", periods=4, freq="D"),
+    )
+    bt = Backtester(SequenceStrategy([]), data)
+    results = bt.run_vectorized(["BUY", "HOLD", "SELL", "BUY"])
+
+    assert list(results["position"]) == [1, 1, 0, 1]
+    assert results["equity"].iloc[-1] == pytest.approx(1.2)
+    assert [t[0] for t in bt.trades] == ["BUY", "SELL", "BUY"]
+    with pytest.raises(ValueError):
+        bt.run_vectorized(["BUY"])
+
+
+def test_run_results_are_typed_columns() -> None:
+    index = pd.date_range("2024-01-01", periods=5, freq="D", tz="Europe/London")
+    data = pd.DataFrame({"AAA": [10.0, 11, 12, 13, 14], "BBB": [5.0] * 5}, index=index)
+    weights = {"AAA": 0.5, "BBB": 0.5}
+    signals = ["HOLD", weights, "HOLD", {"AAA": 1.0}, "HOLD"]
+    strategy = SequenceStrategy(signals)  # type: ignore[arg-type]
+    bt = Backtester(strategy, data)
+    results = bt.run()
+
+    assert (results.index == index).all()
+    assert results.index.name == "date"
+    assert results["position"].dtype == "int64"
+    assert results["price"].dtype == "float64"
+    assert results["signal"].dtype == "category"
+    assert results["signal"].isna().tolist() == [False, True, False, True, False]
+    assert (results["signal"].dropna() == "HOLD").all()
+    assert list(bt.rebalances) == [index[1], index[3]]
+    assert bt.rebalances[index[1]] is weights
+    growth = (1 + 0.5 / 11) * (1 + 0.5 / 12) * (1 + 1 / 13)
+    assert results["equity"].iloc[-1] == pytest.approx(growth)
+
+
+def test_signal_column_stores_one_byte_per_bar() -> None:
+    data = synthetic_ohlcv(5_000, seed=3)
+    for run in ("run_vectorized", "run"):
+        strategy = strategies.STRATEGIES["rsi"]()
+        results = getattr(Backtester(strategy, data), run)()
+        signal = results["signal"]
+
+        assert list(signal.cat.categories) == ["BUY", "SELL", "HOLD"]
+        assert signal.memory_usage(deep=True, index=False) < len(data) + 1024
+
+
+def test_run_on_empty_data() -> None:
+    data = pd.DataFrame({"close": []}, index=pd.DatetimeIndex([]))
+    results = Backtester(SequenceStrategy([]), data).run()
+
+    assert results.empty
+    assert list(results.columns) == [
+        "price",
+        "position",
+        "signal",
+        "equity",
+        "drawdown",
+    ]
+
+
+@pytest.mark.parametrize(
+    "costs",
+    [None, CostModel(bps=5, commission_per_share=0.01, borrow_bps=80, cash_bps=200)],
+)
+@pytest.mark.parametrize("portfolio", [False, True])
+def test_run_batch_matches_individual_runs(
+    costs: CostModel | None, portfolio: bool
+) -> None:
+    data = pd.read_csv(SAMPLE_DIR / "sample_SPY.csv")
+    data.index = pd.date_range("2024-01-01", periods=len(data), freq="D")
+    universe = {
+        "SPY": data,
+        "HALF": data * 0.5,
+        "TAIL": data.iloc[50:],
+        "CLOSE": data[["close"]] * 2,
+    }
+    strategy = strategies.STRATEGIES["macd"]()
+
+    results = Backtester.run_batch(strategy, universe, costs=costs, portfolio=portfolio)
+
+    assert list(results) == ["SPY", "HALF", "TAIL", "CLOSE"]
+    for ticker, frame in universe.items():
+        backtester = Backtester(
+            strategies.STRATEGIES["macd"](), frame, costs=costs, portfolio=portfolio
+        )
+        expected = backtester.run_vectorized()
+        pd.testing.assert_frame_equal(results[ticker], expected, check_exact=True)
+        if costs is not None:
+            assert (expected["cost"] > 0).any()
+
+
+def test_run_batch_resolves_shared_index_as_one_matrix() -> None:
+    data = pd.read_csv(SAMPLE_DIR / "sample_SPY.csv")
+    data.index = pd.date_range("2024-01-01", periods=len(data), freq="D")
+    universe = {"SPY": data, "HALF": data * 0.5, "TAIL": data.iloc[50:]}
+    profiler = BacktestProfiler()
+
+    Backtester.run_batch(strategies.STRATEGIES["macd"](), universe, profiler)
+
+    # one matrix for SPY and HALF, another for TAIL
+    assert profiler.phases["resolve"].calls == 2
+    assert sum(profiler.histograms["MACDStrategy.generate_signals"]) == 3
+
+
+def test_run_batch_falls_back_for_weight_signals() -> None:
+    data = pd.read_csv(SAMPLE_DIR / "sample_SPY.csv")
+    data.index = pd.date_range("2024-01-01", periods=len(data), freq="D")
+    universe = {"SPY": data, "HALF": data * 0.5}
+    signals = ["BUY", {"close": 0.5}, "HOLD", "SELL"]
+
+    results = Backtester.run_batch(SequenceStrategy(signals), universe)
+
+    for ticker, frame in universe.items():
+        expected = Backtester(SequenceStrategy(signals), frame).run()
+        pd.testing.assert_frame_equal(results[ticker], expected, check_exact=True)
+
+
+def test_multi_backtester_matches_separate_runs() -> None:
+    data = pd.read_csv(SAMPLE_DIR / "sample_SPY.csv")
+    data.index = pd.date_range("2024-01-01", periods=len(data), freq="D")
+    signals = ["BUY", "HOLD", "SELL", "BUY"]
+
+    def make() -> dict[str, Strategy]:
+        return {
+            "macd": strategies.STRATEGIES["macd"](),
+            "rsi": strategies.STRATEGIES["rsi"](rsi_buy=40),
+            "sequence": SequenceStrategy(signals),
+        }
+
+    result = MultiBacktester(make(), data).run()
+
+    assert list(result.results) == ["macd", "rsi", "sequence"]
+    assert list(result.metrics.index) == ["macd", "rsi", "sequence"]
+    for name, strategy in make().items():
+        backtester = Backtester(strategy, data)
+        expected = backtester.run()
+        pd.testing.assert_frame_equal(result.results[name], expected, check_exact=True)
+        assert result.trades[name] == backtester.trades
+        assert result.rebalances[name] == backtester.rebalances
+        sheet = tear_sheet(expected["equity"], expected["position"])
+        assert result.metrics.loc[name, "sharpe"] == pytest.approx(sheet["sharpe"])
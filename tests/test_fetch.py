@@ -14,7 +14,7 @@ import fetch_data  # noqa: E402
 import fetch as fetch_cli  # noqa: E402
 
 
-def _fake_history(*args: str, **kwargs: str) -> pd.DataFrame:
+def _fake_history() -> pd.DataFrame:
     index = pd.date_range("2020-01-01", periods=2, freq="D")
     index.name = "date"
     return pd.DataFrame(
@@ -30,8 +30,14 @@ def _fake_history(*args: str, **kwargs: str) -> pd.DataFrame:
     )
 
 
+def _fake_histories(
+    self: object, tickers: list[str], *args: str
+) -> dict[str, pd.DataFrame]:
+    return {t: _fake_history() for t in tickers}
+
+
 def test_fetch_function(monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setattr(fetch_data.DataDownloader, "get_history", _fake_history)
+    monkeypatch.setattr(fetch_data.DataDownloader, "get_histories", _fake_histories)
     result = fetch_data.fetch(["SPY", "IDTL"], start="2020-01-01", end="2020-01-02")
     assert set(result.keys()) == {"SPY", "IDTL"}
     for df in result.values():
@@ -46,7 +52,7 @@ def test_fetch_function(monkeypatch: pytest.MonkeyPatch) -> None:
 
 
 def test_cli_writes_csv(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setattr(fetch_data.DataDownloader, "get_history", _fake_history)
+    monkeypatch.setattr(fetch_data.DataDownloader, "get_histories", _fake_histories)
 
     argv = [
         "fetch.py",
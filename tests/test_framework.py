@@ -7,8 +7,6 @@ from typing import Any
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
 import pandas as pd
-import pytest
-import yfinance as yf
 
 from data import DataDownloader
 from engine import Backtester
@@ -23,26 +21,20 @@ def load_sample(ticker: str) -> pd.DataFrame:
     df.index = pd.date_range("2024-01-01", periods=len(df), freq="D")
     return df
 
-def test_downloader_caches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    downloader = DataDownloader(cache_dir=tmp_path)
-
+def test_downloader_caches(tmp_path: Path) -> None:
     sample = load_sample("SPY")
 
-    monkeypatch.setattr(yf, "download", lambda *args, **kwargs: sample)
+    downloader = DataDownloader(cache_dir=tmp_path, download=lambda *args: sample)
 
     df = downloader.get_history("SPY", "2020-01-01", "2020-01-10")
-    cache_file = tmp_path / "SPY-2020-01-01-2020-01-10.parquet"
+    cache_file = tmp_path / "SPY.parquet"
     assert cache_file.exists()
     df2 = downloader.get_history("SPY", "2020-01-01", "2020-01-10")
     assert len(df) == len(df2)
 
 
-def test_downloader_multi_ticker(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
-) -> None:
-    downloader = DataDownloader(cache_dir=tmp_path)
-
-    def fake_download(ticker: str, *args: Any, **kwargs: Any) -> pd.DataFrame:
+def test_downloader_multi_ticker(tmp_path: Path) -> None:
+    def fake_download(ticker: str, *args: Any) -> pd.DataFrame:
         index = pd.date_range("2020-01-01", periods=3, freq="D")
         data = {
             "Open": [1, 2, 3],
@@ -54,7 +46,7 @@ def test_downloader_multi_ticker(
         }
         return pd.DataFrame(data, index=index)
 
-    monkeypatch.setattr(yf, "download", fake_download)
+    downloader = DataDownloader(cache_dir=tmp_path, download=fake_download)
 
     df = downloader.get_history(["AAA", "BBB"], "2020-01-01", "2020-01-04")
     expected_cols = [
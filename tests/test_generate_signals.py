@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from strategies import (  # noqa: E402
+    BollingerStrategy,
+    BreakoutStrategy,
+    CoveredCallMedianStrategy,
+    DualMomentumStrategy,
+    EndOfMonthBondPopStrategy,
+    HFEA55Strategy,
+    IBSStrategy,
+    LeveragedTrendStrategy,
+    MACDStrategy,
+    RSIStrategy,
+)
+from strategies.base import Strategy  # noqa: E402
+
+SAMPLE_DIR = Path(__file__).with_name("test_data")
+
+
+def _sample(freq: str) -> pd.DataFrame:
+    df = pd.read_csv(SAMPLE_DIR / "sample_SPY.csv")
+    df.index = pd.date_range("2024-01-01", periods=len(df), freq=freq)
+    return df
+
+
+def _frame(closes: list[float], start: str = "2023-01-02") -> pd.DataFrame:
+    index = pd.date_range(start, periods=len(closes), freq="B")
+    return pd.DataFrame({"close": closes}, index=index)
+
+
+def _with_gap(df: pd.DataFrame) -> pd.DataFrame:
+    """Drop three weeks of bars so the weekly resample contains empty weeks."""
+    return df.drop(df.index[40:55])
+
+
+FIXTURES = {
+    "sample_daily": _sample("D"),
+    "sample_business": _sample("B"),
+    "sample_gap": _with_gap(_sample("B")),
+    "steps": _frame([100] * 5 + [102] * 5 + [90] * 5 + [100] * 5),
+    "macd_steps": _frame([1] * 5 + [10] * 5 + [5] * 5 + [15] * 5),
+    "breakout": _frame([100] * 10 + [110] * 5 + [90] * 5),
+    "sma_exit": _frame([100.0] * 200 + [110.0, 99.5]),
+    "trend": _frame([100] * 220 + [110] * 20 + [90] * 20),
+    "median": _frame([100] * 60 + [80] * 10 + [110] * 10, "2024-01-02"),
+}
+
+FACTORIES: dict[str, Any] = {
+    "rsi": lambda: RSIStrategy(),
+    "rsi_short": lambda: RSIStrategy(rsi_buy=30, rsi_sell=70, length=2),
+    "macd": lambda: MACDStrategy(),
+    "macd_fast": lambda: MACDStrategy(fast=2, slow=3, signal=2),
+    "bollinger": lambda: BollingerStrategy(),
+    "bollinger_short": lambda: BollingerStrategy(length=2, dev=0.5),
+    "breakout": lambda: BreakoutStrategy(),
+    "breakout_short": lambda: BreakoutStrategy(lookback_weeks=2, stop_pct=0.1),
+    "ibs": lambda: IBSStrategy(),
+    "leveragedtrend": lambda: LeveragedTrendStrategy(),
+    "leveragedtrend_short": lambda: LeveragedTrendStrategy(sma_len=20),
+    "median_cc": lambda: CoveredCallMedianStrategy(band=1.0),
+    "median_cc_short": lambda: CoveredCallMedianStrategy(median_len=10),
+    "median_cc_zero_band": lambda: CoveredCallMedianStrategy(band=0.0),
+    "eom_bond": lambda: EndOfMonthBondPopStrategy(hold_days=5),
+}
+
+
+def _replay(strategy: Strategy, df: pd.DataFrame) -> list[Any]:
+    strategy.reset()
+    return [strategy.next_bar(bar) for _, bar in df.iterrows()]
+
+
+@pytest.mark.parametrize("fixture", sorted(FIXTURES))
+@pytest.mark.parametrize("name", sorted(FACTORIES))
+def test_generate_signals_matches_next_bar(name: str, fixture: str) -> None:
+    df = FIXTURES[fixture]
+    if name == "ibs" and "high" not in df.columns:
+        df = df.assign(high=df["close"] + 1, low=df["close"] - 1)
+    expected = _replay(FACTORIES[name](), df)
+
+    signals = FACTORIES[name]().generate_signals(df)
+
+    assert signals.index.equals(df.index)
+    assert signals.tolist() == expected
+
+
+def test_default_generate_signals_replays_next_bar() -> None:
+    index = pd.date_range("2023-01-01", periods=90, freq="D")
+    data = pd.DataFrame(
+        {"AAA": range(90), "BBB": range(90, 0, -1)}, index=index, dtype=float
+    )
+    strategy = DualMomentumStrategy(["AAA", "BBB"], lookback_weeks=1)
+    signals = strategy.generate_signals(data)
+    assert signals.tolist() == _replay(
+        DualMomentumStrategy(["AAA", "BBB"], lookback_weeks=1), data
+    )
+
+    weights = HFEA55Strategy(rebalance_days=20).generate_signals(
+        data.rename(columns={"AAA": "3USL", "BBB": "3TYL"})
+    )
+    assert weights.iloc[0] == {"3USL": 0.55, "3TYL": 0.45}
+
+
+def test_generate_signals_leaves_live_state() -> None:
+    df = FIXTURES["trend"]
+    strategy = LeveragedTrendStrategy(sma_len=20)
+    for _, bar in df.iloc[:230].iterrows():
+        strategy.next_bar(bar)
+    assert strategy.position == 1
+
+    strategy.generate_signals(df)
+    assert strategy.position == 1
+
+
+def test_generate_signals_requires_datetime_index() -> None:
+    df = pd.DataFrame({"close": [1.0, 2.0, 3.0]})
+    with pytest.raises(ValueError):
+        RSIStrategy().generate_signals(df)
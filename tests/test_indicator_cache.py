@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+from benchmarks import synthetic_ohlcv  # noqa: E402
+from strategies import BollingerStrategy, LeveragedTrendStrategy  # noqa: E402
+from strategies.indicator_cache import (  # noqa: E402
+    INDICATORS,
+    IndicatorCache,
+    series_fingerprint,
+)
+from strategies.indicators import weekly_sma, weekly_view  # noqa: E402
+
+
+@pytest.fixture
+def indicators() -> Iterator[IndicatorCache]:
+    INDICATORS.clear()
+    yield INDICATORS
+    INDICATORS.resize(IndicatorCache().max_bytes)
+    INDICATORS.clear()
+
+
+def _close(seed: int = 1) -> pd.Series:
+    return synthetic_ohlcv(300, seed=seed)["close"]
+
+
+def test_lookups_are_keyed_by_data_name_and_params() -> None:
+    cache = IndicatorCache()
+    close = _close()
+    calls: list[int] = []
+
+    def compute(n: int) -> np.ndarray:
+        calls.append(n)
+        return np.full(10, float(n))
+
+    first = cache.get(close, "const", 1, lambda: compute(1))
+    assert cache.get(close.copy(), "const", 1, lambda: compute(1)) is first
+    cache.get(close, "const", 2, lambda: compute(2))
+    cache.get(close, "other", 1, lambda: compute(1))
+    cache.get(_close(seed=2), "const", 1, lambda: compute(1))
+
+    assert calls == [1, 2, 1, 1]
+    assert (cache.hits, cache.misses, len(cache)) == (1, 4, 4)
+    assert not first.flags.writeable
+    assert series_fingerprint(close) != series_fingerprint(close.tz_localize("UTC"))
+
+
+def test_least_recently_used_entries_are_evicted() -> None:
+    cache = IndicatorCache(max_bytes=2 * 80)
+    close = _close()
+    for n in (1, 2):
+        cache.get(close, "const", n, lambda: np.zeros(10))
+    cache.get(close, "const", 1, lambda: np.zeros(10))
+    cache.get(close, "const", 3, lambda: np.zeros(10))
+
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 3,
+        "evictions": 1,
+        "entries": 2,
+        "bytes": 160,
+    }
+    cache.get(close, "const", 1, lambda: np.zeros(10))
+    assert cache.hits == 2
+    cache.resize(0)
+    assert (len(cache), cache.nbytes) == (0, 0)
+    cache.get(close, "const", 1, lambda: np.zeros(10))
+    assert len(cache) == 0
+
+
+def test_strategies_share_indicators(indicators: IndicatorCache) -> None:
+    data = synthetic_ohlcv(600, seed=4)
+    expected = {
+        dev: BollingerStrategy(length=20, dev=dev).generate_signals(data)
+        for dev in (1.5, 2.5)
+    }
+    indicators.resize(0)
+    indicators.clear()
+    for dev, signals in expected.items():
+        uncached = BollingerStrategy(length=20, dev=dev).generate_signals(data)
+        pd.testing.assert_series_equal(signals, uncached)
+
+    indicators.resize(IndicatorCache().max_bytes)
+    indicators.clear()
+    BollingerStrategy(length=20).generate_signals(data)
+    hits = indicators.hits
+    LeveragedTrendStrategy(sma_len=100).generate_signals(data)
+
+    assert indicators.hits == hits + 2  # weekly view and the 20-week SMA
+    sma = weekly_sma(data["close"], 20)
+    assert sma is weekly_sma(data["close"], 20)
+    assert not weekly_view(data["close"]).partial.flags.writeable
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from strategies import (  # noqa: E402
+    BollingerStrategy,
+    BreakoutStrategy,
+    CoveredCallMedianStrategy,
+    DualMomentumStrategy,
+    LeveragedTrendStrategy,
+    MACDStrategy,
+    RSIStrategy,
+)
+from strategies.base import Strategy  # noqa: E402
+from strategies.indicators import (  # noqa: E402
+    EWM,
+    RollingMax,
+    RollingMedian,
+    RollingStats,
+    WeeklyBars,
+    WilderRSI,
+)
+from strategies.rsi import wilder_rsi  # noqa: E402
+
+SAMPLE_DIR = Path(__file__).with_name("test_data")
+
+
+def _series() -> pd.Series:
+    closes = pd.read_csv(SAMPLE_DIR / "sample_SPY.csv")["close"].tolist()
+    values = closes + closes[::-1] + [closes[-1]] * 12 + closes
+    values[30:34] = [float("nan")] * 4
+    return pd.Series(values, dtype=float)
+
+
+def _assert_identical(result: list[float], expected: pd.Series) -> None:
+    np.testing.assert_array_equal(np.array(result), expected.to_numpy())
+
+
+@pytest.mark.parametrize("window", [1, 2, 5, 20])
+def test_rolling_stats_matches_pandas(window: int) -> None:
+    series = _series()
+    stats = RollingStats(window)
+    means, stds, pending_means, pending_stds = [], [], [], []
+    for value in series:
+        pending_means.append(stats.mean(value))
+        pending_stds.append(stats.std(value))
+        stats.update(value)
+        means.append(stats.mean())
+        stds.append(stats.std())
+
+    rolling = series.rolling(window)
+    _assert_identical(means, rolling.mean())
+    _assert_identical(pending_means, rolling.mean())
+    _assert_identical(stds, rolling.std())
+    _assert_identical(pending_stds, rolling.std())
+
+
+def test_ewm_and_rsi_match_pandas() -> None:
+    series = _series()
+    for com, min_periods in ((5.5, 0), (13.0, 14)):
+        ewm = EWM(com, min_periods)
+        peeked, updated = [], []
+        for value in series:
+            peeked.append(ewm.peek(value))
+            updated.append(ewm.update(value))
+        expected = series.ewm(com=com, adjust=False, min_periods=min_periods)
+        _assert_identical(updated, expected.mean())
+        _assert_identical(peeked, expected.mean())
+
+    rsi = WilderRSI(14)
+    peeked, updated = [], []
+    for value in series:
+        peeked.append(rsi.peek(value))
+        updated.append(rsi.update(value))
+    _assert_identical(updated, wilder_rsi(series, 14))
+    _assert_identical(peeked, wilder_rsi(series, 14))
+
+
+def test_rolling_max_and_median_match_pandas() -> None:
+    series = _series()
+    rolling_max = RollingMax(7)
+    _assert_identical(
+        [rolling_max.update(v) for v in series],
+        series.rolling(7, min_periods=1).max(),
+    )
+    for window in (9, 10):
+        median = RollingMedian(window)
+        _assert_identical(
+            [median.update(v) for v in series], series.rolling(window).median()
+        )
+
+
+@pytest.mark.parametrize("window", [1, 4, 25])
+def test_rolling_median_stays_bounded(window: int) -> None:
+    rng = np.random.default_rng(0)
+    trend = np.cumsum(rng.random(400))
+    ties = rng.integers(0, 4, 400).astype(float)
+    for values in (trend, -trend, ties):
+        series = pd.Series(values)
+        median = RollingMedian(window)
+        result = []
+        for value in values:
+            result.append(median.update(value))
+            assert len(median._lo) + len(median._hi) <= 2 * window
+        _assert_identical(result, series.rolling(window).median())
+
+
+def test_weekly_bars_match_resample() -> None:
+    series = _series()
+    index = pd.bdate_range("2020-01-01", periods=len(series) + 20)
+    close = pd.Series(series.to_numpy(), index=index.delete(range(60, 80)))
+    weekly = WeeklyBars()
+    completed: list[float] = []
+    for ts, value in close.items():
+        completed += weekly.update(ts, value)
+
+    expected = close.resample("W-FRI").last()
+    _assert_identical(completed + [weekly.current], expected)
+    assert weekly.count == len(expected)
+
+
+def _golden_frames() -> dict[str, pd.DataFrame]:
+    base = pd.read_csv(SAMPLE_DIR / "sample_SPY.csv")["close"].tolist()
+    closes: list[float] = []
+    for k in range(8):
+        segment = base if k % 2 == 0 else base[::-1]
+        closes += [c * (1 + 0.03 * k) for c in segment]
+    index = pd.bdate_range("2015-01-01", periods=len(closes))
+    long = pd.DataFrame({"close": closes}, index=index)
+    return {"long": long, "gap": long.drop(long.index[300:320])}
+
+
+GOLDEN_FACTORIES: dict[str, Callable[[], Strategy]] = {
+    "rsi": lambda: RSIStrategy(),
+    "rsi_short": lambda: RSIStrategy(length=3),
+    "macd": lambda: MACDStrategy(),
+    "macd_fast": lambda: MACDStrategy(fast=3, slow=6, signal=2),
+    "bollinger": lambda: BollingerStrategy(),
+    "bollinger_short": lambda: BollingerStrategy(length=4, dev=1.0),
+    "breakout": lambda: BreakoutStrategy(),
+    "breakout_short": lambda: BreakoutStrategy(lookback_weeks=4, stop_pct=0.03),
+    "leveragedtrend": lambda: LeveragedTrendStrategy(),
+    "leveragedtrend_short": lambda: LeveragedTrendStrategy(sma_len=30),
+    "median_cc": lambda: CoveredCallMedianStrategy(),
+    "median_cc_short": lambda: CoveredCallMedianStrategy(
+        band=0.005, median_len=15
+    ),
+    "dualmomentum": lambda: DualMomentumStrategy(["AAA", "BBB"]),
+    "dualmomentum_short": lambda: DualMomentumStrategy(
+        ["AAA", "BBB"], lookback_weeks=4
+    ),
+}
+
+
+@pytest.mark.parametrize("frame", ["long", "gap"])
+@pytest.mark.parametrize("name", sorted(GOLDEN_FACTORIES))
+def test_signals_match_resample_implementation(name: str, frame: str) -> None:
+    """Signals equal those recorded from the full-resample implementation."""
+    golden = json.loads((SAMPLE_DIR / "signals_golden.json").read_text())
+    df = _golden_frames()[frame]
+    if name.startswith("dualmomentum"):
+        closes = df["close"].to_numpy()
+        df = pd.DataFrame({"AAA": closes, "BBB": closes[::-1]}, index=df.index)
+
+    strategy = GOLDEN_FACTORIES[name]()
+    signals: dict[str, Any] = {}
+    for i, (_, bar) in enumerate(df.iterrows()):
+        signal = strategy.next_bar(bar)
+        if signal != "HOLD":
+            signals[str(i)] = signal
+
+    assert signals == golden[f"{name}/{frame}"]
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from benchmarks import synthetic_ohlcv  # noqa: E402
+from live import (  # noqa: E402
+    DropDirectorySource,
+    SignalChange,
+    SignalDaemon,
+    WarehouseSource,
+)
+from strategies import STRATEGIES  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+
+NAMES = ["rsi", "macd", "bollinger", "ibs", "breakout"]
+
+
+def _expected_changes(data: pd.DataFrame, warm: int) -> list[SignalChange]:
+    changes = []
+    for name in NAMES:
+        signals = STRATEGIES[name]().generate_signals(data).tolist()
+        for t in range(warm, len(data)):
+            if signals[t] != signals[t - 1]:
+                ts = data.index[t]
+                changes.append(SignalChange(ts, name, signals[t], signals[t - 1]))
+    return sorted(changes, key=lambda c: (c.timestamp, NAMES.index(c.strategy)))
+
+
+def test_incremental_ingest_matches_full_history() -> None:
+    data = synthetic_ohlcv(400, seed=5)
+    seen: list[SignalChange] = []
+    daemon = SignalDaemon(
+        {name: STRATEGIES[name]() for name in NAMES}, on_change=seen.append
+    )
+    daemon.warmup(data.iloc[:200])
+
+    changes: list[SignalChange] = []
+    for stop in range(203, 403, 3):
+        # overlapping chunks: bars already ingested are skipped
+        changes += daemon.ingest(data.iloc[stop - 6 : stop])
+
+    assert changes == _expected_changes(data, 200)
+    assert seen == changes
+    assert daemon.last_timestamp == data.index[-1]
+
+
+def test_drop_directory_source(tmp_path: Path) -> None:
+    data = synthetic_ohlcv(60)
+    data.iloc[:40].to_csv(tmp_path / "001.csv")
+    source = DropDirectorySource(tmp_path)
+    daemon = SignalDaemon({"rsi": STRATEGIES["rsi"]()}, source)
+
+    daemon.poll()
+    assert daemon.last_timestamp == data.index[39]
+    assert daemon.poll() == []
+
+    data.iloc[35:50].to_csv(tmp_path / ".002.csv")
+    data.iloc[35:50].to_parquet(tmp_path / "002.parquet")
+    daemon.poll()
+    assert daemon.last_timestamp == data.index[49]
+
+    archive = DropDirectorySource(tmp_path, archive=True)
+    assert len(archive.poll(None)) == 50
+    assert sorted(p.name for p in (tmp_path / "processed").iterdir()) == [
+        "001.csv",
+        "002.parquet",
+    ]
+    assert archive.poll(None).empty
+
+
+def test_warehouse_source_reads_only_new_rows(tmp_path: Path) -> None:
+    data = synthetic_ohlcv(120)
+    store = Warehouse(tmp_path)
+    source = WarehouseSource(store, "SPY")
+    assert source.poll(None).empty
+
+    store.write("SPY", data.iloc[:100])
+    daemon = SignalDaemon({"macd": STRATEGIES["macd"]()}, source)
+    daemon.warmup(source.poll(None))
+    store.append("SPY", data.iloc[:120])
+
+    assert len(source.poll(daemon.last_timestamp)) == 20
+    daemon.poll()
+    assert daemon.last_timestamp == data.index[-1]
+
+
+def test_run_polls_until_stopped(tmp_path: Path) -> None:
+    polls: list[pd.Timestamp | None] = []
+
+    class Source:
+        def poll(self, after: pd.Timestamp | None) -> pd.DataFrame:
+            polls.append(after)
+            if len(polls) == 3:
+                stop.set()
+            return pd.DataFrame()
+
+    stop = threading.Event()
+    daemon = SignalDaemon({}, Source())
+    daemon.run(poll_seconds=0, stop=stop)
+    assert len(polls) == 3
+    daemon.run(poll_seconds=0, max_polls=2)
+    assert len(polls) == 5
+    with pytest.raises(ValueError):
+        SignalDaemon({}).poll()
+
+
+def test_checkpoint_resume_matches_continuous_run(tmp_path: Path) -> None:
+    data = synthetic_ohlcv(400, seed=9)
+    checkpoint = tmp_path / "state.pkl"
+
+    first = SignalDaemon({name: STRATEGIES[name]() for name in NAMES})
+    first.warmup(data.iloc[:200])
+    first.ingest(data.iloc[200:300])
+    first.save_checkpoint(checkpoint)
+
+    resumed = SignalDaemon({name: STRATEGIES[name]() for name in NAMES})
+    assert resumed.load_checkpoint(checkpoint)
+    assert resumed.last_timestamp == data.index[299]
+    assert resumed.signals == first.signals
+
+    resume = data.index[299]
+    expected = [c for c in _expected_changes(data, 200) if c.timestamp > resume]
+    assert resumed.ingest(data) == expected
+
+    assert not SignalDaemon({"rsi": STRATEGIES["rsi"]()}).load_checkpoint(checkpoint)
+    assert not resumed.load_checkpoint(tmp_path / "missing.pkl")
+
+
+def test_poll_keeps_checkpoint_current(tmp_path: Path) -> None:
+    data = synthetic_ohlcv(80)
+    data.iloc[:60].to_csv(tmp_path / "001.csv")
+    checkpoint = tmp_path / "state" / "daemon.pkl"
+    checkpoint.parent.mkdir()
+    source = DropDirectorySource(tmp_path)
+    daemon = SignalDaemon({"rsi": STRATEGIES["rsi"]()}, source, checkpoint=checkpoint)
+    daemon.poll()
+    assert checkpoint.exists()
+
+    data.iloc[60:].to_csv(tmp_path / "002.csv")
+    daemon.poll()
+    restored = SignalDaemon({"rsi": STRATEGIES["rsi"]()})
+    assert restored.load_checkpoint(checkpoint)
+    assert restored.last_timestamp == data.index[-1]
@@ -3,12 +3,21 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytest
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
-from metrics import cagr, max_drawdown, sharpe_ratio  # noqa: E402
+from metrics import (  # noqa: E402
+    ROLLING_METRICS,
+    TEAR_SHEET_METRICS,
+    cagr,
+    max_drawdown,
+    rolling_tear_sheet,
+    sharpe_ratio,
+    tear_sheet,
+)
 
 
 def test_cagr_basic() -> None:
@@ -40,3 +49,74 @@ def test_max_drawdown() -> None:
     drawdown = pd.Series([0.0, -0.1, -0.05])
     assert max_drawdown(drawdown) == -0.1
     assert max_drawdown(pd.Series(dtype=float)) == 0.0
+
+
+def test_tear_sheet_known_values() -> None:
+    equity = np.array([1.0, 1.1, 0.99, 1.089, 1.2])
+    position = np.array([0, 1, 1, 0, 1])
+    sheet = tear_sheet(equity, position, periods_per_year=4)
+
+    returns = pd.Series(equity).pct_change().dropna()
+    assert list(sheet) == list(TEAR_SHEET_METRICS)
+    assert sheet["total_return"] == pytest.approx(0.2)
+    assert sheet["cagr"] == pytest.approx(0.2)
+    assert sheet["sharpe"] == pytest.approx(sharpe_ratio(returns, periods_per_year=4))
+    assert sheet["volatility"] == pytest.approx(returns.std(ddof=0) * 2)
+    downside = np.sqrt((np.minimum(returns, 0) ** 2).mean())
+    assert sheet["sortino"] == pytest.approx(returns.mean() / downside * 2)
+    assert sheet["max_drawdown"] == pytest.approx(-0.1)
+    assert sheet["calmar"] == pytest.approx(2.0)
+    assert sheet["ulcer_index"] == pytest.approx(np.sqrt((0.01 + 0.0001) / 5))
+    assert sheet["max_drawdown_duration"] == 2
+    assert sheet["win_rate"] == pytest.approx(0.75)
+    assert sheet["turnover"] == pytest.approx(3 * 4 / 5)
+    assert sheet["exposure"] == pytest.approx(0.6)
+
+
+def test_tear_sheet_matrix_matches_rows_and_padding() -> None:
+    rng = np.random.default_rng(1)
+    curves = np.cumprod(1 + rng.normal(0.0005, 0.01, (4, 300)), axis=1)
+    positions = (rng.random((4, 300)) > 0.5).astype(float)
+    padded = curves.copy()
+    padded[2, 200:] = np.nan
+
+    sheet = tear_sheet(padded, positions)
+    assert sheet["sharpe"].shape == (4,)
+    for i in (0, 3):
+        row = tear_sheet(curves[i], positions[i])
+        for name in TEAR_SHEET_METRICS:
+            assert sheet[name][i] == pytest.approx(float(row[name]))
+    short = tear_sheet(curves[2, :200], positions[2, :200])
+    for name in TEAR_SHEET_METRICS:
+        assert sheet[name][2] == pytest.approx(float(short[name]))
+
+
+def test_tear_sheet_edge_cases() -> None:
+    flat = tear_sheet(np.ones(10))
+    assert all(flat[name] == 0 for name in ROLLING_METRICS)
+    assert np.isnan(flat["turnover"]) and np.isnan(flat["exposure"])
+    assert tear_sheet(np.array([1.0]))["cagr"] == 0.0
+    with pytest.raises(ValueError):
+        tear_sheet(np.ones((2, 0)))
+    with pytest.raises(ValueError):
+        tear_sheet(np.ones(3), np.ones(4))
+
+
+def test_rolling_tear_sheet_matches_windows() -> None:
+    rng = np.random.default_rng(2)
+    curves = np.cumprod(1 + rng.normal(0.0, 0.01, (2, 120)), axis=1)
+    curves[1, 100:] = np.nan
+    rolling = rolling_tear_sheet(curves, 20)
+
+    assert list(rolling) == list(ROLLING_METRICS)
+    assert rolling["sharpe"].shape == curves.shape
+    assert np.isnan(rolling["sharpe"][:, :20]).all()
+    assert np.isnan(rolling["sortino"][1, 100:]).all()
+    for t in (20, 57, 99):
+        window = tear_sheet(curves[1, t - 20 : t + 1])
+        for name in ROLLING_METRICS:
+            assert rolling[name][1, t] == pytest.approx(float(window[name]))
+    one = rolling_tear_sheet(curves[0], 20)
+    np.testing.assert_allclose(one["max_drawdown"], rolling["max_drawdown"][0])
+    with pytest.raises(ValueError):
+        rolling_tear_sheet(curves, 0)
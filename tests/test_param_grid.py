@@ -3,11 +3,19 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 project_root = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(project_root / "src"))
 sys.path.insert(0, str(project_root))
 
 from backtest import generate_param_grid  # noqa: E402
+from sweep import (  # noqa: E402
+    Constraint,
+    iter_param_grid,
+    normalize_param,
+    strategy_constraints,
+)
 
 
 def test_generate_param_grid() -> None:
@@ -20,3 +28,38 @@ def test_generate_param_grid() -> None:
         {"a": 2, "b": 3, "c": 5},
     ]
     assert grid == expected
+
+
+def test_iter_param_grid_is_lazy_and_deduplicated() -> None:
+    grid = iter_param_grid({"a": [1, 1.0, 2], "b": ["x", "x"], "c": 3})
+
+    assert next(grid) == {"a": 1, "b": "x", "c": 3}
+    assert list(grid) == [{"a": 2, "b": "x", "c": 3}]
+    assert normalize_param(10.0) == 10
+    assert normalize_param(0.5) == 0.5
+
+
+def test_constraints_filter_the_grid() -> None:
+    params = {"fast": [5, 10, 20], "slow": [10, 20], "dev": [1.0, 2.5]}
+    grid = generate_param_grid(params, ["fast < slow", "dev >= 1.5"])
+
+    assert grid == [
+        {"fast": 5, "slow": 10, "dev": 2.5},
+        {"fast": 5, "slow": 20, "dev": 2.5},
+        {"fast": 10, "slow": 20, "dev": 2.5},
+    ]
+    assert Constraint(" fast!=-1e1 ").names == {"fast"}
+    for expr in ("fast <", "fast < slow < 3", "1 < 2", "__import__('os') == 1"):
+        with pytest.raises(ValueError):
+            Constraint(expr)
+    with pytest.raises(ValueError):
+        iter_param_grid(params, ["fast < nope"])
+
+
+def test_strategy_constraints_apply_to_swept_params() -> None:
+    both = strategy_constraints("macd", {"fast": [12, 30], "slow": 26})
+
+    assert [c.expr for c in both] == ["fast < slow"]
+    assert strategy_constraints("macd", {"fast": [12, 30]}) == []
+    grid = generate_param_grid({"fast": [12, 30], "slow": 26}, both)
+    assert grid == [{"fast": 12, "slow": 26}]
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+from benchmarks import synthetic_ohlcv  # noqa: E402
+from costs import CostModel  # noqa: E402
+from engine import Backtester, MultiBacktester  # noqa: E402
+from portfolio import Portfolio, drift, weighted_returns  # noqa: E402
+from strategies import MACDStrategy, RSIStrategy  # noqa: E402
+from strategies.base import Strategy  # noqa: E402
+from strategies.dual_mom import DualMomentumStrategy  # noqa: E402
+
+
+class Rebalance(Strategy):
+    """Restore fixed target weights every *every* bars and hold in between."""
+
+    def __init__(self, weights: dict[str, float], every: int = 20) -> None:
+        super().__init__()
+        self.targets = weights
+        self.every = every
+        self.bar = 0
+
+    def next_bar(self, bar: pd.Series) -> dict[str, float] | str:  # type: ignore[override]
+        self.bar += 1
+        return dict(self.targets) if self.bar % self.every == 1 else "HOLD"
+
+
+def _prices(n: int = 120, m: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    steps = 1 + rng.normal(0.0005, 0.02, (n, m))
+    return pd.DataFrame(
+        100 * np.cumprod(steps, axis=0),
+        index=pd.date_range("2024-01-02", periods=n, freq="B"),
+        columns=[f"A{j}" for j in range(m)],
+    )
+
+
+def test_portfolio_drifts_between_rebalances() -> None:
+    book = Portfolio(["A", "B"])
+    book.mark(np.array([10.0, 20.0]))
+    book.rebalance(np.array([0.5, 0.25]))
+    assert book.cash == pytest.approx(0.25)
+
+    ret, parts = book.mark(np.array([12.0, 20.0]))
+    assert ret == pytest.approx(0.1)
+    np.testing.assert_allclose(parts, [0.1, 0.0])
+    np.testing.assert_allclose(book.weights, [0.6 / 1.1, 0.25 / 1.1])
+    assert book.cash == pytest.approx(0.25 / 1.1)
+
+    weights, cash = drift(
+        np.array([[0.5, 0.25]]), np.array([[10.0, 20.0]]), np.array([[12.0, 20.0]])
+    )
+    np.testing.assert_array_equal(weights[0], book.weights)
+    assert cash[0] == book.cash
+    rets, _ = weighted_returns(
+        np.array([[1.0, 0.0]]), np.array([[10.0, np.nan]]), np.array([[11.0, 5.0]])
+    )
+    assert rets[0] == pytest.approx(0.1)
+    with pytest.raises(ValueError):
+        Portfolio(["A"]).rebalance(np.array([1.0]))
+
+
+@pytest.mark.parametrize(
+    "costs", [None, CostModel(bps=5, borrow_bps=100, cash_bps=300)]
+)
+def test_portfolio_matches_between_loop_and_vectorized(costs: CostModel | None) -> None:
+    data = _prices()
+    strategies = [
+        lambda: Rebalance({"A0": 0.5, "A1": 0.3, "A2": 0.1}),
+        lambda: DualMomentumStrategy(["A0", "A1", "A2"], 10),
+    ]
+    for make in strategies:
+        loop = Backtester(make(), data, costs=costs, portfolio=True)
+        expected = loop.run()
+        vec = Backtester(make(), data, costs=costs, portfolio=True)
+        result = vec.run_vectorized()
+
+        pd.testing.assert_frame_equal(result, expected, check_exact=True)
+        assert vec.holdings is not None and vec.pnl is not None
+        assert loop.holdings is not None and loop.pnl is not None
+        pd.testing.assert_frame_equal(vec.holdings, loop.holdings, check_exact=True)
+        pd.testing.assert_frame_equal(vec.pnl, loop.pnl, check_exact=True)
+
+
+def test_pnl_attribution_explains_equity() -> None:
+    data = _prices()
+    bt = Backtester(Rebalance({"A0": 0.6, "A2": 0.3}), data, portfolio=True)
+    results = bt.run_vectorized()
+    assert bt.holdings is not None and bt.pnl is not None
+
+    equity = results["equity"].to_numpy()
+    change = np.diff(np.concatenate(([1.0], equity)))
+    np.testing.assert_allclose(bt.pnl.sum(axis=1), change, atol=1e-12)
+    assert (bt.pnl["A1"] == 0).all()
+    invested = bt.holdings.sum(axis=1) + results["cash"]
+    np.testing.assert_allclose(invested, 1.0)
+
+    # weights drift between rebalances but are restored on them
+    rebalanced = results.index.isin(list(bt.rebalances))
+    assert rebalanced.any()
+    np.testing.assert_allclose(bt.holdings.loc[rebalanced, "A0"], 0.6)
+    assert bt.holdings.loc[~rebalanced, "A0"].std() > 0
+
+    fixed = Backtester(Rebalance({"A0": 0.6, "A2": 0.3}), data).run_vectorized()
+    assert results["equity"].iloc[-1] != fixed["equity"].iloc[-1]
+
+
+def test_single_asset_portfolio_matches_default() -> None:
+    data = synthetic_ohlcv(600, seed=5)
+    for cls in (RSIStrategy, MACDStrategy):
+        default = Backtester(cls(), data).run_vectorized()
+        bt = Backtester(cls(), data, portfolio=True)
+        book = bt.run_vectorized()
+
+        pd.testing.assert_frame_equal(book.drop(columns="cash"), default, rtol=1e-12)
+        assert bt.holdings is not None
+        held = (book["position"] == 1).to_numpy()
+        assert (bt.holdings["close"].to_numpy()[held] == 1.0).all()
+        assert (book["cash"].to_numpy()[~held] == 1.0).all()
+
+    run = MultiBacktester({"rsi": RSIStrategy()}, data, portfolio=True).run()
+    assert "cash" in run.results["rsi"].columns
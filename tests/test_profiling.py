@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pstats
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from engine import Backtester  # noqa: E402
+from profiling import HISTOGRAM_EDGES_US, BacktestProfiler  # noqa: E402
+from strategies.rsi import RSIStrategy  # noqa: E402
+from sweep import SweepTask, run_sweep  # noqa: E402
+
+
+def _prices(periods: int = 60) -> pd.DataFrame:
+    index = pd.bdate_range("2020-01-01", periods=periods)
+    close = [100 + (i % 7) - (i % 3) * 2 + i * 0.1 for i in range(periods)]
+    return pd.DataFrame({"close": close}, index=index)
+
+
+def test_profiled_run_matches_plain_run() -> None:
+    data = _prices()
+    plain = Backtester(RSIStrategy(length=5), data)
+    prof = BacktestProfiler(allocations=True)
+    profiled = Backtester(RSIStrategy(length=5), data, profiler=prof)
+
+    pd.testing.assert_frame_equal(profiled.run(), plain.run())
+    assert profiled.trades == plain.trades
+
+    summary = prof.summary()
+    assert set(summary.index) == {
+        "rows",
+        "returns",
+        "next_bar",
+        "trades",
+        "record",
+        "assemble",
+    }
+    assert summary.loc["next_bar", "calls"] == len(data)
+    assert summary.loc["rows", "calls"] == len(data)
+    assert summary.loc["assemble", "calls"] == 1
+    assert summary["share"].sum() == pytest.approx(1.0)
+    assert summary["alloc_blocks"].notna().all()
+
+    histogram = prof.histogram()
+    assert list(histogram.index) == ["RSIStrategy.next_bar"]
+    assert histogram.shape[1] == len(HISTOGRAM_EDGES_US) + 1
+    assert histogram.to_numpy().sum() == len(data)
+
+
+def test_profiled_vectorized_run_and_report() -> None:
+    data = _prices()
+    prof = BacktestProfiler()
+    plain = Backtester(RSIStrategy(length=5), data).run_vectorized()
+    profiled = Backtester(RSIStrategy(length=5), data, profiler=prof)
+
+    pd.testing.assert_frame_equal(profiled.run_vectorized(), plain)
+    assert list(prof.summary().sort_index().index) == [
+        "assemble",
+        "resolve",
+        "returns",
+        "signals",
+    ]
+    report = prof.report()
+    assert "RSIStrategy.generate_signals" in report
+    assert "alloc_blocks" not in report
+
+
+def test_profiler_accumulates_across_sweep_and_dumps_stats(tmp_path: Path) -> None:
+    tasks = [SweepTask("rsi", {"length": n}, "SPY") for n in (5, 10, 14)]
+    out = tmp_path / "sweep.pstats"
+    with BacktestProfiler(cprofile=True) as prof:
+        run_sweep(tasks, {"SPY": _prices()}, "2020-01-01", "2020-03-31", profiler=prof)
+    prof.dump_stats(out)
+
+    assert prof.phases["signals"].calls == len(tasks)
+    assert pstats.Stats(str(out)).total_calls > 0
+    with pytest.raises(ValueError):
+        run_sweep(tasks, {"SPY": _prices()}, "2020-01-01", "2020-03-31", 2, None, prof)
+    with pytest.raises(ValueError):
+        BacktestProfiler().dump_stats(out)
+
+
+def test_phase_is_charged_when_its_block_raises() -> None:
+    prof = BacktestProfiler()
+    with pytest.raises(RuntimeError):
+        with prof.phase("load"):
+            raise RuntimeError("boom")
+
+    assert prof.phases["load"].calls == 1
+    with prof.phase("next"):
+        pass
+    assert prof.phases["next"].calls == 1
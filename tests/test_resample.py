@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+import fetch_data  # noqa: E402
+from benchmarks import synthetic_intraday  # noqa: E402
+from costs import CostModel  # noqa: E402
+from data import DataDownloader  # noqa: E402
+from engine import Backtester  # noqa: E402
+from metrics import periods_per_year, tear_sheet  # noqa: E402
+from resample import iter_resampled, resample_ohlcv  # noqa: E402
+from strategies.base import Strategy  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+
+MINUTES = synthetic_intraday(12, seed=4)
+
+
+def _fake_minutes(calls: list[tuple[str, str, str]]):
+    def fake_download(
+        ticker: str, start: str, end: str, interval: str = "1d"
+    ) -> pd.DataFrame:
+        calls.append((start, end, interval))
+        bars = MINUTES[(MINUTES.index >= start) & (MINUTES.index < end)]
+        return bars.rename(columns=lambda c: c.replace("_", " ").title())
+
+    return fake_download
+
+
+def _chunks(frame: pd.DataFrame, rows: int) -> list[pd.DataFrame]:
+    return [frame.iloc[pos : pos + rows] for pos in range(0, len(frame), rows)]
+
+
+@pytest.mark.parametrize("rule", ["1D", "W-FRI", "1h"])
+@pytest.mark.parametrize("rows", [97, 390, 2000])
+def test_iter_resampled_matches_whole_history(rule: str, rows: int) -> None:
+    expected = resample_ohlcv(MINUTES, rule)
+    result = pd.concat(list(iter_resampled(_chunks(MINUTES, rows), rule)))
+
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+
+def test_resample_ohlcv_aggregates_sessions() -> None:
+    daily = resample_ohlcv(MINUTES)
+    session = MINUTES.loc["2024-01-03"]
+
+    assert len(daily) == 12 and daily.index.name == "date"
+    assert daily.loc["2024-01-03", "open"] == session["open"].iloc[0]
+    assert daily.loc["2024-01-03", "high"] == session["high"].max()
+    assert daily.loc["2024-01-03", "low"] == session["low"].min()
+    assert daily.loc["2024-01-03", "close"] == session["close"].iloc[-1]
+    assert daily.loc["2024-01-03", "volume"] == session["volume"].sum()
+    # weekends have no bars and therefore no rows
+    assert not (daily.index.weekday >= 5).any()
+
+
+@pytest.mark.parametrize("stored", ["parquet", "warehouse"])
+def test_downloader_streams_intraday_cache(tmp_path: Path, stored: str) -> None:
+    calls: list[tuple[str, str, str]] = []
+    store = Warehouse(tmp_path / "wh") if stored == "warehouse" else None
+    loader = DataDownloader(
+        cache_dir=tmp_path,
+        download=_fake_minutes(calls),
+        warehouse=store,
+        interval="1m",
+    )
+    start, end = "2024-01-02", "2024-01-18"
+
+    chunks = list(loader.iter_history("AAA", start, end, chunk_rows=500))
+    assert calls == [(start, end, "1m")]
+    assert max(len(chunk) for chunk in chunks) <= 500
+    expected = loader.get_histories(["AAA"], start, end)["AAA"]
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected, check_freq=False)
+    pd.testing.assert_frame_equal(
+        pd.concat(chunks), MINUTES, check_freq=False, check_dtype=False
+    )
+    if store is None:
+        assert (tmp_path / "AAA_1m.parquet").exists()
+    else:
+        assert store.coverage("AAA_1m") is not None
+
+    daily = loader.get_resampled(["AAA"], start, end, rule="1D", chunk_rows=700)
+    pd.testing.assert_frame_equal(daily["AAA"], resample_ohlcv(expected))
+    sub = list(loader.iter_history("AAA", "2024-01-05", "2024-01-06", 100))
+    assert pd.concat(sub).index.normalize().unique().tolist() == [
+        pd.Timestamp("2024-01-05")
+    ]
+    assert len(calls) == 1
+
+
+def test_intervals_are_cached_apart(tmp_path: Path) -> None:
+    calls: list[tuple[str, str, str]] = []
+    fake = _fake_minutes(calls)
+    DataDownloader(tmp_path, fake, interval="1m").get_history(
+        "AAA", "2024-01-02", "2024-01-04"
+    )
+    DataDownloader(tmp_path, lambda *args: fake(*args)).get_history(
+        "AAA", "2024-01-02", "2024-01-04"
+    )
+
+    assert [call[2] for call in calls] == ["1m", "1d"]
+    assert {p.name for p in tmp_path.glob("*.parquet")} == {
+        "AAA.parquet",
+        "AAA_1m.parquet",
+    }
+    with pytest.raises(ValueError, match="Unknown interval"):
+        DataDownloader(tmp_path, interval="7m")
+
+
+def test_fetch_passes_interval(monkeypatch: pytest.MonkeyPatch) -> None:
+    seen: list[str] = []
+
+    def fake_histories(
+        self: DataDownloader, tickers: list[str], *args: str
+    ) -> dict[str, pd.DataFrame]:
+        seen.append(self.interval)
+        return {t: MINUTES for t in tickers}
+
+    monkeypatch.setattr(fetch_data.DataDownloader, "get_histories", fake_histories)
+    fetch_data.fetch("QQQ", "2024-01-02", "2024-01-04", interval="5m")
+    assert seen == ["5m"]
+
+
+class Idle(Strategy):
+    """Never trade, so the whole book earns the cash rate."""
+
+    def next_bar(self, bar: pd.Series) -> str:  # type: ignore[override]
+        return "HOLD"
+
+
+def test_periods_per_year_counts_intraday_bars() -> None:
+    assert periods_per_year(MINUTES.index) == 252 * 390
+    assert periods_per_year(resample_ohlcv(MINUTES).index) == 252
+    assert periods_per_year(resample_ohlcv(MINUTES, "W-FRI").index) == 52
+    assert periods_per_year(pd.RangeIndex(10)) == 252
+
+
+@pytest.mark.parametrize("rule, per_year", [("W-FRI", 52), ("ME", 12)])
+def test_weekly_and_monthly_bars_annualize_by_their_spacing(
+    rule: str, per_year: int
+) -> None:
+    # three years of bars compounding to +33.1%, i.e. 10% a year
+    index = pd.date_range("2021-01-01", periods=3 * per_year + 1, freq=rule)
+    assert periods_per_year(index) == per_year
+    growth = 1.331 ** (1 / (3 * per_year))
+    equity = growth ** np.arange(len(index))
+    sheet = tear_sheet(equity, None, periods_per_year(index))
+    assert sheet["cagr"] == pytest.approx(0.1)
+
+    # 520 bps of cash yield a year accrue 520 / per_year bps per bar
+    prices = pd.DataFrame({"close": np.linspace(100, 120, len(index))}, index=index)
+    costs = CostModel(cash_bps=520, periods_per_year=periods_per_year(index))
+    results = Backtester(Idle(), prices, costs=costs).run_vectorized()
+    per_bar = 0.052 / per_year
+    expected = (1 + per_bar) ** np.arange(len(index))
+    np.testing.assert_allclose(results["equity"], expected, rtol=1e-12)
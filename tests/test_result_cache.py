@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+import sys
+import types
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+import cache as cache_cli  # noqa: E402
+from engine import Backtester  # noqa: E402
+from result_cache import (  # noqa: E402
+    ResultCache,
+    code_version,
+    data_fingerprint,
+    result_key,
+)
+from strategies import BollingerStrategy, RSIStrategy  # noqa: E402
+from sweep import SweepTask, run_sweep  # noqa: E402
+
+SAMPLE_DIR = Path(__file__).with_name("test_data")
+
+
+def _sample() -> pd.DataFrame:
+    df = pd.read_csv(SAMPLE_DIR / "sample_SPY.csv")
+    df.index = pd.bdate_range("2020-01-01", periods=len(df))
+    return df
+
+
+def test_key_depends_on_class_params_and_data() -> None:
+    data = _sample()
+    fingerprint = data_fingerprint(data)
+    key = result_key(RSIStrategy, {"rsi_buy": 30}, fingerprint)
+
+    assert data_fingerprint(data.copy()) == fingerprint
+    assert data_fingerprint(data.astype(float)) == fingerprint
+    changed = data.copy()
+    changed.iloc[-1, 0] += 1
+    assert data_fingerprint(changed) != fingerprint
+    assert data_fingerprint(data.tz_localize("UTC")) != fingerprint
+    assert result_key(RSIStrategy, {"rsi_buy": 30}, fingerprint) == key
+    assert result_key(RSIStrategy, {"rsi_buy": 20}, fingerprint) != key
+    assert result_key(BollingerStrategy, {"rsi_buy": 30}, fingerprint) != key
+    assert code_version(RSIStrategy) != code_version(BollingerStrategy)
+
+
+@pytest.mark.parametrize("module", ["metrics", "portfolio"])
+def test_code_version_covers_metrics_and_portfolio(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, module: str
+) -> None:
+    code_version.cache_clear()
+    before = code_version(RSIStrategy)
+    source = project_root / "src" / f"{module}.py"
+    edited = tmp_path / f"{module}.py"
+    edited.write_text(source.read_text() + "\n# changed\n")
+    fake = types.ModuleType(module)
+    fake.__file__ = str(edited)
+    monkeypatch.setitem(sys.modules, module, fake)
+    code_version.cache_clear()
+    try:
+        assert code_version(RSIStrategy) != before
+    finally:
+        code_version.cache_clear()
+
+
+def test_backtest_is_served_from_cache(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path)
+    data = _sample()
+    params = {"rsi_buy": 30, "rsi_sell": 70}
+
+    first = cache.backtest(RSIStrategy, params, data)
+    second = ResultCache(tmp_path).backtest(RSIStrategy, params, data)
+
+    expected = Backtester(RSIStrategy(**params), data).run()
+    pd.testing.assert_frame_equal(first, expected)
+    pd.testing.assert_frame_equal(second, expected)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert len(list(cache.entries())) == 1
+
+
+def test_eviction_drops_least_recently_used(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path)
+    data = _sample()
+    for buy in (20, 30, 40):
+        cache.backtest(RSIStrategy, {"rsi_buy": buy}, data)
+    entries = {e.key: e for e in cache.entries()}
+    size = max(e.size for e in entries.values())
+    fingerprint = data_fingerprint(data)
+    keys = [result_key(RSIStrategy, {"rsi_buy": b}, fingerprint) for b in (20, 30, 40)]
+    for age, key in enumerate(keys):
+        os.utime(entries[key].path, (1_000 + age, 1_000 + age))
+    assert cache.get(RSIStrategy, keys[0]) is not None
+
+    small = ResultCache(tmp_path, max_bytes=2 * size)
+    small.backtest(RSIStrategy, {"rsi_buy": 50}, data)
+
+    remaining = {e.key for e in cache.entries()}
+    assert keys[0] in remaining
+    assert keys[1] not in remaining
+    assert len(remaining) == 2
+
+
+def test_invalidate_by_strategy(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path)
+    data = _sample()
+    cache.backtest(RSIStrategy, {}, data)
+    cache.backtest(BollingerStrategy, {}, data)
+
+    assert cache.invalidate(RSIStrategy) == 1
+    assert {e.strategy for e in cache.entries()} == {"BollingerStrategy"}
+    assert cache.invalidate() == 1
+    assert not list(cache.entries())
+
+
+def test_run_sweep_reuses_cached_results(tmp_path: Path) -> None:
+    data = {"SPY": _sample()}
+    tasks = [SweepTask("rsi", {"rsi_buy": buy}, "SPY") for buy in (20, 30)]
+    cache = ResultCache(tmp_path)
+    fresh = run_sweep(tasks, data, "2020-01-01", "2020-12-31")
+    first = run_sweep(tasks, data, "2020-01-01", "2020-12-31", cache=cache)
+    parallel = run_sweep(
+        tasks, data, "2020-01-01", "2020-12-31", jobs=2, cache=ResultCache(tmp_path)
+    )
+    second = run_sweep(tasks, data, "2020-01-01", "2020-12-31", cache=cache)
+
+    pd.testing.assert_frame_equal(first, fresh)
+    pd.testing.assert_frame_equal(parallel, fresh)
+    pd.testing.assert_frame_equal(second, fresh)
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert len(list(cache.entries())) == 2
+
+
+def test_run_sweep_reads_entries_of_backtest(tmp_path: Path) -> None:
+    data = {"SPY": _sample()}
+    tasks = [SweepTask("rsi", {}, "SPY")]
+    fresh = run_sweep(tasks, data, "2020-01-01", "2020-12-31")
+    cache = ResultCache(tmp_path)
+    cache.backtest(RSIStrategy, {}, data["SPY"])
+
+    cached = run_sweep(tasks, data, "2020-01-01", "2020-12-31", cache=cache)
+
+    assert cache.hits == 1
+    assert cached[["sharpe", "sortino", "volatility"]].notna().all(axis=None)
+    pd.testing.assert_frame_equal(cached, fresh)
+
+
+def test_cache_cli_clear(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    cache = ResultCache(tmp_path)
+    cache.backtest(RSIStrategy, {}, _sample())
+    cache.backtest(BollingerStrategy, {}, _sample())
+
+    assert cache_cli.main(["--cache-dir", str(tmp_path), "info"]) == 0
+    assert "RSIStrategy" in capsys.readouterr().out
+    cache_cli.main(["--cache-dir", str(tmp_path), "clear", "--strategy", "rsi"])
+    assert "Removed 1" in capsys.readouterr().out
+    assert {e.strategy for e in cache.entries()} == {"BollingerStrategy"}
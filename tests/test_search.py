@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+import backtest  # noqa: E402
+from benchmarks import synthetic_ohlcv  # noqa: E402
+from search import (  # noqa: E402
+    SAMPLERS,
+    LatinHypercubeSampler,
+    Sampler,
+    SearchSpace,
+    SuccessiveHalvingSampler,
+    Trial,
+    run_search,
+)
+from sweep import SUMMARY_COLUMNS, SweepTask, run_sweep  # noqa: E402
+
+SPACE = {"fast": {"low": 5, "high": 20}, "slow": {"low": 21, "high": 60}, "signal": 9}
+
+
+def _data() -> dict[str, pd.DataFrame]:
+    return {"SPY": synthetic_ohlcv(600, seed=2)}
+
+
+def test_space_maps_the_unit_cube() -> None:
+    space = SearchSpace(
+        {
+            "n": {"low": 1, "high": 4},
+            "x": {"low": 0.1, "high": 10.0, "log": True},
+            "c": ["a", "b"],
+            "k": 7,
+        }
+    )
+
+    assert space.names == ["n", "x", "c"]
+    assert space.size == float("inf")
+    assert space.from_unit([0.0, 0.0, 0.0]) == {"n": 1, "x": 0.1, "c": "a", "k": 7}
+    assert space.from_unit([1.0, 1.0, 1.0]) == {"n": 4, "x": 10.0, "c": "b", "k": 7}
+    params = space.from_unit([0.6, 0.5, 0.7])
+    assert params["n"] == 3
+    assert params["x"] == pytest.approx(1.0)
+    assert space.from_unit(space.to_unit(params)) == params
+    assert SearchSpace({"a": [1, 2, 3], "b": {"low": 0, "high": 4}}).size == 15
+    with pytest.raises(ValueError):
+        space.grid()
+
+
+def test_latin_hypercube_covers_every_stratum() -> None:
+    space = SearchSpace({"a": {"low": 0, "high": 9}, "b": {"low": 0, "high": 9}})
+    trials = LatinHypercubeSampler(space, seed=1).ask(10)
+
+    assert sorted(t.params["a"] for t in trials) == list(range(10))
+    assert sorted(t.params["b"] for t in trials) == list(range(10))
+
+
+def test_sampler_base_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        Sampler(SearchSpace(SPACE))  # type: ignore[abstract]
+
+
+def test_successive_halving_promotes_the_best() -> None:
+    space = SearchSpace({"a": {"low": 0, "high": 99}})
+    sampler = SuccessiveHalvingSampler(space, configs=9, eta=3, min_fraction=1 / 9)
+    first = sampler.ask(100)
+    assert len(first) == 9
+    assert {t.fraction for t in first} == {1 / 9}
+    for trial in first:
+        sampler.tell(trial, trial.params["a"])
+
+    second = sampler.ask(100)
+    top = sorted((t.params["a"] for t in first), reverse=True)[:3]
+    assert [t.params["a"] for t in second] == top
+    assert [t.fraction for t in second] == [pytest.approx(1 / 3)] * 3
+    for trial in second:
+        sampler.tell(trial, trial.params["a"])
+    assert sampler.ask(100) == [Trial({"a": top[0]}, 1.0)]
+
+
+@pytest.mark.parametrize("sampler", sorted(set(SAMPLERS) - {"grid"}))
+def test_run_search_respects_budget(sampler: str) -> None:
+    result = run_search(
+        "macd",
+        SearchSpace(SPACE),
+        _data(),
+        "1850-01-01",
+        "1852-05-01",
+        sampler=sampler,
+        budget=12,
+        batch=4,
+    )
+
+    cost = result.trials["fraction"].sum()
+    assert cost <= 12 + 1e-9
+    assert list(result.summary.columns) == SUMMARY_COLUMNS
+    assert len(result.summary) == (result.trials["fraction"] == 1).sum() > 0
+    assert result.trials["params"].is_unique or sampler == "halving"
+    full = result.trials[result.trials["fraction"] == 1]
+    assert json.dumps(result.best, sort_keys=True) == full.loc[
+        full["score"].idxmax(), "params"
+    ]
+
+
+def test_grid_sampler_matches_run_sweep() -> None:
+    grid = {"fast": [8, 12], "slow": [26, 30], "signal": 9}
+    result = run_search(
+        "macd", SearchSpace(grid), _data(), "1850-01-01", "1852-05-01", sampler="grid"
+    )
+    tasks = [SweepTask("macd", p, "SPY") for p in SearchSpace(grid).grid()]
+    expected = run_sweep(tasks, _data(), "1850-01-01", "1852-05-01")
+
+    pd.testing.assert_frame_equal(result.summary, expected)
+
+
+def test_run_search_stops_early_and_resumes(tmp_path: Path) -> None:
+    state = tmp_path / "macd.json"
+    args = ("macd", SearchSpace(SPACE), _data(), "1850-01-01", "1852-05-01")
+    whole = run_search(*args, budget=12, batch=3, seed=4)
+    first = run_search(*args, budget=6, batch=3, seed=4, state_path=state)
+    resumed = run_search(*args, budget=12, batch=3, seed=4, state_path=state)
+
+    assert len(first.trials) == 6
+    pd.testing.assert_frame_equal(resumed.trials, whole.trials)
+    pd.testing.assert_frame_equal(resumed.summary, whole.summary)
+    with pytest.raises(ValueError):
+        run_search(*args, budget=12, batch=3, seed=5, state_path=state)
+
+    stopped = run_search(*args, budget=50, batch=1, patience=3)
+    scores = stopped.trials["score"].to_numpy()
+    best = np.maximum.accumulate(scores)
+    assert len(scores) < 50
+    assert (best[-4:] == best[-4]).all()
+
+
+def test_backtest_main_sampled_sweep(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    def fake_get_histories(
+        self: object, tickers: list[str], *args: str
+    ) -> dict[str, pd.DataFrame]:
+        return {t: synthetic_ohlcv(400, seed=1) for t in tickers}
+
+    monkeypatch.setattr(backtest.DataDownloader, "get_histories", fake_get_histories)
+    monkeypatch.chdir(tmp_path)
+    argv = [
+        "backtest.py",
+        "--strategy",
+        "macd",
+        "--ticker",
+        "SPY",
+        "--start",
+        "1850-01-01",
+        "--end",
+        "1851-07-01",
+        "--params",
+        json.dumps(SPACE),
+        "--sweep",
+        "--sampler",
+        "surrogate",
+        "--budget",
+        "10",
+        "--search-state",
+        "state",
+    ]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    backtest.main()
+
+    assert "macd: 10 trials with surrogate" in capsys.readouterr().out
+    assert len(pd.read_csv(tmp_path / "results" / "sweep_SPY.csv")) == 10
+    assert len(pd.read_csv(tmp_path / "results" / "search_macd.csv")) == 10
+    assert (tmp_path / "state" / "macd.json").exists()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import multiprocessing
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from shared_data import SharedDataHandle, SharedMarketData  # noqa: E402
+
+
+def _frame() -> pd.DataFrame:
+    index = pd.date_range("2024-01-01", periods=4, freq="D", name="date")
+    return pd.DataFrame(
+        {
+            "spy_close": [1.0, 2.0, np.nan, 4.0],
+            "spy_volume": [10, 20, 30, 40],
+            "tlt_close": [5.0, 6.0, 7.0, 8.0],
+        },
+        index=index,
+    )
+
+
+def _close_sum(handle: SharedDataHandle) -> float:
+    store = SharedMarketData.attach(handle)
+    total = float(np.nansum(store.column("spy_close")))
+    store.close()
+    return total
+
+
+def test_attach_returns_zero_copy_views() -> None:
+    df = _frame()
+    with SharedMarketData.publish(df) as store:
+        view = SharedMarketData.attach(store.handle)
+        frame = view.to_frame()
+
+        pd.testing.assert_frame_equal(frame, df.astype(float), check_freq=False)
+        assert np.shares_memory(frame["tlt_close"].to_numpy(), view.values)
+        assert view.column("tlt_close").flags.c_contiguous
+        with pytest.raises(ValueError):
+            view.column("tlt_close")[0] = 0.0
+        with pytest.raises(KeyError):
+            view.column("missing")
+
+        del frame
+        view.close()
+
+
+def test_publish_keeps_timezone_and_requires_datetime_index() -> None:
+    df = _frame().tz_localize("US/Eastern")
+    with SharedMarketData.publish(df) as store:
+        assert store.index.equals(df.index)
+        assert store.index.name == "date"
+
+    with pytest.raises(ValueError):
+        SharedMarketData.publish(df.reset_index(drop=True))
+
+
+def test_workers_read_published_block() -> None:
+    with SharedMarketData.publish(_frame()) as store:
+        with multiprocessing.Pool(1) as pool:
+            assert pool.apply(_close_sum, (store.handle,)) == 7.0
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from benchmarks import HFEA_ASSETS, _universe, synthetic_ohlcv  # noqa: E402
+from strategies import STRATEGIES, DualMomentumStrategy  # noqa: E402
+from strategies.base import SNAPSHOT_MAGIC, Strategy  # noqa: E402
+
+SINGLE = synthetic_ohlcv(600, seed=11)
+CASES: dict[str, tuple[Callable[[], Strategy], pd.DataFrame]] = {
+    name: (cls, SINGLE)
+    for name, cls in STRATEGIES.items()
+    if name not in {"dualmomentum", "hfea55"}
+}
+CASES["dualmomentum"] = (
+    lambda: DualMomentumStrategy(["AAA", "BBB", "CCC"], lookback_weeks=4),
+    _universe(600, ["AAA", "BBB", "CCC"], 3),
+)
+CASES["hfea55"] = (STRATEGIES["hfea55"], _universe(600, HFEA_ASSETS, 7))
+
+
+def _feed(strategy: Strategy, df: pd.DataFrame) -> list[Any]:
+    return [strategy.next_bar(bar) for _, bar in df.iterrows()]
+
+
+@pytest.mark.parametrize("split", [1, 137, 450])
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_restore_and_continue_matches_full_replay(name: str, split: int) -> None:
+    factory, df = CASES[name]
+    expected = _feed(factory(), df)
+
+    head = factory()
+    _feed(head, df.iloc[:split])
+    blob = head.snapshot(as_of=df.index[split - 1])
+
+    resumed = factory()
+    _feed(resumed, df.iloc[:5])  # stale state is discarded on restore
+    assert resumed.restore(blob) == df.index[split - 1]
+    assert _feed(resumed, df.iloc[split:]) == expected[split:]
+
+
+def test_snapshot_is_compact_and_versioned() -> None:
+    strategy = STRATEGIES["bollinger"]()
+    _feed(strategy, SINGLE)
+    blob = strategy.snapshot()
+
+    assert blob.startswith(SNAPSHOT_MAGIC)
+    assert len(blob) < len(pickle.dumps(strategy))
+    assert STRATEGIES["bollinger"]().restore(blob) is None
+
+    with pytest.raises(ValueError, match="version"):
+        strategy.restore(blob[:4] + b"\x63\x00" + blob[6:])
+    with pytest.raises(ValueError, match="cannot restore"):
+        STRATEGIES["rsi"]().restore(blob)
+    with pytest.raises(ValueError):
+        strategy.restore(b"junk")
+
+
+def test_restore_takes_snapshot_parameters() -> None:
+    fast = STRATEGIES["macd"](fast=3, slow=6, signal=2)
+    _feed(fast, SINGLE.iloc[:200])
+    restored = STRATEGIES["macd"]()
+    restored.restore(fast.snapshot())
+
+    assert restored.params == {"fast": 3, "slow": 6, "signal": 2}
+    assert _feed(restored, SINGLE.iloc[200:]) == _feed(fast, SINGLE.iloc[200:])
+
+
+def test_snapshot_size_does_not_grow_with_history() -> None:
+    def snapshot_size(bars: int) -> dict[str, int]:
+        index = pd.bdate_range("2000-01-03", periods=bars)
+        closes = np.linspace(100, 160, bars)
+        data = pd.DataFrame(
+            {"close": closes, "AAA": closes, "BBB": closes[::-1]}, index=index
+        )
+        rsi = STRATEGIES["rsi"]()
+        dual = DualMomentumStrategy(["AAA", "BBB"], lookback_weeks=4)
+        for _, bar in data.iterrows():
+            rsi.next_bar(bar)
+            dual.next_bar(bar)
+        return {"rsi": len(rsi.snapshot()), "dual": len(dual.snapshot())}
+
+    # the look-back windows of the indicators do not grow with the history
+    short, long = snapshot_size(600), snapshot_size(3000)
+    for name in short:
+        assert long[name] <= short[name] + 64
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+import backtest  # noqa: E402
+from costs import CostModel  # noqa: E402
+from engine import Backtester  # noqa: E402
+from metrics import tear_sheet  # noqa: E402
+from strategies import STRATEGIES  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+from sweep import (  # noqa: E402
+    SUMMARY_COLUMNS,
+    SweepTask,
+    iter_param_grid,
+    param_hash,
+    run_strategies,
+    run_sweep,
+    run_universe,
+    stream_sweep,
+)
+
+SAMPLE_DIR = Path(__file__).with_name("test_data")
+
+
+def _sample() -> pd.DataFrame:
+    df = pd.read_csv(SAMPLE_DIR / "sample_SPY.csv")
+    df.index = pd.bdate_range("2020-01-01", periods=len(df))
+    return df
+
+
+def _tasks() -> list[SweepTask]:
+    tasks = [
+        SweepTask("rsi", {"rsi_buy": buy, "rsi_sell": 70}, "SPY")
+        for buy in (20, 30, 40)
+    ]
+    tasks += [
+        SweepTask("coveredcallmedian", {"band": band, "median_len": 10}, "SPY")
+        for band in (0.005, 0.01)
+    ]
+    return tasks
+
+
+def test_run_sweep_parallel_matches_serial(tmp_path: Path) -> None:
+    data = {"SPY": _sample()}
+    serial = run_sweep(_tasks(), data, "2020-01-01", "2020-12-31", jobs=1)
+    parallel = run_sweep(
+        _tasks(), data, "2020-01-01", "2020-12-31", jobs=2, results_dir=tmp_path
+    )
+
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert serial["paramhash"].tolist() == [param_hash(t.params) for t in _tasks()]
+    assert len(list(tmp_path.glob("*.csv"))) == len(_tasks())
+
+
+def test_run_sweep_summary_has_tear_sheet() -> None:
+    task = _tasks()[1]
+    summary = run_sweep([task], {"SPY": _sample()}, "2020-01-01", "2020-12-31")
+
+    assert list(summary.columns) == SUMMARY_COLUMNS
+    results = Backtester(STRATEGIES["rsi"](**task.params), _sample()).run()
+    sheet = tear_sheet(results["equity"], results["position"])
+    for name in ("sharpe", "sortino", "ulcer_index", "turnover", "exposure"):
+        assert summary.loc[0, name] == pytest.approx(float(sheet[name]))
+
+
+def test_run_sweep_unknown_strategy() -> None:
+    with pytest.raises(ValueError):
+        run_sweep([SweepTask("nope", {}, "SPY")], {"SPY": _sample()}, "a", "b")
+
+
+def test_backtest_sweep_writes_summary(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls: list[list[str]] = []
+
+    def fake_get_histories(
+        self: object, tickers: list[str], *args: str
+    ) -> dict[str, pd.DataFrame]:
+        calls.append(list(tickers))
+        return {t: _sample() for t in tickers}
+
+    monkeypatch.setattr(backtest.DataDownloader, "get_histories", fake_get_histories)
+    monkeypatch.chdir(tmp_path)
+    argv = [
+        "backtest.py",
+        "--strategy",
+        "rsi",
+        "--ticker",
+        "SPY",
+        "--start",
+        "2020-01-01",
+        "--end",
+        "2020-12-31",
+        "--params",
+        '{"rsi_buy": [20, 30], "rsi_sell": [60, 70]}',
+        "--sweep",
+        "--jobs",
+        "2",
+    ]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    backtest.main()
+
+    assert calls == [["SPY"]]
+    summary = pd.read_csv(tmp_path / "results" / "sweep_SPY.csv")
+    assert len(summary) == 4
+    assert summary["params"].tolist() == [
+        '{"rsi_buy": 20, "rsi_sell": 60}',
+        '{"rsi_buy": 20, "rsi_sell": 70}',
+        '{"rsi_buy": 30, "rsi_sell": 60}',
+        '{"rsi_buy": 30, "rsi_sell": 70}',
+    ]
+    assert list((tmp_path / "results").iterdir()) == [
+        tmp_path / "results" / "sweep_SPY.csv"
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_stream_sweep_appends_chunks(tmp_path: Path, jobs: int) -> None:
+    data = {"SPY": _sample(), "HALF": _sample() * 0.5}
+    grid = {"rsi_buy": [20, 30, 30.0, 40], "rsi_sell": [35, 70]}
+    tasks = [
+        SweepTask("rsi", p, t)
+        for p in iter_param_grid(grid, ["rsi_buy < rsi_sell"])
+        for t in data
+    ]
+    (tmp_path / "sweep_SPY.csv").write_text("stale\n")
+
+    written = stream_sweep(
+        iter(tasks), data, "2020-01-01", "2020-12-31", tmp_path, jobs, chunk_size=3
+    )
+
+    expected = run_sweep(tasks, data, "2020-01-01", "2020-12-31")
+    assert written == len(tasks) == 10
+    for ticker, rows in expected.groupby("ticker", sort=False):
+        streamed = pd.read_csv(tmp_path / f"sweep_{ticker}.csv")
+        assert list(streamed.columns) == SUMMARY_COLUMNS
+        assert streamed["params"].tolist() == rows["params"].tolist()
+        np.testing.assert_allclose(streamed["sharpe"], rows["sharpe"])
+
+
+def test_run_strategies_matches_run_sweep(tmp_path: Path) -> None:
+    data = {"SPY": _sample(), "HALF": _sample() * 0.5}
+    tasks = [
+        SweepTask(name, params, ticker)
+        for name, params in [
+            ("rsi", {"rsi_buy": 40}),
+            ("macd", {}),
+            ("coveredcallmedian", {"median_len": 10}),
+            ("rsi", {"rsi_buy": 20}),
+        ]
+        for ticker in data
+    ]
+    expected = run_sweep(tasks, data, "2020-01-01", "2020-12-31")
+    cache = ResultCache(tmp_path / "cache")
+    run_sweep(tasks[:2], data, "2020-01-01", "2020-12-31", cache=cache)
+
+    summary = run_strategies(
+        tasks, data, "2020-01-01", "2020-12-31", results_dir=tmp_path, cache=cache
+    )
+
+    pd.testing.assert_frame_equal(summary, expected)
+    assert (cache.hits, cache.misses) == (2, 8)
+    assert len(list(tmp_path.glob("*.csv"))) == len(tasks)
+
+
+def test_run_universe_matches_run_sweep(tmp_path: Path) -> None:
+    data = {"SPY": _sample(), "HALF": _sample() * 0.5, "TAIL": _sample().iloc[40:]}
+    tasks = [
+        SweepTask(name, params, ticker)
+        for name, params in [("macd", {}), ("rsi", {"rsi_buy": 40})]
+        for ticker in data
+    ]
+    costs = CostModel(bps=5, borrow_bps=80, cash_bps=200)
+    expected = run_sweep(tasks, data, "2020-01-01", "2020-12-31", costs=costs)
+    cache = ResultCache(tmp_path / "cache")
+    run_sweep(tasks[:1], data, "2020-01-01", "2020-12-31", cache=cache, costs=costs)
+
+    summary = run_universe(
+        tasks, data, "2020-01-01", "2020-12-31", cache=cache, costs=costs
+    )
+
+    pd.testing.assert_frame_equal(summary, expected)
+    assert (cache.hits, cache.misses) == (1, 6)
+    again = run_universe(tasks, data, "2020-01-01", "2020-12-31", costs=costs)
+    pd.testing.assert_frame_equal(again, expected)
+
+
+def test_backtest_streamed_sweep(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    def fake_get_histories(
+        self: object, tickers: list[str], *args: str
+    ) -> dict[str, pd.DataFrame]:
+        return {t: _sample() for t in tickers}
+
+    monkeypatch.setattr(backtest.DataDownloader, "get_histories", fake_get_histories)
+    monkeypatch.chdir(tmp_path)
+    argv = [
+        "backtest.py",
+        "--strategy",
+        "macd",
+        "--ticker",
+        "SPY",
+        "--start",
+        "2020-01-01",
+        "--end",
+        "2020-12-31",
+        "--params",
+        '{"fast": [8, 12, 30], "slow": [26, 26.0], "signal": [5, 9]}',
+        "--sweep",
+        "--stream",
+        "--chunk-size",
+        "2",
+        "--constraint",
+        "signal <= 5",
+    ]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    backtest.main()
+
+    assert "Wrote 2 sweep rows" in capsys.readouterr().out
+    summary = pd.read_csv(tmp_path / "results" / "sweep_SPY.csv")
+    assert summary["params"].tolist() == [
+        '{"fast": 8, "signal": 5, "slow": 26}',
+        '{"fast": 12, "signal": 5, "slow": 26}',
+    ]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(project_root / "src"))
+sys.path.insert(0, str(project_root))
+
+import backtest  # noqa: E402
+from benchmarks import synthetic_ohlcv  # noqa: E402
+from engine import Backtester  # noqa: E402
+from metrics import tear_sheet  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+from strategies import BollingerStrategy  # noqa: E402
+from sweep import generate_param_grid, param_hash  # noqa: E402
+from walkforward import walk_forward, walk_forward_windows  # noqa: E402
+
+GRID = generate_param_grid({"length": [10, 20, 30], "dev": [1.5, 2.0]})
+
+
+def test_windows_tile_the_test_periods() -> None:
+    rolling = walk_forward_windows(10, 4, 3)
+    anchored = walk_forward_windows(10, 4, 3, anchored=True)
+
+    assert rolling == [
+        (slice(0, 4), slice(4, 7)),
+        (slice(3, 7), slice(7, 10)),
+    ]
+    assert [w[0] for w in anchored] == [slice(0, 4), slice(0, 7)]
+    assert walk_forward_windows(12, 4, 3)[-1] == (slice(6, 10), slice(10, 12))
+    with pytest.raises(ValueError):
+        walk_forward_windows(10, 1, 3)
+
+
+def test_walk_forward_selects_best_train_params() -> None:
+    data = synthetic_ohlcv(700, seed=3)
+    result = walk_forward("bollinger", GRID, data, train=250, test=100)
+
+    runs = [Backtester(BollingerStrategy(**p), data).run() for p in GRID]
+    windows = walk_forward_windows(len(data), 250, 100)
+    assert len(result.windows) == len(windows) == 5
+    expected_returns = []
+    for row, (train, test) in zip(result.windows.itertuples(), windows):
+        bars = slice(max(train.start - 1, 0), train.stop)
+        scores = [
+            float(tear_sheet(run["equity"][bars], run["position"][bars])["sharpe"])
+            for run in runs
+        ]
+        best = int(np.argmax(scores))
+        assert row.paramhash == param_hash(GRID[best])
+        assert row.train_score == pytest.approx(scores[best])
+        assert row.test_start == data.index[test.start]
+        equity = runs[best]["equity"].to_numpy()[test.start - 1 : test.stop]
+        expected_returns.append(equity[1:] / equity[:-1])
+
+    assert result.equity.index.equals(data.index[250:])
+    np.testing.assert_allclose(
+        result.equity.to_numpy(), np.cumprod(np.concatenate(expected_returns))
+    )
+    assert result.equity.iloc[-1] == pytest.approx(
+        np.prod(1 + result.windows["test_return"])
+    )
+
+
+def test_walk_forward_parallel_and_cached(tmp_path: Path) -> None:
+    data = synthetic_ohlcv(500, seed=5)
+    serial = walk_forward(
+        "bollinger", GRID, data, train=200, test=100, metric="ulcer_index"
+    )
+    cache = ResultCache(tmp_path)
+    parallel = walk_forward(
+        "bollinger", GRID, data, 200, 100, metric="ulcer_index", jobs=2, cache=cache
+    )
+    cached = walk_forward(
+        "bollinger", GRID, data, 200, 100, metric="ulcer_index", cache=cache
+    )
+
+    for other in (parallel, cached):
+        pd.testing.assert_frame_equal(other.windows, serial.windows)
+        pd.testing.assert_series_equal(other.equity, serial.equity)
+    assert cache.hits == len(GRID)
+    assert (serial.windows["train_score"] >= 0).all()
+    with pytest.raises(ValueError):
+        walk_forward("bollinger", GRID, data, 200, 100, metric="nope")
+
+
+def test_backtest_main_walk_forward(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    def fake_get_histories(
+        self: object, tickers: list[str], *args: str
+    ) -> dict[str, pd.DataFrame]:
+        return {t: synthetic_ohlcv(400, seed=1) for t in tickers}
+
+    monkeypatch.setattr(backtest.DataDownloader, "get_histories", fake_get_histories)
+    monkeypatch.chdir(tmp_path)
+    argv = [
+        "backtest.py",
+        "--strategy",
+        "bollinger",
+        "--ticker",
+        "SPY",
+        "--start",
+        "1850-01-01",
+        "--end",
+        "1852-01-01",
+        "--params",
+        '{"length": [10, 20], "dev": [2.0]}',
+        "--walk-forward",
+        "--train-bars",
+        "200",
+        "--test-bars",
+        "100",
+    ]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    backtest.main()
+
+    out = capsys.readouterr().out
+    assert "bollinger SPY: 2 windows by sharpe" in out
+    windows = pd.read_csv(tmp_path / "results" / "walkforward_bollinger_SPY.csv")
+    equity = pd.read_csv(
+        tmp_path / "results" / "walkforward_bollinger_SPY_equity.csv", index_col=0
+    )
+    assert len(windows) == 2
+    assert list(equity.columns) == ["equity", "position"]
+    assert len(equity) == 200
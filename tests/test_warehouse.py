@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from data import DataDownloader  # noqa: E402
+from warehouse import Warehouse  # noqa: E402
+
+
+def _bars(start: str, periods: int) -> pd.DataFrame:
+    index = pd.bdate_range(start, periods=periods, name="date")
+    close = index.day.to_numpy(dtype=float)
+    return pd.DataFrame(
+        {"close": close, "volume": np.arange(periods, dtype=np.int64)}, index=index
+    )
+
+
+def test_write_and_read_round_trip(tmp_path: Path) -> None:
+    store = Warehouse(tmp_path)
+    bars = _bars("2020-01-01", 10)
+    store.write("SPY", bars, start="2020-01-01", end="2020-01-20")
+
+    assert store.tickers() == ["SPY"]
+    assert store.coverage("SPY") == (
+        pd.Timestamp("2020-01-01"),
+        pd.Timestamp("2020-01-20"),
+    )
+    pd.testing.assert_frame_equal(
+        store.read("SPY"), bars.astype(float), check_freq=False
+    )
+    sliced = store.read("SPY", "2020-01-03", "2020-01-08", fields=["close"])
+    assert list(sliced.columns) == ["close"]
+    assert len(sliced) == 4
+    assert isinstance(store.column("SPY", "close"), np.memmap)
+    with pytest.raises(KeyError):
+        store.read("QQQ")
+
+
+def test_append_skips_existing_rows_and_extends_coverage(tmp_path: Path) -> None:
+    store = Warehouse(tmp_path)
+    store.write("SPY", _bars("2020-01-01", 5))
+    appended = store.append("SPY", _bars("2020-01-06", 5), end="2020-01-31")
+
+    assert appended == 3
+    assert store.manifest("SPY")["rows"] == 8
+    assert store.coverage("SPY")[1] == pd.Timestamp("2020-01-31")
+    assert store.append("SPY", _bars("2020-01-06", 5)) == 0
+    assert store.dates("SPY")[-1] == np.datetime64("2020-01-10")
+    with pytest.raises(ValueError):
+        store.append("SPY", _bars("2020-02-03", 2)[["close"]])
+
+
+def test_uncommitted_bytes_are_ignored(tmp_path: Path) -> None:
+    store = Warehouse(tmp_path)
+    store.write("SPY", _bars("2020-01-01", 3))
+    with open(tmp_path / "SPY" / "close.0", "ab") as fh:
+        fh.write(b"\xff" * 16)
+
+    assert len(store.read("SPY")) == 3
+    store.append("SPY", _bars("2020-01-06", 2))
+    assert store.read("SPY")["close"].tolist() == [1.0, 2.0, 3.0, 6.0, 7.0]
+
+
+def test_readers_see_consistent_snapshots_during_writes(tmp_path: Path) -> None:
+    store = Warehouse(tmp_path)
+    bars = _bars("2000-01-03", 2000)
+    store.write("SPY", bars.iloc[:10])
+    done = threading.Event()
+
+    def writer() -> None:
+        for stop in range(20, len(bars) + 1, 10):
+            store.append("SPY", bars.iloc[:stop])
+            if stop % 500 == 0:
+                store.write("SPY", bars.iloc[:stop])
+        done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    lengths = []
+    while not done.is_set():
+        frame = Warehouse(tmp_path).read("SPY")
+        expected = bars.iloc[: len(frame)].astype(float)
+        pd.testing.assert_frame_equal(frame, expected, check_freq=False)
+        lengths.append(len(frame))
+    thread.join()
+
+    assert lengths == sorted(lengths)
+    assert len(store.read("SPY")) == len(bars)
+
+
+def test_concurrent_first_appends_do_not_clobber(tmp_path: Path) -> None:
+    bars = _bars("2000-01-03", 400)
+    sizes = [50, 100, 200, 400]
+    for attempt in range(10):
+        store = Warehouse(tmp_path / str(attempt))
+        barrier = threading.Barrier(len(sizes))
+
+        def first_append(rows: int) -> None:
+            barrier.wait()
+            Warehouse(store.root).append("SPY", bars.iloc[:rows])
+
+        threads = [threading.Thread(target=first_append, args=(n,)) for n in sizes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        expected = bars.astype(float)
+        pd.testing.assert_frame_equal(store.read("SPY"), expected, check_freq=False)
+        manifest = store.manifest("SPY")
+        assert manifest is not None and manifest["generation"] == 0
+
+
+def test_downloader_uses_warehouse(tmp_path: Path) -> None:
+    calls: list[tuple[str, str]] = []
+
+    def download(symbol: str, start: str, end: str) -> pd.DataFrame:
+        calls.append((start, end))
+        index = pd.bdate_range(start, end, inclusive="left")
+        values = index.day.to_numpy(dtype=float)
+        return pd.DataFrame(
+            {"Open": values, "Close": values, "Volume": values}, index=index
+        )
+
+    store = Warehouse(tmp_path / "warehouse")
+    loader = DataDownloader(cache_dir=tmp_path, download=download, warehouse=store)
+    first = loader.get_history("AAPL", "2020-01-01", "2020-02-01")
+    manifest = store.manifest("AAPL")
+    loader.get_history("AAPL", "2020-01-01", "2020-03-01")
+    part = loader.get_history("AAPL", "2020-01-10", "2020-02-20")
+
+    assert calls == [("2020-01-01", "2020-02-01"), ("2020-02-01", "2020-03-01")]
+    assert store.manifest("AAPL")["generation"] == manifest["generation"]
+    assert list(first.columns) == [
+        "open",
+        "high",
+        "low",
+        "close",
+        "adj_close",
+        "volume",
+    ]
+    assert part.index[0] == pd.Timestamp("2020-01-10")
+    assert part.index[-1] == pd.Timestamp("2020-02-20")
+    assert not list(tmp_path.glob("*.parquet"))
+
+    loader.get_history("AAPL", "2019-12-01", "2020-03-01")
+    assert calls[-1] == ("2019-12-01", "2020-01-01")
+    assert store.manifest("AAPL")["generation"] == manifest["generation"] + 1
+
+
+def test_downloader_replaces_provisional_bar(tmp_path: Path) -> None:
+    today = pd.Timestamp.now().normalize()
+    last = today - pd.offsets.BDay(1)
+    provisional = {"close": 0.0}
+
+    def download(symbol: str, start: str, end: str) -> pd.DataFrame:
+        index = pd.bdate_range(start, end, inclusive="left")
+        index = index[index <= last]
+        values = index.day.to_numpy(dtype=float)
+        values[index == last] = provisional["close"]
+        return pd.DataFrame({"Close": values}, index=index)
+
+    store = Warehouse(tmp_path / "warehouse")
+    loader = DataDownloader(cache_dir=tmp_path, download=download, warehouse=store)
+    start = (today - pd.Timedelta(days=30)).strftime("%Y-%m-%d")
+    end = (today + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    assert loader.get_history("AAPL", start, end)["close"].iloc[-1] == 0.0
+
+    provisional["close"] = float(last.day)
+    result = loader.get_history("AAPL", start, end)
+    assert result["close"].iloc[-1] == float(last.day)
+    assert store.read("AAPL")["close"].iloc[-1] == float(last.day)